@@ -0,0 +1,84 @@
+"""
+Benchmark of loading shapes from CSV and JSON Lines files into a Map.
+
+Writes 100,000 random circles, rectangles, triangles and polygons to a
+temporary file in each format and compares reading the rows with the
+standard library and calling Map.add_shape once per shape against
+operations.ingest, which validates every row first and adds the shapes
+as one batch. Reports rows per second.
+
+Usage:
+    python -m benchmarks.bench_ingest
+"""
+import csv
+import json
+import random
+import sys
+import os
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import Map
+from operations.ingest import build_shape, ingest
+
+COUNT = 100_000
+COLUMNS = ['type', 'a', 'b', 'c', 'r', 'x', 'y', 'angle', 'color', 'label', 'vertices']
+
+
+def random_row(rng: random.Random) -> dict:
+    """A row describing a random shape in a 1000 x 1000 area."""
+    x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+    kind = rng.randrange(4)
+    if kind == 0:
+        return {'type': 'Circle', 'r': rng.uniform(1, 5), 'x': x, 'y': y}
+    if kind == 1:
+        return {'type': 'LabelledColoredRectangle', 'a': rng.uniform(1, 5), 'b': rng.uniform(1, 5),
+                'x': x, 'y': y, 'color': rng.choice(['red', 'green', 'blue']), 'label': 'r'}
+    if kind == 2:
+        return {'type': 'Triangle', 'a': 4, 'b': 3, 'c': 5, 'x': x, 'y': y}
+    return {'type': 'Polygon', 'vertices': ' '.join(f"{x + dx:.3f} {y + dy:.3f}"
+                                                     for dx, dy in [(0, 0), (3, 0), (3, 2), (0, 2)])}
+
+
+def write_files(directory: str, rows: list) -> dict:
+    """Write the rows as CSV and JSON Lines and return the paths by format."""
+    paths = {'csv': os.path.join(directory, 'shapes.csv'), 'jsonl': os.path.join(directory, 'shapes.jsonl')}
+    with open(paths['csv'], 'w', newline='') as file:
+        writer = csv.DictWriter(file, COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(paths['jsonl'], 'w') as file:
+        for row in rows:
+            file.write(json.dumps(row) + '\n')
+    return paths
+
+
+def one_at_a_time(path: str, file_format: str) -> Map:
+    """Read rows with the standard library and add each shape on its own."""
+    shape_map = Map()
+    with open(path, newline='') as file:
+        rows = csv.DictReader(file) if file_format == 'csv' else map(json.loads, file)
+        for row in rows:
+            shape_map.add_shape(build_shape(row))
+    return shape_map
+
+
+def main() -> None:
+    rng = random.Random(0)
+    rows = [random_row(rng) for _ in range(COUNT)]
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, rows)
+        print(f"{'format':>7} {'add_shape rows/s':>17} {'ingest rows/s':>14} {'speedup':>8}")
+        for file_format, path in paths.items():
+            start = time.perf_counter()
+            one_at_a_time(path, file_format)
+            single = COUNT / (time.perf_counter() - start)
+            report = ingest(Map(), path)
+            print(f"{file_format:>7} {single:>17,.0f} {report.rows_per_second:>14,.0f} "
+                  f"{report.rows_per_second / single:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
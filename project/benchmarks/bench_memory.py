@@ -0,0 +1,85 @@
+"""
+Benchmark of the memory used per shape.
+
+Builds 20,000 shapes of each type with random float attributes and
+reports the bytes allocated per shape, as traced by tracemalloc, with
+and without the derived-geometry cache filled. Colors are built at run
+time, as they would be when read from a file, so shapes share a color
+string only if it is interned. The 'object' column is the size of the
+instance itself, including its __dict__ if it has one. Run it on an
+older checkout to compare layouts.
+
+Usage:
+    python -m benchmarks.bench_memory
+"""
+import gc
+import random
+import sys
+import os
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.primitives import LabelledColoredRectangle, LabelledColoredCircle, LabelledColoredTriangle
+from shapes.poligons import Polygon
+
+COUNT = 20_000
+COLORS = ['red', 'green', 'blue', 'black', 'white', 'orange', 'purple', 'grey']
+
+
+def color(rng: random.Random) -> str:
+    """A color string built at run time rather than taken from a literal."""
+    return ''.join(list(rng.choice(COLORS)))
+
+
+FACTORIES = {
+    'Triangle': lambda rng: Triangle(3 + rng.random(), 4 + rng.random(), 5 + rng.random(),
+                                     rng.random(), rng.random(), 0.0),
+    'Rectangle': lambda rng: Rectangle(rng.random(), rng.random(), rng.random(), rng.random(), 0.0),
+    'Circle': lambda rng: Circle(rng.random(), rng.random(), rng.random(), 0.0),
+    'LabelledColoredTriangle': lambda rng: LabelledColoredTriangle(
+        3 + rng.random(), 4 + rng.random(), 5 + rng.random(), rng.random(), rng.random(), 0.0,
+        color=color(rng), label=''),
+    'LabelledColoredRectangle': lambda rng: LabelledColoredRectangle(
+        rng.random(), rng.random(), rng.random(), rng.random(), 0.0, color=color(rng), label=''),
+    'LabelledColoredCircle': lambda rng: LabelledColoredCircle(
+        rng.random(), rng.random(), rng.random(), 0.0, color=color(rng), label=''),
+    'Polygon (8 vertices)': lambda rng: Polygon([(rng.random(), rng.random()) for _ in range(8)]),
+}
+
+
+def object_size(shape) -> int:
+    """Size of the instance and of its __dict__, if it has one."""
+    size = sys.getsizeof(shape)
+    if hasattr(shape, '__dict__'):
+        size += sys.getsizeof(shape.__dict__)
+    return size
+
+
+def traced_bytes(factory, rng: random.Random, derive: bool) -> float:
+    """Bytes allocated per shape while building COUNT shapes."""
+    gc.collect()
+    tracemalloc.start()
+    shapes = [factory(rng) for _ in range(COUNT)]
+    if derive:
+        for shape in shapes:
+            shape.area()
+            shape.bbox()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del shapes
+    return allocated / COUNT
+
+
+def main() -> None:
+    print(f"{'type':>26} {'object':>7} {'built':>7} {'derived':>8}   (bytes per shape)")
+    for name, factory in FACTORIES.items():
+        rng = random.Random(0)
+        built = traced_bytes(factory, rng, derive=False)
+        derived = traced_bytes(factory, rng, derive=True)
+        print(f"{name:>26} {object_size(factory(rng)):>7} {built:>7.0f} {derived:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark of ParallelMap scaling with the number of worker processes.
+
+Builds a map of 50,000 random rectangles, circles, triangles and polygons
+and times point queries, area queries and the search for all crossing
+pairs, first with the serial functions and then with ParallelMap from one
+worker up to the number of CPUs, doubling each time. Starting the pool
+(publishing the snapshot and building each worker's copy) is timed
+separately, as it is paid once per map rather than per query.
+
+Usage:
+    python -m benchmarks.bench_parallel
+"""
+import random
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import Map, search_shapes_by_area, search_shapes_by_positions
+from operations.parallel import ParallelMap
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.poligons import Polygon
+
+COUNT = 50_000
+POINTS = 200_000
+AREAS = 2_000
+SIZE = 1000.0
+
+
+def build_map(rng: random.Random) -> Map:
+    """A map of COUNT small random shapes in a SIZE x SIZE area."""
+    shapes = []
+    for _ in range(COUNT):
+        x, y = rng.uniform(0, SIZE), rng.uniform(0, SIZE)
+        kind = rng.randrange(4)
+        if kind == 0:
+            shapes.append(Rectangle(rng.uniform(1, 8), rng.uniform(1, 8), x, y, 0))
+        elif kind == 1:
+            shapes.append(Circle(rng.uniform(0.5, 4), x, y, 0))
+        elif kind == 2:
+            scale = rng.uniform(0.5, 2)
+            shapes.append(Triangle(3 * scale, 4 * scale, 5 * scale, x, y, 0))
+        else:
+            w, h = rng.uniform(2, 8), rng.uniform(2, 8)
+            shapes.append(Polygon([(x, y), (x + w, y + 1), (x + w - 1, y + h), (x + 1, y + h - 1)]))
+    shape_map = Map()
+    shape_map.add_shapes(shapes)
+    return shape_map
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    rng = random.Random(0)
+    shape_map = build_map(rng)
+    points = [(rng.uniform(0, SIZE), rng.uniform(0, SIZE)) for _ in range(POINTS)]
+    areas = [shape.area() for shape in rng.sample(shape_map.shapes, AREAS)]
+
+    serial = {
+        'points': timed(search_shapes_by_positions, shape_map, points),
+        'areas': timed(lambda: [search_shapes_by_area(shape_map, area) for area in areas]),
+        'crossings': timed(lambda: list(shape_map.find_all_crossings())),
+    }
+    print(f"{'workers':>8} {'start s':>8} {'points s':>9} {'areas s':>8} {'crossings s':>12}")
+    print(f"{'serial':>8} {'':>8} {serial['points']:>9.2f} {serial['areas']:>8.2f} {serial['crossings']:>12.2f}")
+
+    workers = 1
+    while True:
+        start = time.perf_counter()
+        with ParallelMap(shape_map, workers=workers) as parallel:
+            # Wait until every worker has built its copy of the map
+            parallel.search_shapes_by_areas([0.0] * workers)
+            startup = time.perf_counter() - start
+            results = [timed(parallel.search_shapes_by_positions, points),
+                       timed(parallel.search_shapes_by_areas, areas),
+                       timed(parallel.find_all_crossings)]
+        print(f"{workers:>8} {startup:>8.2f} {results[0]:>9.2f} {results[1]:>8.2f} {results[2]:>12.2f}")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(2 * workers, os.cpu_count() or 1)
+
+
+if __name__ == '__main__':
+    main()
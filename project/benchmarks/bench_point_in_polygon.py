@@ -0,0 +1,64 @@
+"""
+Benchmark of the point-in-polygon strategies in ShapeUtils.
+
+Times the angle-sum test (is_point_inside_polygon_way1) against the
+crossing-number and winding-number strategies of is_point_inside_polygon,
+and the numpy kernel when available, on regular polygons of 3 to 10,000
+vertices.
+
+Usage:
+    python -m benchmarks.bench_point_in_polygon
+"""
+import math
+import random
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.geometry import ShapeUtils, np
+
+SIZES = [3, 10, 100, 1000, 10000]
+POINTS = 200
+
+
+def regular_polygon(n: int, radius: float = 100.0):
+    """Vertices of a regular n-gon centred on the origin."""
+    return [(radius * math.cos(2 * math.pi * i / n), radius * math.sin(2 * math.pi * i / n))
+            for i in range(n)]
+
+
+def time_per_point(test, points) -> float:
+    """Mean seconds per point of a containment test."""
+    start = time.perf_counter()
+    for point in points:
+        test(point)
+    return (time.perf_counter() - start) / len(points)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    points = [(rng.uniform(-120, 120), rng.uniform(-120, 120)) for _ in range(POINTS)]
+
+    print(f"{'vertices':>9} {'angle us':>10} {'crossing us':>12} {'winding us':>11} {'numpy us':>9} {'speedup':>8}")
+    for n in SIZES:
+        polygon = regular_polygon(n)
+        angle = time_per_point(lambda p: ShapeUtils.is_point_inside_polygon_way1(p, polygon), points)
+        crossing = time_per_point(lambda p: ShapeUtils.is_point_inside_polygon(p, polygon), points)
+        winding = time_per_point(lambda p: ShapeUtils.is_point_inside_polygon(p, polygon, 'winding'), points)
+
+        vectorized = float('nan')
+        if np is not None:
+            xs = np.array([p[0] for p in points])
+            ys = np.array([p[1] for p in points])
+            start = time.perf_counter()
+            ShapeUtils.points_inside_polygon(xs, ys, polygon)
+            vectorized = (time.perf_counter() - start) / len(points)
+
+        print(f"{n:>9} {angle * 1e6:>10.2f} {crossing * 1e6:>12.2f} {winding * 1e6:>11.2f} "
+              f"{vectorized * 1e6:>9.2f} {angle / crossing:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
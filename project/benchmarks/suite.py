@@ -0,0 +1,262 @@
+"""
+Benchmark suite covering every ShapeActions operation.
+
+Generates reproducible synthetic scenes of a given size, density and shape
+mix and times check_crossing, distance_between_shapes,
+search_shapes_by_area, search_shapes_by_position, polygons_intersect,
+Polygon.rotate and the Map totals at each requested scale. Each case is
+timed as the best of several repeats over a few passes through all
+cases, in seconds per operation.
+
+Each pass also times a fixed pure-Python calibration workload, and every
+case is recorded relative to it as well as in seconds. Results are
+printed and can be written as JSON. Given a baseline written earlier with
+--save-baseline, the relative times are compared and the run fails if a
+case is slower than the baseline by more than the threshold. Comparing
+relative times cancels out changes in the speed of the whole machine,
+such as load from other processes; a baseline is still best rewritten
+after moving to a different machine or Python version.
+
+Usage:
+    python -m benchmarks.suite [--scales small,medium] [--rounds 3] [--output results.json]
+                               [--baseline benchmarks/baseline.json] [--threshold 0.25]
+                               [--save-baseline benchmarks/baseline.json]
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import os
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import (
+    Map, check_crossing, distance_between_shapes, polygons_intersect,
+    search_shapes_by_area, search_shapes_by_position
+)
+from shapes.base import Shape
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.poligons import Polygon
+
+# Shapes in the scene and vertices of the polygons timed on their own, per scale
+SCALES = {
+    'small': {'shapes': 1_000, 'vertices': 16},
+    'medium': {'shapes': 10_000, 'vertices': 256},
+    'large': {'shapes': 100_000, 'vertices': 4_000},
+}
+DEFAULT_MIX = {'rectangle': 1.0, 'circle': 1.0, 'triangle': 1.0, 'polygon': 1.0}
+# Operations timed per measurement of the pairwise and query cases
+SAMPLES = 200
+REPEATS = 5
+# Passes over all cases; each case keeps its best pass, so a slow spell of
+# the machine during one pass does not show up as a regression
+ROUNDS = 3
+DEFAULT_THRESHOLD = 0.25
+
+
+def star_polygon(rng: random.Random, n: int, cx: float, cy: float, radius: float) -> List[Tuple[float, float]]:
+    """Vertices of a star-shaped polygon with n jagged vertices around (cx, cy)."""
+    return [(cx + radius * (0.8 + 0.2 * rng.random()) * math.cos(2 * math.pi * i / n),
+             cy + radius * (0.8 + 0.2 * rng.random()) * math.sin(2 * math.pi * i / n))
+            for i in range(n)]
+
+
+def make_scene(size: int, density: float = 0.5, mix: Optional[Dict[str, float]] = None,
+               polygon_vertices: int = 8, seed: int = 0) -> List[Shape]:
+    """
+    Generate a reproducible scene of random shapes.
+
+    Shapes are placed uniformly in a square world sized so that their
+    areas add up to about density times the world's area; higher
+    densities give more overlapping pairs.
+
+    Args:
+        size: Number of shapes
+        density: Total shape area relative to the world area (default: 0.5)
+        mix: Relative weight of 'rectangle', 'circle', 'triangle' and
+            'polygon' (default: equal weights)
+        polygon_vertices: Vertices of each polygon (default: 8)
+        seed: Seed of the random generator (default: 0)
+
+    Returns:
+        The shapes, in the same order for the same arguments
+
+    Raises:
+        ValueError: If the mix names an unknown shape kind
+    """
+    mix = mix or DEFAULT_MIX
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise ValueError(f"Unknown shape kinds {sorted(unknown)}")
+    kinds, weights = zip(*mix.items())
+    rng = random.Random(seed)
+    # Shapes are about 1 x 1 on average, whatever their kind
+    world = math.sqrt(size / density)
+
+    shapes: List[Shape] = []
+    for kind in rng.choices(kinds, weights, k=size):
+        x, y = rng.uniform(0, world), rng.uniform(0, world)
+        scale = rng.uniform(0.5, 1.5)
+        if kind == 'rectangle':
+            shapes.append(Rectangle(scale, scale * rng.uniform(0.5, 2), x, y, 0))
+        elif kind == 'circle':
+            shapes.append(Circle(scale * 0.56, x, y, 0))
+        elif kind == 'triangle':
+            shapes.append(Triangle(1.2 * scale, 0.9 * scale, 1.5 * scale, x, y, 0))
+        else:
+            shapes.append(Polygon(star_polygon(rng, polygon_vertices, x, y, 0.6 * scale)))
+    return shapes
+
+
+def measure(operation: Callable[[], object], operations: int = 1) -> float:
+    """Best time of REPEATS runs, in seconds per operation."""
+    timer = timeit.Timer(operation)
+    number, _ = timer.autorange()
+    return min(timer.repeat(REPEATS, number)) / (number * operations)
+
+
+_CALIBRATION_DATA = [math.sin(i) for i in range(500)]
+
+
+def _calibration_workload() -> float:
+    """Fixed mix of float arithmetic, iteration and sorting, like the code being timed."""
+    total = 0.0
+    for x in _CALIBRATION_DATA:
+        total += math.sqrt(x * x + 1.0) * 0.5
+    return total + sorted(_CALIBRATION_DATA)[0]
+
+
+def calibrate() -> float:
+    """Seconds per run of the calibration workload."""
+    return measure(_calibration_workload)
+
+
+def run_scale(scale: str, density: float = 0.5, mix: Optional[Dict[str, float]] = None,
+              seed: int = 0, rounds: int = ROUNDS) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Time every case at one scale.
+
+    Args:
+        scale: Key of SCALES
+        density: Passed on to make_scene (default: 0.5)
+        mix: Passed on to make_scene (default: equal weights)
+        seed: Seed of the scene and the queries (default: 0)
+        rounds: Passes over the cases, keeping the best time of each (default: ROUNDS)
+
+    Returns:
+        Seconds per operation of each case, keyed by 'case@scale', and the
+        same times in units of the calibration workload
+    """
+    settings = SCALES[scale]
+    rng = random.Random(seed)
+    shapes = make_scene(settings['shapes'], density, mix, seed=seed)
+    shape_map = Map()
+    shape_map.add_shapes(shapes)
+
+    pairs = [tuple(rng.sample(shapes, 2)) for _ in range(SAMPLES)]
+    world = max(max(shape.bbox()[2], shape.bbox()[3]) for shape in shapes)
+    points = [(rng.uniform(0, world), rng.uniform(0, world)) for _ in range(SAMPLES)]
+    areas = [shape.area() for shape in rng.sample(shapes, SAMPLES)]
+
+    n = settings['vertices']
+    # Crossing pair: the boundaries intersect, so every edge pair may be tested
+    poly1 = star_polygon(rng, n, 0, 0, 100)
+    poly2 = star_polygon(rng, n, 150, 0, 100)
+    polygon = Polygon(poly1)
+
+    cases: Dict[str, Tuple[Callable[[], object], int]] = {
+        'check_crossing': (lambda: [check_crossing(a, b) for a, b in pairs], len(pairs)),
+        'distance_between_shapes': (lambda: [distance_between_shapes(a, b) for a, b in pairs], len(pairs)),
+        'search_shapes_by_area': (lambda: [search_shapes_by_area(shape_map, area) for area in areas], len(areas)),
+        'search_shapes_by_position': (lambda: [search_shapes_by_position(shape_map, x, y) for x, y in points],
+                                      len(points)),
+        'polygons_intersect': (lambda: polygons_intersect(poly1, poly2), 1),
+        'polygon_rotate': (lambda: polygon.rotate(1), 1),
+        'map_totals': (lambda: (shape_map.total_area(), shape_map.total_perimeter(),
+                                shape_map.totals_by_type(), shape_map.totals_by_color()), 1),
+    }
+    seconds = {f"{name}@{scale}": math.inf for name in cases}
+    relative = dict(seconds)
+    for _ in range(rounds):
+        unit = calibrate()
+        for name, (operation, operations) in cases.items():
+            key = f"{name}@{scale}"
+            elapsed = measure(operation, operations)
+            seconds[key] = min(seconds[key], elapsed)
+            relative[key] = min(relative[key], elapsed / unit)
+    return seconds, relative
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float, float, float]]:
+    """
+    Find cases that got slower than the baseline by more than the threshold.
+
+    Cases missing from either side are not compared.
+
+    Args:
+        results: Time per operation of each case
+        baseline: Time per operation of each case in the baseline, in the
+            same unit
+        threshold: Allowed slowdown as a fraction, e.g. 0.25 for 25% (default: 0.25)
+
+    Returns:
+        (case, baseline, result, ratio) for each regression
+    """
+    return [(case, baseline[case], seconds, seconds / baseline[case])
+            for case, seconds in sorted(results.items())
+            if baseline.get(case) and seconds > baseline[case] * (1 + threshold)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Time every ShapeActions operation across scales.')
+    parser.add_argument('--scales', default='small,medium', help='comma-separated keys of SCALES')
+    parser.add_argument('--density', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rounds', type=int, default=ROUNDS)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='fail on regressions against this results file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--save-baseline', help='write the results as the new baseline to this file')
+    options = parser.parse_args(argv)
+
+    results: Dict[str, float] = {}
+    relative: Dict[str, float] = {}
+    for scale in options.scales.split(','):
+        scale_seconds, scale_relative = run_scale(scale, options.density, seed=options.seed, rounds=options.rounds)
+        results.update(scale_seconds)
+        relative.update(scale_relative)
+    for case, seconds in results.items():
+        print(f"{case:>36} {seconds * 1e6:>12.2f} us {relative[case]:>10.3f} units")
+
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'density': options.density,
+        'seed': options.seed,
+        'results': results,
+        'relative': relative,
+    }
+    for path in (options.output, options.save_baseline):
+        if path:
+            with open(path, 'w') as file:
+                json.dump(report, file, indent=2, sort_keys=True)
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)['relative']
+        regressions = compare(relative, baseline, options.threshold)
+        for case, before, after, ratio in regressions:
+            print(f"REGRESSION {case}: {before:.3f} -> {after:.3f} calibration units ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions beyond {options.threshold:.0%} against {options.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+from typing import Dict, Hashable, Optional, Tuple
+from shapes.base import Shape
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class CompensatedSum:
+    """
+    Running sum with Neumaier compensation.
+
+    The rounding error of every addition is collected in a separate term,
+    so adding and later subtracting the same values many times does not
+    make the sum drift away from the exact result.
+    """
+
+    __slots__ = ('_sum', '_compensation')
+
+    def __init__(self):
+        self._sum = 0.0
+        self._compensation = 0.0
+
+    def add(self, value: float) -> None:
+        """Add a value to the sum; subtract by adding its negation."""
+        total = self._sum + value
+        if abs(self._sum) >= abs(value):
+            self._compensation += (self._sum - total) + value
+        else:
+            self._compensation += (value - total) + self._sum
+        self._sum = total
+
+    def reset(self) -> None:
+        """Set the sum back to exactly zero."""
+        self._sum = 0.0
+        self._compensation = 0.0
+
+    @property
+    def value(self) -> float:
+        """The compensated sum."""
+        return self._sum + self._compensation
+
+
+class _Group:
+    """Shape count with running area and perimeter sums."""
+
+    __slots__ = ('count', 'area', 'perimeter')
+
+    def __init__(self):
+        self.count = 0
+        self.area = CompensatedSum()
+        self.perimeter = CompensatedSum()
+
+    def add(self, area: float, perimeter: float, sign: int) -> None:
+        self.count += sign
+        if self.count == 0:
+            # An empty group is exactly zero, whatever rounding was left
+            self.area.reset()
+            self.perimeter.reset()
+        else:
+            self.area.add(sign * area)
+            self.perimeter.add(sign * perimeter)
+
+    def summary(self) -> Dict[str, float]:
+        return {'count': self.count, 'total_area': self.area.value, 'total_perimeter': self.perimeter.value}
+
+
+class ShapeAggregates:
+    """
+    Running area and perimeter totals of a collection of shapes.
+
+    Totals are kept overall, per shape type and per color, and each
+    operation takes constant time. The area, perimeter, type and color a
+    shape contributed are remembered, so a shape that has changed since it
+    was added is still subtracted exactly. Shapes without a color only
+    count towards the overall and per-type totals.
+    """
+
+    def __init__(self):
+        self._total = _Group()
+        self._by_type: Dict[str, _Group] = {}
+        self._by_color: Dict[str, _Group] = {}
+        self._contributions: Dict[Hashable, Tuple[float, float, str, Optional[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._contributions)
+
+    def add(self, key: Hashable, shape: Shape) -> None:
+        """
+        Add a shape's area and perimeter to the totals.
+
+        Args:
+            key: Identifier of the shape
+            shape: The shape
+
+        Raises:
+            KeyError: If the key is already counted
+        """
+        if key in self._contributions:
+            raise KeyError(key)
+        contribution = (shape.area(), shape.perimeter(), shape.__class__.__name__, getattr(shape, 'color', None))
+        self._contributions[key] = contribution
+        self._apply(contribution, 1)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Subtract what a shape contributed from the totals.
+
+        Args:
+            key: Identifier of the shape
+
+        Raises:
+            KeyError: If the key is not counted
+        """
+        self._apply(self._contributions.pop(key), -1)
+
+    def update(self, key: Hashable, shape: Shape) -> None:
+        """
+        Replace what a shape contributes with its current area, perimeter and color.
+
+        Moves and rotations usually leave the contribution unchanged, in
+        which case the totals are not touched.
+
+        Args:
+            key: Identifier of the shape
+            shape: The shape
+
+        Raises:
+            KeyError: If the key is not counted
+        """
+        old = self._contributions[key]
+        new = (shape.area(), shape.perimeter(), shape.__class__.__name__, getattr(shape, 'color', None))
+        if new != old:
+            self._apply(old, -1)
+            self._contributions[key] = new
+            self._apply(new, 1)
+
+    def _apply(self, contribution: Tuple[float, float, str, Optional[str]], sign: int) -> None:
+        area, perimeter, type_name, color = contribution
+        self._total.add(area, perimeter, sign)
+        self._add_to(self._by_type, type_name, area, perimeter, sign)
+        if color is not None:
+            self._add_to(self._by_color, color, area, perimeter, sign)
+
+    @staticmethod
+    def _add_to(groups: Dict[str, _Group], name: str, area: float, perimeter: float, sign: int) -> None:
+        group = groups.get(name)
+        if group is None:
+            group = groups[name] = _Group()
+        group.add(area, perimeter, sign)
+        if group.count == 0:
+            del groups[name]
+
+    @property
+    def total_area(self) -> float:
+        """Sum of the areas of all counted shapes."""
+        return self._total.area.value
+
+    @property
+    def total_perimeter(self) -> float:
+        """Sum of the perimeters of all counted shapes."""
+        return self._total.perimeter.value
+
+    def by_type(self) -> Dict[str, Dict[str, float]]:
+        """
+        Totals per shape type.
+
+        Returns:
+            Mapping of class name to count, total area and total perimeter
+        """
+        return {name: group.summary() for name, group in self._by_type.items()}
+
+    def by_color(self) -> Dict[str, Dict[str, float]]:
+        """
+        Totals per color of the colored shapes.
+
+        Returns:
+            Mapping of color to count, total area and total perimeter
+        """
+        return {name: group.summary() for name, group in self._by_color.items()}
@@ -1,62 +1,515 @@
-from typing import List, Tuple
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 from shapes.primitives import Triangle, Rectangle, Circle
 from shapes.poligons import Polygon
 from utils.geometry import ShapeUtils
-from shapes.base import Shape
+from shapes.base import Shape, Movable, Rotatable, vertices_bbox
+from operations.spatial_index import SpatialGrid, sweep_and_prune
+from operations.area_index import AreaIndex
+from operations.aggregates import ShapeAggregates
+from operations.shape_store import ShapeStore
+from operations.snapshot import Snapshot, write_snapshot
+from operations.segment_sweep import boundaries_intersect
+from operations.dispatch import KernelRegistry
 from enum import Enum
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
 
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Total vertex count from which polygons_intersect sweeps the edges instead
+# of testing every pair
+SWEEP_MIN_VERTICES = 128
+
 class Map:
     """Class for managing a collection of shapes."""
     
-    def __init__(self):
-        self.shapes: List[Shape] = []  
+    def __init__(self, columnar: bool = False):
+        """
+        Initialize an empty collection.
+
+        Args:
+            columnar: Mirror primitive shapes in a NumPy-backed ShapeStore so
+                totals and statistics use vectorized kernels (default: False)
+
+        Raises:
+            ImportError: If columnar is True and NumPy is not installed
+        """
+        self.shapes: List[Shape] = []
+        self.spatial_index = SpatialGrid()
+        self.area_index = AreaIndex()
+        self.aggregates = ShapeAggregates()
+        self.store: Optional[ShapeStore] = ShapeStore() if columnar else None
+        self._next_id = 0
+        self._ids: Dict[Shape, int] = {}
+        self._by_id: Dict[int, Shape] = {}
+        self._slots: Dict[Shape, int] = {}
+        # Set while transform refreshes the indexes itself
+        self._batching = False
 
-    def add_shape(self, shape: Shape) -> None:
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+    def __contains__(self, shape: Shape) -> bool:
+        return shape in self._ids
+
+    def add_shape(self, shape: Shape) -> int:
         """
         Add a new shape to the collection.
+
+        Each shape gets an integer ID that stays the same until it is
+        removed; IDs are never reused. Adding a shape that is already on
+        the map leaves the map unchanged.
+
+        Shapes whose area is not a real number, such as a triangle whose
+        sides break the triangle inequality, are rejected: the area index
+        and running totals only hold real areas. Earlier versions put such
+        shapes on the map with a complex area.
         
         Args:
             shape: The shape to add
             
+        Returns:
+            The ID of the shape
+            
         Raises:
             TypeError: If the object is not an instance of Shape or its subclass
+            ValueError: If the area of the shape is not a real number, e.g. a
+                triangle whose sides break the triangle inequality
         """
         if not isinstance(shape, Shape):
             raise TypeError("Object must be an instance of Shape or its subclass")
-        self.shapes.append(shape)
+        if shape in self._ids:
+            return self._ids[shape]
+        (bbox,), (area,) = self._measure([shape])
+        shape_id, _ = self._attach(shape)
+        self.spatial_index.insert(shape_id, bbox)
+        self.area_index.insert(shape_id, area)
+        self.aggregates.add(shape_id, shape)
+        if self.store is not None:
+            self.store.add(shape)
+        return shape_id
+
+    def add_shapes(self, shapes: Iterable[Shape]) -> List[int]:
+        """
+        Add many shapes to the collection.
+
+        Either all shapes are added or, if one of them is not a shape or
+        cannot be measured, none. As with add_shape, shapes whose area is
+        not a real number are rejected.
+
+        Args:
+            shapes: The shapes to add
+
+        Returns:
+            The ID of each shape, in order
+
+        Raises:
+            TypeError: If an object is not an instance of Shape or its subclass
+            ValueError: If the area of a shape is not a real number
+        """
+        shapes = list(shapes)
+        # Types are checked once each rather than with an isinstance per shape
+        if not all(issubclass(cls, Shape) for cls in set(map(type, shapes))):
+            raise TypeError("Object must be an instance of Shape or its subclass")
+
+        # Every new shape is measured before any is attached, so a failure
+        # leaves the map unchanged
+        pending = [shape for shape in dict.fromkeys(shapes) if shape not in self._ids]
+        boxes, areas = self._measure(pending)
+        new_shapes = [(self._attach(shape)[0], shape) for shape in pending]
+        self._index_new(new_shapes, boxes, areas)
+        return [self._ids[shape] for shape in shapes]
+
+    @staticmethod
+    def _measure(shapes: List[Shape]) -> Tuple[List[Tuple[float, float, float, float]], List[float]]:
+        """Bounding boxes and areas of shapes about to be indexed."""
+        boxes = [ShapeUtils.bounding_box(shape) for shape in shapes]
+        areas = []
+        for shape in shapes:
+            area = shape.area()
+            if isinstance(area, complex):
+                raise ValueError(f"{shape!r} has no real area; its sizes do not describe a valid shape")
+            areas.append(area)
+        return boxes, areas
+
+    def _index_new(self, new_shapes: List[Tuple[int, Shape]],
+                   boxes: Optional[List[Tuple[float, float, float, float]]] = None,
+                   areas: Optional[List[float]] = None) -> None:
+        """Index newly attached shapes as one batch, with their bounding boxes and areas if already known."""
+        if boxes is None:
+            boxes, areas = self._measure([shape for _, shape in new_shapes])
+        ids = [shape_id for shape_id, _ in new_shapes]
+        self.spatial_index.insert_many(zip(ids, boxes))
+        self.area_index.insert_many(zip(ids, areas))
+        for shape_id, shape in new_shapes:
+            self.aggregates.add(shape_id, shape)
+        if self.store is not None:
+            for _, shape in new_shapes:
+                self.store.add(shape)
 
     def remove_shape(self, shape: Shape) -> None:
         """
         Remove a shape from the collection.
+
+        The last shape of the shapes list takes the place of the removed
+        one, so removal takes constant time but does not keep the list in
+        insertion order. Shapes that are not on the map are ignored.
         
         Args:
             shape: The shape to remove
         """
-        if shape in self.shapes:
-            self.shapes.remove(shape)
+        shape_id = self._detach(shape)
+        if shape_id is not None:
+            self.spatial_index.remove(shape_id)
+            self.area_index.remove(shape_id)
+            self.aggregates.remove(shape_id)
+            if self.store is not None:
+                self.store.remove(shape)
+
+    def remove_shapes(self, shapes: Iterable[Shape]) -> None:
+        """
+        Remove many shapes from the collection in time linear in their number.
+
+        Args:
+            shapes: The shapes to remove; those not on the map are ignored
+        """
+        removed = []
+        for shape in list(shapes):
+            shape_id = self._detach(shape)
+            if shape_id is not None:
+                self.spatial_index.remove(shape_id)
+                self.aggregates.remove(shape_id)
+                if self.store is not None:
+                    self.store.remove(shape)
+                removed.append(shape_id)
+        self.area_index.remove_many(removed)
+
+    def _attach(self, shape: Shape, shape_id: Optional[int] = None) -> Tuple[int, bool]:
+        """Give a shape an ID, by default the next one, and a slot in the shapes list unless it has them."""
+        known_id = self._ids.get(shape)
+        if known_id is not None:
+            return known_id, False
+        if shape_id is None:
+            shape_id = self._next_id
+        self._next_id = max(self._next_id, shape_id + 1)
+        self._ids[shape] = shape_id
+        self._by_id[shape_id] = shape
+        self._slots[shape] = len(self.shapes)
+        self.shapes.append(shape)
+        shape.subscribe(self._shape_changed)
+        return shape_id, True
+
+    def _detach(self, shape: Shape) -> Optional[int]:
+        """Drop a shape's ID and move the last shape into its slot; None if it is not on the map."""
+        shape_id = self._ids.pop(shape, None)
+        if shape_id is None:
+            return None
+        del self._by_id[shape_id]
+        shape.unsubscribe(self._shape_changed)
+        slot = self._slots.pop(shape)
+        last = self.shapes.pop()
+        if last is not shape:
+            self.shapes[slot] = last
+            self._slots[last] = slot
+        return shape_id
+
+    def _shape_changed(self, shape: Shape, change: str) -> None:
+        """Keep the indexes of a shape on the map up to date as it changes."""
+        if self._batching:
+            return
+        if change == 'geometry':
+            self.update_shape(shape)
+        elif change == 'color':
+            self.aggregates.update(self._ids[shape], shape)
+        elif change == 'angle' and self.store is not None:
+            self.store.update(shape)
+
+    def shape_id(self, shape: Shape) -> int:
+        """
+        Get the ID of a shape on the map.
+
+        Args:
+            shape: The shape to look up
+
+        Returns:
+            The ID assigned when the shape was added
+
+        Raises:
+            KeyError: If the shape is not on the map
+        """
+        return self._ids[shape]
+
+    def get_shape(self, shape_id: int) -> Shape:
+        """
+        Get the shape with an ID.
+
+        Args:
+            shape_id: ID returned by add_shape
+
+        Returns:
+            The shape with that ID
+
+        Raises:
+            KeyError: If no shape on the map has that ID
+        """
+        return self._by_id[shape_id]
+
+    def update_shape(self, shape: Shape) -> None:
+        """
+        Refresh the indexes after a shape in the collection has changed.
+
+        The map subscribes to the shapes on it and refreshes them as they
+        are moved, rotated, resized or recolored, so this is only needed
+        after changes that bypass the shape's setters, such as editing a
+        polygon's vertex list in place.
+
+        Args:
+            shape: The shape that changed
+
+        Raises:
+            KeyError: If the shape is not on the map
+        """
+        shape_id = self._ids[shape]
+        self.spatial_index.update(shape_id, ShapeUtils.bounding_box(shape))
+        self.area_index.update(shape_id, shape.area())
+        self.aggregates.update(shape_id, shape)
+        if self.store is not None:
+            self.store.update(shape)
+
+    def transform(self, selection: Union[Iterable[int], Callable[[Shape], bool]],
+                  dx: float = 0.0, dy: float = 0.0, angle: float = 0.0,
+                  pivot: Optional[Tuple[float, float]] = None) -> List[int]:
+        """
+        Rotate and then move many shapes at once.
+
+        Without a pivot every shape turns about its own center, as with
+        rotate(). With a pivot the selection turns rigidly about that
+        point, so the shapes also travel around it; triangles, rectangles
+        and circles stay axis-aligned, so for them the center of their
+        bounding box follows the rotation. Observers of the shapes are
+        notified as usual, but the map refreshes its indexes once for the
+        whole batch instead of once per shape.
+
+        Args:
+            selection: IDs of the shapes, or a predicate choosing shapes on the map
+            dx: Offset in x direction (default: 0.0)
+            dy: Offset in y direction (default: 0.0)
+            angle: Angle to rotate in degrees (default: 0.0)
+            pivot: Point to rotate the selection about, or None to rotate
+                each shape about its own center (default: None)
+
+        Returns:
+            The IDs of the transformed shapes
+
+        Raises:
+            KeyError: If an ID is not on the map
+            TypeError: If a selected shape cannot be moved, or cannot be
+                rotated while angle is not zero
+        """
+        if callable(selection):
+            ids = [self._ids[shape] for shape in self.shapes if selection(shape)]
+        else:
+            ids = list(dict.fromkeys(selection))
+        shapes = [self._by_id[shape_id] for shape_id in ids]
+        # Types are checked once each; the ABC checks are slow per shape
+        primitive: Dict[type, bool] = {}
+        for shape in shapes:
+            cls = type(shape)
+            if cls not in primitive:
+                if not issubclass(cls, Movable) or (angle and not issubclass(cls, Rotatable)):
+                    raise TypeError("Shapes must be movable, and rotatable to be rotated")
+                primitive[cls] = issubclass(cls, (Triangle, Rectangle, Circle))
+        if not shapes or (dx == 0 and dy == 0 and angle == 0):
+            return ids
+
+        turn_about_pivot = angle != 0 and pivot is not None
+        if turn_about_pivot:
+            px, py = pivot
+            angle_rad = math.radians(angle)
+            cos_a = math.cos(angle_rad)
+            sin_a = math.sin(angle_rad)
+
+        self._batching = True
+        try:
+            for shape in shapes:
+                shift_x, shift_y = dx, dy
+                if turn_about_pivot:
+                    # Turning about the shape's own center and then moving
+                    # that center around the pivot is a rotation about the pivot
+                    cx, cy = _rotation_center(shape)
+                    ox, oy = cx - px, cy - py
+                    shift_x += px + ox * cos_a - oy * sin_a - cx
+                    shift_y += py + ox * sin_a + oy * cos_a - cy
+                if angle:
+                    shape.rotate(angle)
+                if shift_x or shift_y:
+                    shape.move(shift_x, shift_y)
+        finally:
+            self._batching = False
+            self.spatial_index.update_many(zip(ids, map(ShapeUtils.bounding_box, shapes)))
+            # Moves and rotations cannot change the area or perimeter of
+            # primitives, which depend on their sizes only; other shapes
+            # recompute them from moved coordinates and may differ by rounding
+            resized = [(shape_id, shape) for shape_id, shape in zip(ids, shapes)
+                       if not primitive[type(shape)]]
+            self.area_index.update_many((shape_id, shape.area()) for shape_id, shape in resized)
+            for shape_id, shape in resized:
+                self.aggregates.update(shape_id, shape)
+            if self.store is not None:
+                self.store.update_many(shapes)
+        return ids
 
     def total_area(self) -> float:
         """
-        Calculate the total area of all shapes.
+        Get the total area of all shapes.
+
+        The total is a running sum kept up to date by add, remove and
+        update_shape, so this takes constant time.
         
         Returns:
             The sum of all shape areas
         """
-        return sum(shape.area() for shape in self.shapes)
+        return self.aggregates.total_area
 
     def total_perimeter(self) -> float:
         """
-        Calculate the total perimeter of all shapes.
+        Get the total perimeter of all shapes in constant time.
         
         Returns:
             The sum of all shape perimeters
         """
-        return sum(shape.perimeter() for shape in self.shapes)
+        return self.aggregates.total_perimeter
+
+    def totals_by_type(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the running totals per shape type.
+
+        Returns:
+            Mapping of class name to count, total area and total perimeter
+        """
+        return self.aggregates.by_type()
+
+    def totals_by_color(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the running totals per color; shapes without a color are left out.
+
+        Returns:
+            Mapping of color to count, total area and total perimeter
+        """
+        return self.aggregates.by_color()
+
+    def find_all_crossings(self) -> Iterator[Tuple[Shape, Shape]]:
+        """
+        Find every pair of intersecting shapes in the collection.
+
+        A sweep-and-prune pass over the bounding boxes selects candidate
+        pairs, and only those are passed to check_crossing.
+        
+        Returns:
+            Generator of (shape1, shape2) pairs that intersect, with shape1
+            added to the map before shape2
+        """
+        by_id = self._by_id
+        for id1, id2 in sweep_and_prune(self.spatial_index.items()):
+            shape1, shape2 = by_id[id1], by_id[id2]
+            if check_crossing(shape1, shape2):
+                yield shape1, shape2
+
+    def nearest(self, shape_or_point: Union[Shape, Tuple[float, float]], k: int = 1,
+                max_distance: Optional[float] = None) -> List[Tuple[Shape, float]]:
+        """
+        Find the shapes closest to a shape or a point.
+
+        Candidates are visited best-first through the spatial index using
+        bounding-box distances as lower bounds, so distance_between_shapes
+        only runs for shapes that can still make the result. Shapes whose
+        distance cannot be computed are left out.
+        
+        Args:
+            shape_or_point: Query shape, or (x, y) coordinates of a point
+            k: Number of shapes to return (default: 1)
+            max_distance: Ignore shapes farther than this (default: no limit)
+            
+        Returns:
+            Up to k (shape, distance) pairs ordered by increasing distance;
+            the query shape itself is never included
+        """
+        if isinstance(shape_or_point, Shape):
+            query = shape_or_point
+        else:
+            x, y = shape_or_point
+            query = Circle(0, x, y, 0)
+
+        by_id = self._by_id
+        nearest = self.spatial_index.nearest(
+            ShapeUtils.bounding_box(query),
+            lambda shape_id: distance_between_shapes(query, by_id[shape_id]),
+            k=k, max_distance=max_distance, exclude=self._ids.get(query))
+        return [(by_id[shape_id], distance) for shape_id, distance in nearest]
+
+    def save(self, target: Union[str, BinaryIO]) -> None:
+        """
+        Save the shapes and their IDs to a binary snapshot file.
+
+        Args:
+            target: Path of the file to write, or a seekable binary file
+
+        Raises:
+            TypeError: If a shape is not one of the built-in shape types
+        """
+        write_snapshot(target, self._by_id.items(), self._next_id)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, columnar: bool = False) -> 'Map':
+        """
+        Load a collection from a snapshot file written by save.
+
+        The shapes keep the IDs they had when saved. With mmap, records are
+        decoded straight from the mapped file instead of from a copy of it
+        read into memory; use Snapshot to read the records without
+        building shapes at all.
+
+        Args:
+            path: Path of the file
+            mmap: Map the file into memory instead of reading it (default: True)
+            columnar: Passed on to the new collection (default: False)
+
+        Returns:
+            The loaded collection
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version
+        """
+        with Snapshot(path, mmap=mmap) as snapshot:
+            return cls.from_snapshot(snapshot, columnar=columnar)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot, columnar: bool = False) -> 'Map':
+        """
+        Build a collection from an open snapshot, keeping the shape IDs.
+
+        Args:
+            snapshot: The snapshot to decode
+            columnar: Passed on to the new collection (default: False)
+
+        Returns:
+            The new collection
+        """
+        shape_map = cls(columnar=columnar)
+        new_shapes = []
+        for shape_id, shape in snapshot:
+            shape_map._attach(shape, shape_id)
+            new_shapes.append((shape_id, shape))
+        shape_map._next_id = max(shape_map._next_id, snapshot.next_id)
+        shape_map._index_new(new_shapes)
+        return shape_map
 
     def list_shapes(self) -> None:
         """Print a list of all shapes with their areas and perimeters."""
@@ -72,9 +525,175 @@ class ShapeActions(Enum):
     SEARCH_BY_POSITION = 'search_by_position'
     
 
+def _boxes_overlap(box1: Tuple[float, float, float, float],
+                   box2: Tuple[float, float, float, float]) -> bool:
+    """Check if two closed (min_x, min_y, max_x, max_y) boxes overlap or touch."""
+    return box1[0] <= box2[2] and box2[0] <= box1[2] and box1[1] <= box2[3] and box2[1] <= box1[3]
+
+def _polygon_vertices(shape: Shape) -> Optional[List[Tuple[float, float]]]:
+    """Vertices of a triangle, rectangle or polygon, or None for other shapes."""
+    if isinstance(shape, Polygon):
+        return shape.to_vertices()
+    return ShapeUtils.shape_to_vertices(shape)
+
+def _rotation_center(shape: Shape) -> Tuple[float, float]:
+    """Point a shape's rotate() turns it about: a polygon's centroid, else its bounding box center."""
+    if isinstance(shape, Polygon):
+        return shape._calculate_centroid()
+    min_x, min_y, max_x, max_y = shape.bbox()
+    return ((min_x + max_x) / 2, (min_y + max_y) / 2)
+
+def _is_convex(shape: Shape) -> bool:
+    """Check if a polygonal shape is known to be convex."""
+    if isinstance(shape, (Rectangle, Triangle)):
+        return True
+    return isinstance(shape, Polygon) and shape.is_convex()
+
+def _circles_cross(circle1: Circle, circle2: Circle) -> bool:
+    """Crossing kernel for two circles."""
+    center1 = circle1.center
+    center2 = circle2.center
+    distance_between_centers = ((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)**0.5
+    return distance_between_centers <= circle1.radius + circle2.radius
+
+def _rectangles_cross(rect1: Rectangle, rect2: Rectangle) -> bool:
+    """Crossing kernel for two axis-aligned rectangles."""
+    # Check if one rectangle is to the left of the other
+    if (rect1.x + rect1.a < rect2.x or rect2.x + rect2.a < rect1.x):
+        return False
+    # Check if one rectangle is above the other
+    if (rect1.y + rect1.b < rect2.y or rect2.y + rect2.b < rect1.y):
+        return False
+    return True
+
+def _polygonal_shapes_cross(shape1: Shape, shape2: Shape) -> bool:
+    """Default crossing kernel: SAT for convex polygonal shapes, edge tests otherwise."""
+    vertices1 = _polygon_vertices(shape1)
+    vertices2 = _polygon_vertices(shape2)
+    if vertices1 and vertices2:
+        if _is_convex(shape1) and _is_convex(shape2):
+            return ShapeUtils.separating_axis_test(vertices1, vertices2)[0]
+        return polygons_intersect(vertices1, vertices2)
+    return False
+
+def _circles_distance(circle1: Circle, circle2: Circle) -> float:
+    """Distance kernel for two circles."""
+    center1 = circle1.center
+    center2 = circle2.center
+    distance_between_centers = ((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)**0.5
+    return max(0, distance_between_centers - circle1.radius - circle2.radius)
+
+def _rectangles_distance(rect1: Rectangle, rect2: Rectangle) -> float:
+    """Distance kernel for two axis-aligned rectangles."""
+    if rect1.x + rect1.a < rect2.x:  
+        horiz_dist = rect2.x - (rect1.x + rect1.a)
+    elif rect2.x + rect2.a < rect1.x:  
+        horiz_dist = rect1.x - (rect2.x + rect2.a)
+    else:  
+        horiz_dist = 0
+    
+    if rect1.y + rect1.b < rect2.y:  
+        vert_dist = rect2.y - (rect1.y + rect1.b)
+    elif rect2.y + rect2.b < rect1.y: 
+        vert_dist = rect1.y - (rect2.y + rect2.b)
+    else:  
+        vert_dist = 0
+    
+    if horiz_dist == 0 and vert_dist == 0:
+        return 0
+    
+    if horiz_dist == 0:
+        return vert_dist
+    if vert_dist == 0:
+        return horiz_dist
+    
+    return (horiz_dist**2 + vert_dist**2)**0.5
+
+def _circle_boundary_gap(circle: Circle, vertices: List[Tuple[float, float]]) -> float:
+    """Distance from a circle's center to a polygon boundary, or 0 if the center is inside."""
+    center = circle.center
+    if ShapeUtils.is_point_inside_polygon(center, vertices):
+        return 0.0
+    start = vertices[-1]
+    gap = float('inf')
+    for end in vertices:
+        gap = min(gap, ShapeUtils.point_segment_distance(center, start, end))
+        start = end
+    return gap
+
+def _circle_polygon_cross(circle: Circle, shape: Shape) -> bool:
+    """Crossing kernel for a circle and a triangle or polygon."""
+    return _circle_boundary_gap(circle, _polygon_vertices(shape)) <= circle.radius
+
+def _circle_polygon_distance(circle: Circle, shape: Shape) -> float:
+    """Distance kernel for a circle and a triangle or polygon."""
+    return max(0, _circle_boundary_gap(circle, _polygon_vertices(shape)) - circle.radius)
+
+def _polygonal_shapes_distance(shape1: Shape, shape2: Shape) -> float:
+    """Distance kernel for triangles, rectangles and polygons."""
+    if _polygonal_shapes_cross(shape1, shape2):
+        return 0.0
+    return ShapeUtils.polygons_distance(_polygon_vertices(shape1), _polygon_vertices(shape2))
+
+def _crossing_distance(shape1: Shape, shape2: Shape) -> float:
+    """Default distance kernel: 0 for crossing shapes, unknown (infinite) otherwise."""
+    return 0.0 if check_crossing(shape1, shape2) else float('inf')
+
+_crossing_kernels = KernelRegistry(_polygonal_shapes_cross)
+_crossing_kernels.register(Circle, Circle, _circles_cross)
+_crossing_kernels.register(Rectangle, Rectangle, _rectangles_cross)
+_crossing_kernels.register(Circle, Rectangle, ShapeUtils.circle_rectangle_intersection)
+_crossing_kernels.register(Circle, Triangle, _circle_polygon_cross)
+_crossing_kernels.register(Circle, Polygon, _circle_polygon_cross)
+
+_distance_kernels = KernelRegistry(_crossing_distance)
+_distance_kernels.register(Circle, Circle, _circles_distance)
+_distance_kernels.register(Rectangle, Rectangle, _rectangles_distance)
+_distance_kernels.register(Circle, Rectangle, ShapeUtils.circle_rectangle_distance)
+_distance_kernels.register(Circle, Triangle, _circle_polygon_distance)
+_distance_kernels.register(Circle, Polygon, _circle_polygon_distance)
+for _type1, _type2 in ((Triangle, Triangle), (Triangle, Rectangle), (Triangle, Polygon),
+                       (Polygon, Polygon), (Polygon, Rectangle)):
+    _distance_kernels.register(_type1, _type2, _polygonal_shapes_distance)
+
+def register_crossing_kernel(type1: type, type2: type, kernel: Callable[[Shape, Shape], bool]) -> None:
+    """
+    Register the function check_crossing uses for a pair of shape types.
+    
+    The kernel also applies to subclasses of the types and, with swapped
+    arguments, to the reversed pair. It is only called for shapes whose
+    bounding boxes overlap.
+    
+    Args:
+        type1: Type of the first shape
+        type2: Type of the second shape
+        kernel: Function returning True if the two shapes intersect
+    """
+    _crossing_kernels.register(type1, type2, kernel)
+
+def register_distance_kernel(type1: type, type2: type, kernel: Callable[[Shape, Shape], float]) -> None:
+    """
+    Register the function distance_between_shapes uses for a pair of shape types.
+    
+    The kernel also applies to subclasses of the types and, with swapped
+    arguments, to the reversed pair. It must return 0 for intersecting
+    shapes.
+    
+    Args:
+        type1: Type of the first shape
+        type2: Type of the second shape
+        kernel: Function returning the minimum distance between two shapes
+    """
+    _distance_kernels.register(type1, type2, kernel)
+
 def check_crossing(shape1: Shape, shape2: Shape) -> bool:
     """
     Check if two shapes intersect.
+
+    The test is chosen by the pair of shape types (see
+    register_crossing_kernel). Triangles, rectangles and polygons without
+    a more specific kernel use the separating axis test when both are
+    convex and polygons_intersect otherwise; other pairs do not intersect.
     
     Args:
         shape1: First shape
@@ -83,43 +702,22 @@ def check_crossing(shape1: Shape, shape2: Shape) -> bool:
     Returns:
         True if shapes intersect, False otherwise
     """
-    
-    # Circle - Circle
-    if isinstance(shape1, Circle) and isinstance(shape2, Circle):
-        center1 = shape1.center
-        center2 = shape2.center
-        distance_between_centers = ((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)**0.5
-        return distance_between_centers <= shape1.radius + shape2.radius
-    
-    # Rectangle - Rectangle
-    elif isinstance(shape1, Rectangle) and isinstance(shape2, Rectangle):
-        # Check if one rectangle is to the left of the other
-        if (shape1.x + shape1.a < shape2.x or shape2.x + shape2.a < shape1.x):
+    # Shapes whose bounding boxes are disjoint cannot intersect; shapes
+    # without a bounding box go straight to their kernel
+    try:
+        if not _boxes_overlap(shape1.bbox(), shape2.bbox()):
             return False
-        # Check if one rectangle is above the other
-        if (shape1.y + shape1.b < shape2.y or shape2.y + shape2.b < shape1.y):
-            return False
-        return True
-    
-    # Circle - Rectangle
-    elif isinstance(shape1, Circle) and isinstance(shape2, Rectangle):
-        return ShapeUtils.circle_rectangle_intersection(shape1, shape2)
-    elif isinstance(shape1, Rectangle) and isinstance(shape2, Circle):
-        return ShapeUtils.circle_rectangle_intersection(shape2, shape1)
-    
-    # Triangle handling
-    elif isinstance(shape1, Triangle) or isinstance(shape2, Triangle):
-        vertices1 = ShapeUtils.shape_to_vertices(shape1)
-        vertices2 = ShapeUtils.shape_to_vertices(shape2)
-        
-        if vertices1 and vertices2:
-            return polygons_intersect(vertices1, vertices2)
-    
-    return False
+    except NotImplementedError:
+        pass
+    return _crossing_kernels(shape1, shape2)
 
 def distance_between_shapes(shape1: Shape, shape2: Shape) -> float:
     """
     Find the minimum distance between two shapes.
+
+    The computation is chosen by the pair of shape types (see
+    register_distance_kernel). Pairs without a distance kernel are 0 apart
+    if they intersect and infinitely far apart otherwise.
     
     Args:
         shape1: First shape
@@ -128,117 +726,343 @@ def distance_between_shapes(shape1: Shape, shape2: Shape) -> float:
     Returns:
         The minimum distance (0 if shapes intersect)
     """
+    return _distance_kernels(shape1, shape2)
+
+def distance_matrix(shapes: Sequence[Shape], chunk_size: int = 1 << 22) -> 'np.ndarray':
+    """
+    Compute the minimum distance between every pair of shapes (requires numpy).
+
+    Circles are reduced to their centers and triangles, rectangles and
+    polygons to their vertices and edges. The distance from every point to
+    every edge is computed in NumPy blocks of at most chunk_size entries and
+    reduced per pair of shapes, which gives the exact distance of shapes
+    that do not intersect. Pairs with overlapping bounding boxes are then
+    checked with check_crossing and set to 0 if they intersect. Shapes of
+    other types fall back to distance_between_shapes.
+
+    Args:
+        shapes: The shapes to compare
+        chunk_size: Maximum number of point-to-edge distances per block
+
+    Returns:
+        Symmetric (n, n) array of distances with a zero diagonal
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    if np is None:
+        raise ImportError('distance_matrix requires numpy')
+    n = len(shapes)
+    result = np.full((n, n), np.inf)
+    points: List[Tuple[float, float]] = []
+    point_owners: List[int] = []
+    edges: List[Tuple[float, float, float, float]] = []
+    edge_owners: List[int] = []
+    radii = np.zeros(n)
+    batched: List[int] = []
+    others: List[int] = []
+
+    for i, shape in enumerate(shapes):
+        if isinstance(shape, Circle):
+            # A circle is its center, as a point and as a zero-length edge
+            x, y = shape.center
+            points.append((x, y))
+            point_owners.append(i)
+            edges.append((x, y, x, y))
+            edge_owners.append(i)
+            radii[i] = shape.radius
+            batched.append(i)
+            continue
+        vertices = _polygon_vertices(shape)
+        if not vertices:
+            others.append(i)
+            continue
+        points.extend(vertices)
+        point_owners.extend([i] * len(vertices))
+        start = vertices[-1]
+        for end in vertices:
+            edges.append((start[0], start[1], end[0], end[1]))
+            edge_owners.append(i)
+            start = end
+        batched.append(i)
+
+    if batched:
+        xy = np.array(points, dtype=float)
+        owners = np.array(point_owners)
+        segments = np.array(edges, dtype=float)
+        ax, ay = segments[:, 0], segments[:, 1]
+        dx, dy = segments[:, 2] - ax, segments[:, 3] - ay
+        length_squared = dx * dx + dy * dy
+        degenerate = length_squared == 0
+        length_squared[degenerate] = 1.0
+        edge_groups, edge_starts = np.unique(np.array(edge_owners), return_index=True)
+
+        # Blocks of whole shapes' points, so each block reduces per shape on its own
+        group_owners, group_starts = np.unique(owners, return_index=True)
+        group_ends = np.append(group_starts[1:], len(owners))
+        rows_per_block = max(1, chunk_size // len(segments))
+        first = 0
+        while first < len(group_owners):
+            last = first + 1
+            while last < len(group_owners) and group_ends[last] - group_starts[first] <= rows_per_block:
+                last += 1
+            lo, hi = group_starts[first], group_ends[last - 1]
+            px = xy[lo:hi, 0, None]
+            py = xy[lo:hi, 1, None]
+            t = np.clip(((px - ax) * dx + (py - ay) * dy) / length_squared, 0.0, 1.0)
+            t[:, degenerate] = 0.0
+            distance = np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+            per_row = np.minimum.reduceat(distance, group_starts[first:last] - lo, axis=0)
+            block = np.minimum.reduceat(per_row, edge_starts, axis=1)
+            rows = group_owners[first:last]
+            result[np.ix_(rows, edge_groups)] = block
+            first = last
+
+        result = np.minimum(result, result.T)
+        result -= radii[:, None] + radii[None, :]
+        np.maximum(result, 0.0, out=result)
+
+        # Zero the pairs that intersect; only overlapping boxes can
+        entries = [(i, shapes[i].bbox()) for i in batched]
+        for i, j in sweep_and_prune(entries):
+            if result[i, j] > 0 and check_crossing(shapes[i], shapes[j]):
+                result[i, j] = result[j, i] = 0.0
+
+    for i in others:
+        for j in range(n):
+            result[i, j] = result[j, i] = distance_between_shapes(shapes[i], shapes[j])
+    np.fill_diagonal(result, 0.0)
+    return result
+
+def search_shapes_by_area(map: Map, area: float, abs_tol: float = 0.0, rel_tol: float = 0.0) -> List[Shape]:
+    """
+    Find shapes with area equal to the specified value.
+
+    Without tolerances only exactly equal areas match; otherwise areas are
+    compared as in math.isclose.
     
-    # If shapes intersect, distance is 0
-    if check_crossing(shape1, shape2):
-        return 0.0
-    
-    # Circle - Circle
-    if isinstance(shape1, Circle) and isinstance(shape2, Circle):
-        center1 = shape1.center
-        center2 = shape2.center
-        distance_between_centers = ((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)**0.5
-        return max(0, distance_between_centers - shape1.radius - shape2.radius)
-    
-    # Rectangle - Rectangle
-    elif isinstance(shape1, Rectangle) and isinstance(shape2, Rectangle):
-        if shape1.x + shape1.a < shape2.x:  
-            horiz_dist = shape2.x - (shape1.x + shape1.a)
-        elif shape2.x + shape2.a < shape1.x:  
-            horiz_dist = shape1.x - (shape2.x + shape2.a)
-        else:  
-            horiz_dist = 0
-        
-        if shape1.y + shape1.b < shape2.y:  
-            vert_dist = shape2.y - (shape1.y + shape1.b)
-        elif shape2.y + shape2.b < shape1.y: 
-            vert_dist = shape1.y - (shape2.y + shape2.b)
-        else:  
-            vert_dist = 0
-        
-        if horiz_dist == 0 and vert_dist == 0:
-            return 0
-        
-        if horiz_dist == 0:
-            return vert_dist
-        if vert_dist == 0:
-            return horiz_dist
+    Args:
+        map: The collection of shapes to search
+        area: The target area value
+        abs_tol: Maximum absolute difference (default: 0.0)
+        rel_tol: Maximum relative difference (default: 0.0)
         
-        return (horiz_dist**2 + vert_dist**2)**0.5
+    Returns:
+        List of shapes with matching area
+    """
+    return [map.get_shape(shape_id) for shape_id in map.area_index.find(area, abs_tol=abs_tol, rel_tol=rel_tol)]
+
+def search_shapes_by_area_range(map: Map, min_area: Optional[float] = None,
+                                max_area: Optional[float] = None) -> List[Shape]:
+    """
+    Find shapes with area inside a closed interval.
     
-    # Circle - Rectangle
-    elif isinstance(shape1, Circle) and isinstance(shape2, Rectangle):
-        return ShapeUtils.circle_rectangle_distance(shape1, shape2)
-    elif isinstance(shape1, Rectangle) and isinstance(shape2, Circle):
-        return ShapeUtils.circle_rectangle_distance(shape2, shape1)
+    Args:
+        map: The collection of shapes to search
+        min_area: Lower bound, or None for no lower bound
+        max_area: Upper bound, or None for no upper bound
+        
+    Returns:
+        List of matching shapes ordered by area
+    """
+    return [map.get_shape(shape_id) for shape_id in map.area_index.find_range(min_area, max_area)]
+
+def largest_shapes(map: Map, k: int) -> List[Shape]:
+    """
+    Find the shapes with the largest areas.
     
-    return float('inf')
+    Args:
+        map: The collection of shapes to search
+        k: Number of shapes to return
+        
+    Returns:
+        Up to k shapes in descending order of area
+    """
+    return [map.get_shape(shape_id) for shape_id in map.area_index.largest(k)]
 
-def search_shapes_by_area(map: Map, area: float) -> List[Shape]:
+def smallest_shapes(map: Map, k: int) -> List[Shape]:
     """
-    Find shapes with area equal to the specified value.
+    Find the shapes with the smallest areas.
     
     Args:
         map: The collection of shapes to search
-        area: The target area value
+        k: Number of shapes to return
         
     Returns:
-        List of shapes with matching area
+        Up to k shapes in ascending order of area
+    """
+    return [map.get_shape(shape_id) for shape_id in map.area_index.smallest(k)]
+
+def _shape_contains_point(shape: Shape, x: float, y: float, strategy: str = 'crossing') -> bool:
+    """Exact containment test of a single point against one shape."""
+    if isinstance(shape, Rectangle):
+        # Check if point is inside rectangle
+        return (shape.x <= x <= shape.x + shape.a and 
+                shape.y <= y <= shape.y + shape.b)
+            
+    elif isinstance(shape, Circle):
+        # Check if point is inside circle
+        dx = x - shape.center[0]
+        dy = y - shape.center[1]
+        distance_squared = dx*dx + dy*dy
+        return distance_squared <= shape.radius * shape.radius
+            
+    elif isinstance(shape, (Triangle, Polygon)):
+        # Reject points outside the bounding box before the polygon test
+        min_x, min_y, max_x, max_y = shape.bbox()
+        if not (min_x <= x <= max_x and min_y <= y <= max_y):
+            return False
+        return ShapeUtils.is_point_inside_polygon((x, y), shape.to_vertices(), strategy)
+
+    return False
+
+def _batch_contains(map: Map, points: List[Tuple[float, float]], hits: List[List[Shape]]) -> None:
+    """
+    Vectorized body of search_shapes_by_positions.
+
+    Candidate pairs come from the packed form of the spatial index and are
+    tested in one pass per shape type. Rectangles are fully decided by
+    their bounding box; per-item kind and circle parameters are cached on
+    the packed index until the map changes.
     """
-    return [shape for shape in map.shapes if shape.area() == area]
+    packed = map.spatial_index.packed()
+    if 'kinds' not in packed.extras:
+        # kind 0 = rectangle, 1 = circle (cx, cy, r), 2 = vertex-based
+        kinds, circles = [], []
+        for shape_id in packed.keys:
+            shape = map.get_shape(shape_id)
+            if isinstance(shape, Rectangle):
+                kinds.append(0)
+                circles.append((0.0, 0.0, 0.0))
+            elif isinstance(shape, Circle):
+                kinds.append(1)
+                circles.append((shape.x, shape.y, shape.r))
+            else:
+                kinds.append(2)
+                circles.append((0.0, 0.0, 0.0))
+        packed.extras['kinds'] = np.array(kinds, dtype=np.int8)
+        packed.extras['circles'] = np.array(circles, dtype=float).reshape(-1, 3)
+    kinds, circles = packed.extras['kinds'], packed.extras['circles']
+
+    coords = np.array(points)
+    pair_points, pair_items = packed.candidate_pairs(coords[:, 0], coords[:, 1])
+    xs, ys = coords[pair_points, 0], coords[pair_points, 1]
+    pair_kinds = kinds[pair_items]
+    mask = pair_kinds == 0
 
-def search_shapes_by_position(map: Map, x: float, y: float) -> List[Shape]:
+    sel = pair_kinds == 1
+    c = circles[pair_items[sel]]
+    dx, dy = xs[sel] - c[:, 0], ys[sel] - c[:, 1]
+    mask[sel] = dx * dx + dy * dy <= c[:, 2] * c[:, 2]
+
+    sel = np.flatnonzero(pair_kinds == 2)
+    for item in np.unique(pair_items[sel]):
+        shape = map.get_shape(packed.keys[item])
+        item_sel = sel[pair_items[sel] == item]
+        vertices = _polygon_vertices(shape)
+        if vertices:
+            mask[item_sel] = ShapeUtils.points_inside_polygon(xs[item_sel], ys[item_sel], vertices)
+
+    keys = packed.keys
+    get_shape = map.get_shape
+    for point, item in zip(pair_points[mask].tolist(), pair_items[mask].tolist()):
+        hits[point].append(get_shape(keys[item]))
+
+def search_shapes_by_position(map: Map, x: float, y: float, strategy: str = 'crossing') -> List[Shape]:
     """
     Find shapes that contain the specified point.
+
+    Only shapes whose bounding box contains the point, as reported by the
+    map's spatial index, are tested exactly.
     
     Args:
         map: The collection of shapes to search
         x: X-coordinate of the point
         y: Y-coordinate of the point
+        strategy: Point-in-polygon test for triangles and polygons, see
+            ShapeUtils.is_point_inside_polygon (default: 'crossing')
         
     Returns:
         List of shapes that contain the point
     """    
-    result = []
-    
-    for shape in map.shapes:
-        if isinstance(shape, Rectangle):
-            # Check if point is inside rectangle
-            if (shape.x <= x <= shape.x + shape.a and 
-                shape.y <= y <= shape.y + shape.b):
-                result.append(shape)
-                
-        elif isinstance(shape, Circle):
-            # Check if point is inside circle
-            dx = x - shape.center[0]
-            dy = y - shape.center[1]
-            distance_squared = dx*dx + dy*dy
-            if distance_squared <= shape.radius * shape.radius:
-                result.append(shape)
-                
-        elif isinstance(shape, Triangle):
-            # Use ShapeUtils to convert to vertices and check
-            vertices = ShapeUtils.shape_to_vertices(shape)
-            if vertices and ShapeUtils.is_point_inside_polygon_way1((x, y), vertices):
-                result.append(shape)
-                
-        elif isinstance(shape, Polygon):
-            # Polygon already has vertices
-            if hasattr(shape, 'vertices') and ShapeUtils.is_point_inside_polygon_way1((x, y), shape.vertices):
-                result.append(shape)
+    shapes = [map.get_shape(shape_id) for shape_id in map.spatial_index.query_point(x, y)]
+    return [shape for shape in shapes if _shape_contains_point(shape, x, y, strategy)]
+
+def search_shapes_by_positions(map: Map, points: Sequence[Tuple[float, float]],
+                               csr: bool = False) -> Union[List[List[Shape]], Tuple[List[int], List[Shape]]]:
+    """
+    Find the shapes containing each of many points.
+
+    With numpy installed, candidates for all points are looked up at once
+    in a packed snapshot of the spatial index (rebuilt only after the map
+    changes) and tested with vectorized kernels, using the crossing-number
+    rule for triangles and polygons, which counts boundary points as
+    inside. Without numpy, points falling into the same index cell share a
+    single lookup and are tested with the same crossing-number rule one
+    point at a time.
     
-    return result
+    Args:
+        map: The collection of shapes to search
+        points: Sequence of (x, y) coordinates, or an (N, 2) array
+        csr: Return a compressed sparse row layout instead of nested lists
+        
+    Returns:
+        One list of containing shapes per point, in the order the shapes
+        were added to the map. With csr=True,
+        a tuple (indptr, shapes) where the hits of point i are
+        shapes[indptr[i]:indptr[i + 1]]
+    """
+    points = [(float(x), float(y)) for x, y in points]
+    hits: List[List[Shape]] = [[] for _ in points]
+
+    if np is not None and points:
+        _batch_contains(map, points, hits)
+    else:
+        for indices, candidates in map.spatial_index.group_points(points):
+            for shape_id in candidates:
+                shape = map.get_shape(shape_id)
+                for i in indices:
+                    if _shape_contains_point(shape, *points[i]):
+                        hits[i].append(shape)
+
+    if not csr:
+        return hits
+    indptr = [0]
+    flat: List[Shape] = []
+    for point_hits in hits:
+        flat.extend(point_hits)
+        indptr.append(len(flat))
+    return indptr, flat
+
 def polygons_intersect(poly1: List[Tuple[float, float]], poly2: List[Tuple[float, float]]) -> bool:
     """
     Check if two polygons intersect.
+
+    From SWEEP_MIN_VERTICES vertices in total, the edges are checked with a
+    sweep line (see boundaries_intersect for its cost) and, if
+    no edges touch, one vertex of each polygon is tested for containment in
+    the other. Polygons that turn out not to be simple, and smaller inputs,
+    get the vertex containment and all-pairs edge tests.
     
     Args:
         poly1: List of vertices for first polygon [(x1, y1), (x2, y2), ...]
         poly2: List of vertices for second polygon [(x1, y1), (x2, y2), ...]
         
     Returns:
-        True if polygons intersect, False otherwise
+        True if polygons intersect, False otherwise; False if either has
+        no vertices
     """
+    if not poly1 or not poly2:
+        return False
+    if not _boxes_overlap(vertices_bbox(poly1), vertices_bbox(poly2)):
+        return False
+
+    if len(poly1) + len(poly2) >= SWEEP_MIN_VERTICES:
+        touching = boundaries_intersect(poly1, poly2)
+        if touching is not None:
+            return (touching or ShapeUtils.is_point_inside_polygon(poly1[0], poly2)
+                    or ShapeUtils.is_point_inside_polygon(poly2[0], poly1))
+
     # Check if any vertex of one polygon is inside the other
     if any(ShapeUtils.is_point_inside_polygon_way2(p, poly2) for p in poly1) or any(ShapeUtils.is_point_inside_polygon_way2(p, poly1) for p in poly2):
         return True
@@ -0,0 +1,222 @@
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+from bisect import bisect_left, bisect_right, insort
+import math
+
+
+class AreaIndex:
+    """
+    Sorted index of item areas supporting logarithmic lookups.
+
+    Entries are kept in a list ordered by (area, insertion sequence), so
+    items with equal areas are reported in the order they were added.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._entries: List[Tuple[float, int]] = []
+        self._keys: Dict[Tuple[float, int], Hashable] = {}
+        self._by_key: Dict[Hashable, Tuple[float, int]] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._by_key
+
+    def insert(self, key: Hashable, area: float) -> None:
+        """
+        Add an item to the index.
+
+        Args:
+            key: Hashable identifier of the item
+            area: Area of the item
+
+        Raises:
+            KeyError: If the key is already indexed
+        """
+        if key in self._by_key:
+            raise KeyError(f"Item {key!r} is already indexed")
+        entry = (area, self._seq)
+        self._seq += 1
+        insort(self._entries, entry)
+        self._keys[entry] = key
+        self._by_key[key] = entry
+
+    def insert_many(self, items: Iterable[Tuple[Hashable, float]]) -> None:
+        """
+        Add many items to the index with a single sort.
+
+        Args:
+            items: Iterable of (key, area) pairs
+
+        Raises:
+            KeyError: If a key is already indexed or repeated, in which case
+                no item is added
+        """
+        items = list(items)
+        keys = {key for key, _ in items}
+        if len(keys) != len(items) or any(key in self._by_key for key in keys):
+            raise KeyError('Items are already indexed or repeated')
+        for key, area in items:
+            entry = (area, self._seq)
+            self._seq += 1
+            self._entries.append(entry)
+            self._keys[entry] = key
+            self._by_key[key] = entry
+        self._entries.sort()
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove an item from the index.
+
+        Args:
+            key: Identifier of the item
+
+        Raises:
+            KeyError: If the key is not indexed
+        """
+        entry = self._by_key.pop(key)
+        del self._keys[entry]
+        del self._entries[bisect_left(self._entries, entry)]
+
+    def remove_many(self, keys: Iterable[Hashable]) -> None:
+        """
+        Remove many items from the index in a single pass.
+
+        Args:
+            keys: Identifiers of the items
+
+        Raises:
+            KeyError: If a key is not indexed, in which case no item is removed
+        """
+        keys = set(keys)
+        if not all(key in self._by_key for key in keys):
+            raise KeyError('Items are not indexed')
+        removed = set()
+        for key in keys:
+            entry = self._by_key.pop(key)
+            del self._keys[entry]
+            removed.add(entry)
+        self._entries = [entry for entry in self._entries if entry not in removed]
+
+    def update(self, key: Hashable, area: float) -> None:
+        """
+        Replace the area stored for an item.
+
+        Args:
+            key: Identifier of the item
+            area: New area of the item
+
+        Raises:
+            KeyError: If the key is not indexed
+        """
+        if self._by_key[key][0] == area:
+            return
+        self.remove(key)
+        self.insert(key, area)
+
+    def update_many(self, items: Iterable[Tuple[Hashable, float]]) -> None:
+        """
+        Replace the areas stored for many items with a single re-sort.
+
+        Args:
+            items: Iterable of (key, area) pairs
+
+        Raises:
+            KeyError: If a key is not indexed, in which case no item is updated
+        """
+        items = list(items)
+        if not all(key in self._by_key for key, _ in items):
+            raise KeyError('Items are not indexed')
+        changed = dict((key, area) for key, area in items if self._by_key[key][0] != area)
+        if len(changed) == 1:
+            self.update(*changed.popitem())
+        elif changed:
+            self.remove_many(changed)
+            self.insert_many(changed.items())
+
+    def area(self, key: Hashable) -> float:
+        """
+        Get the area stored for an item.
+
+        Args:
+            key: Identifier of the item
+
+        Returns:
+            The indexed area
+        """
+        return self._by_key[key][0]
+
+    def find(self, area: float, abs_tol: float = 0.0, rel_tol: float = 0.0) -> List[Hashable]:
+        """
+        Find items whose area matches a value.
+
+        Matching follows math.isclose, so with both tolerances at zero only
+        exactly equal areas are returned.
+
+        Args:
+            area: The target area value
+            abs_tol: Maximum absolute difference (default: 0.0)
+            rel_tol: Maximum difference relative to the larger area (default: 0.0)
+
+        Returns:
+            Keys of matching items ordered by area
+
+        Raises:
+            ValueError: If a tolerance is negative or rel_tol is not below 1
+        """
+        if abs_tol < 0 or rel_tol < 0:
+            raise ValueError('Tolerances must be non-negative')
+        if rel_tol >= 1:
+            raise ValueError('Relative tolerance must be less than 1')
+        # Widest window any isclose match can fall into
+        delta = max(abs_tol, rel_tol * abs(area) / (1 - rel_tol))
+        return [key for key in self.find_range(area - delta, area + delta)
+                if math.isclose(self._by_key[key][0], area, rel_tol=rel_tol, abs_tol=abs_tol)]
+
+    def find_range(self, min_area: Optional[float] = None,
+                   max_area: Optional[float] = None) -> List[Hashable]:
+        """
+        Find items whose area lies in a closed interval.
+
+        Args:
+            min_area: Lower bound, or None for no lower bound
+            max_area: Upper bound, or None for no upper bound
+
+        Returns:
+            Keys of matching items ordered by area
+        """
+        entries = self._entries
+        lo = 0 if min_area is None else bisect_left(entries, (min_area, -1))
+        hi = len(entries) if max_area is None else bisect_right(entries, (max_area, self._seq))
+        keys = self._keys
+        return [keys[entry] for entry in entries[lo:hi]]
+
+    def smallest(self, k: int) -> List[Hashable]:
+        """
+        Get the items with the smallest areas.
+
+        Args:
+            k: Number of items to return
+
+        Returns:
+            Up to k keys in ascending order of area
+        """
+        keys = self._keys
+        return [keys[entry] for entry in self._entries[:max(k, 0)]]
+
+    def largest(self, k: int) -> List[Hashable]:
+        """
+        Get the items with the largest areas.
+
+        Args:
+            k: Number of items to return
+
+        Returns:
+            Up to k keys in descending order of area
+        """
+        if k <= 0:
+            return []
+        keys = self._keys
+        return [keys[entry] for entry in reversed(self._entries[-k:])]
@@ -0,0 +1,93 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+import functools
+
+Kernel = Callable[[Any, Any], Any]
+
+
+class KernelRegistry:
+    """
+    Table of kernels for pairs of shape types.
+
+    A kernel registered for (type1, type2) also applies to subclasses of
+    those types, so labelled and colored shapes share the kernels of their
+    base shapes. The lookup for a pair of concrete types walks both method
+    resolution orders once, with the first argument's MRO taking
+    precedence, and is then cached until the next registration.
+
+    A wrapper set with instrument is applied to each kernel as it is
+    resolved, so calls pay nothing extra while no wrapper is set.
+    """
+
+    def __init__(self, default: Kernel):
+        """
+        Initialize an empty registry.
+
+        Args:
+            default: Kernel used for type pairs without a registered kernel
+        """
+        self._default = default
+        self._kernels: Dict[Tuple[type, type], Kernel] = {}
+        self._resolved: Dict[Tuple[type, type], Kernel] = {}
+        self._wrapper: Optional[Callable[[type, type, Kernel], Kernel]] = None
+
+    def register(self, type1: type, type2: type, kernel: Kernel, symmetric: bool = True) -> None:
+        """
+        Register the kernel for a pair of types.
+
+        Args:
+            type1: Type of the first argument
+            type2: Type of the second argument
+            kernel: Function called with (first, second)
+            symmetric: Also use the kernel, with swapped arguments, for
+                (type2, type1) (default: True)
+        """
+        self._kernels[(type1, type2)] = kernel
+        if symmetric and type1 is not type2:
+            self._kernels[(type2, type1)] = functools.wraps(kernel)(lambda second, first: kernel(first, second))
+        self._resolved.clear()
+
+    def instrument(self, wrapper: Optional[Callable[[type, type, Kernel], Kernel]]) -> None:
+        """
+        Set or remove the wrapper applied to resolved kernels.
+
+        Args:
+            wrapper: Function called with (type1, type2, kernel) when the
+                kernel for a pair of concrete types is resolved, returning
+                the kernel to use instead; None to use the kernels as
+                registered
+        """
+        self._wrapper = wrapper
+        self._resolved.clear()
+
+    def resolve(self, type1: type, type2: type) -> Kernel:
+        """
+        Find the kernel for a pair of concrete types.
+
+        Args:
+            type1: Type of the first argument
+            type2: Type of the second argument
+
+        Returns:
+            The most specific registered kernel, or the default kernel
+        """
+        key = (type1, type2)
+        kernel = self._resolved.get(key)
+        if kernel is None:
+            kernel = self._default
+            for base1 in type1.__mro__:
+                match = next((self._kernels[(base1, base2)] for base2 in type2.__mro__
+                              if (base1, base2) in self._kernels), None)
+                if match is not None:
+                    kernel = match
+                    break
+            if self._wrapper is not None:
+                kernel = self._wrapper(type1, type2, kernel)
+            self._resolved[key] = kernel
+        return kernel
+
+    def __call__(self, first: Any, second: Any) -> Any:
+        """Apply the kernel for the types of the two arguments."""
+        kernel = self._resolved.get((type(first), type(second)))
+        if kernel is None:
+            kernel = self.resolve(type(first), type(second))
+        return kernel(first, second)
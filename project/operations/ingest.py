@@ -0,0 +1,245 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+from itertools import chain, islice
+from shapes.base import Shape
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.primitives import LabelledColoredTriangle, LabelledColoredRectangle, LabelledColoredCircle
+from shapes.poligons import Polygon
+from operations.algorithms import Map
+import csv
+import json
+import math
+import time
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Rows read between progress reports; JSON Lines are also decoded this
+# many lines per call to the JSON parser
+CHUNK_SIZE = 10_000
+
+# Positional constructor arguments of each primitive, with their defaults;
+# None marks a required value
+_PRIMITIVE_FIELDS = {
+    Triangle: (('a', None), ('b', None), ('c', None), ('x', 0.0), ('y', 0.0), ('angle', 0.0)),
+    Rectangle: (('a', None), ('b', None), ('x', 0.0), ('y', 0.0), ('angle', 0.0)),
+    Circle: (('r', None), ('x', 0.0), ('y', 0.0), ('angle', 0.0)),
+}
+_LABELLED = {
+    LabelledColoredTriangle: Triangle,
+    LabelledColoredRectangle: Rectangle,
+    LabelledColoredCircle: Circle,
+}
+# Lower-case class name to shape type, its fields and whether it is labelled
+_SPECS = {cls.__name__.lower(): (cls, fields, False) for cls, fields in _PRIMITIVE_FIELDS.items()}
+_SPECS.update({cls.__name__.lower(): (cls, _PRIMITIVE_FIELDS[base], True) for cls, base in _LABELLED.items()})
+_SPECS[Polygon.__name__.lower()] = (Polygon, (('angle', 0.0),), False)
+
+_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.json': 'jsonl'}
+
+
+def _number(row: Dict[str, Any], name: str, default: Optional[float]) -> float:
+    """A finite value; required values are sizes and must also be positive."""
+    value = row.get(name)
+    if value is None or value == '':
+        if default is None:
+            raise ValueError(f"Missing value for {name!r}")
+        return default
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError(f"Value for {name!r} is not finite")
+    if default is None and number <= 0:
+        raise ValueError(f"Value for {name!r} must be positive")
+    return number
+
+
+def _text(row: Dict[str, Any], name: str, default: str) -> str:
+    """A text value, such as a color or label."""
+    value = row.get(name)
+    if value is None or value == '':
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"Value for {name!r} must be text")
+    return value
+
+
+def _coords(value: Any) -> List[float]:
+    """Interleaved coordinates from 'x y x y ...' text, [[x, y], ...] or [x, y, ...]."""
+    if value is None or value == '':
+        raise ValueError("Missing value for 'vertices'")
+    if isinstance(value, str):
+        value = value.replace(',', ' ').split()
+    if value and isinstance(value[0], (list, tuple)):
+        value = chain.from_iterable(value)
+    coords = [float(coord) for coord in value]
+    if not all(map(math.isfinite, coords)):
+        raise ValueError("Vertex coordinates must be finite")
+    return coords
+
+
+def build_shape(row: Dict[str, Any]) -> Shape:
+    """
+    Build a shape from a row of a CSV or JSON Lines file.
+
+    The 'type' column holds the class name, in any case. The other
+    columns are the constructor arguments by name; x, y and angle default
+    to 0, color to 'black' and label to ''. Polygon vertices are given as
+    'x y x y ...' text or as a list of [x, y] pairs. Empty values count as
+    missing. Sizes must be positive, the sides of a triangle must satisfy
+    the triangle inequality, every value must be finite and color and
+    label must be text.
+
+    Args:
+        row: Mapping of column name to value
+
+    Returns:
+        The new shape
+
+    Raises:
+        ValueError: If the type is unknown or a value is missing or invalid
+    """
+    type_name = row.get('type')
+    spec = _SPECS.get(str(type_name).lower())
+    if spec is None:
+        raise ValueError(f"Unknown shape type {type_name!r}")
+    cls, fields, labelled = spec
+    values = [_number(row, name, default) for name, default in fields]
+    if issubclass(cls, Triangle):
+        a, b, c = sorted(values[:3])
+        if a + b <= c:
+            raise ValueError(f"Sides {values[:3]} do not form a triangle")
+    if cls is Polygon:
+        return Polygon.from_coords(_coords(row.get('vertices')), *values)
+    if labelled:
+        return cls(*values, color=_text(row, 'color', 'black'), label=_text(row, 'label', ''))
+    return cls(*values)
+
+
+def _csv_rows(file: TextIO) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Rows of a CSV file with a header line, with the line each ends on."""
+    reader = csv.DictReader(file)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def _jsonl_rows(file: TextIO, chunk_size: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Objects of a JSON Lines file with their line numbers, decoded a chunk of lines at a time."""
+    line_number = 0
+    while True:
+        lines = list(islice(file, chunk_size))
+        if not lines:
+            return
+        numbered = [(line_number + i, line) for i, line in enumerate(lines, 1) if line.strip()]
+        line_number += len(lines)
+        # One parser call per chunk; a line holding several values, or none,
+        # changes the count and sends the chunk down the per-line path
+        try:
+            rows = json.loads('[' + ','.join(line for _, line in numbered) + ']')
+        except ValueError:
+            rows = None
+        if rows is None or len(rows) != len(numbered):
+            rows = []
+            for number, line in numbered:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError as error:
+                    raise ValueError(f"line {number}: {error}") from None
+        for (number, _), row in zip(numbered, rows):
+            if not isinstance(row, dict):
+                raise ValueError(f"line {number}: Expected a JSON object")
+            yield number, row
+
+
+def iter_shapes(path: str, file_format: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[Shape]:
+    """
+    Read shapes from a CSV or JSON Lines file one at a time.
+
+    The file is streamed, so only one chunk of its text is held in memory
+    at a time.
+
+    Args:
+        path: Path of the file
+        file_format: 'csv' or 'jsonl'; by default taken from the file extension
+        chunk_size: Lines of JSON decoded per parser call (default: CHUNK_SIZE)
+
+    Yields:
+        The shape described by each row
+
+    Raises:
+        ValueError: If the format is unknown, or a row cannot be read or
+            does not describe a valid shape; the message names the line
+    """
+    if file_format is None:
+        file_format = _FORMATS.get(os.path.splitext(path)[1].lower())
+    if file_format not in ('csv', 'jsonl'):
+        raise ValueError(f"Unknown file format for {path}")
+
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = _csv_rows(file) if file_format == 'csv' else _jsonl_rows(file, chunk_size)
+        try:
+            for line_number, row in rows:
+                try:
+                    shape = build_shape(row)
+                except (ValueError, TypeError) as error:
+                    raise ValueError(f"line {line_number}: {error}") from None
+                yield shape
+        except (ValueError, csv.Error) as error:
+            raise ValueError(f"{path}, {error}") from None
+
+
+class IngestReport:
+    """Number of rows ingest has read and the time it took."""
+
+    __slots__ = ('rows', 'seconds')
+
+    def __init__(self, rows: int = 0, seconds: float = 0.0):
+        self.rows = rows
+        self.seconds = seconds
+
+    @property
+    def rows_per_second(self) -> float:
+        """Rows read per second of wall-clock time."""
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return (f"IngestReport(rows={self.rows}, seconds={self.seconds:.3f}, "
+                f"rows_per_second={self.rows_per_second:.0f})")
+
+
+def ingest(shape_map: Map, path: str, file_format: Optional[str] = None, chunk_size: int = CHUNK_SIZE,
+           progress: Optional[Callable[[IngestReport], None]] = None) -> IngestReport:
+    """
+    Add every shape in a CSV or JSON Lines file to a map.
+
+    All rows are parsed and validated before the map is touched, then the
+    shapes are added with one add_shapes call, which indexes them as a
+    single batch. If any row is invalid the map is left unchanged.
+
+    Args:
+        shape_map: The Map to add the shapes to
+        path: Path of the file
+        file_format: 'csv' or 'jsonl'; by default taken from the file extension
+        chunk_size: Rows read between progress reports (default: CHUNK_SIZE)
+        progress: Called with the report so far after every chunk of rows
+
+    Returns:
+        Rows read, including the time to add them to the map
+
+    Raises:
+        ValueError: If the format is unknown, or a row cannot be read or
+            does not describe a valid shape; the message names the line
+    """
+    start = time.perf_counter()
+    report = IngestReport()
+    shapes: List[Shape] = []
+    for shape in iter_shapes(path, file_format, chunk_size):
+        shapes.append(shape)
+        if progress is not None and len(shapes) % chunk_size == 0:
+            report.rows = len(shapes)
+            report.seconds = time.perf_counter() - start
+            progress(report)
+    shape_map.add_shapes(shapes)
+    report.rows = len(shapes)
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,266 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from time import perf_counter
+from operations import algorithms
+from operations.algorithms import Map
+from operations.dispatch import Kernel, KernelRegistry
+from utils.geometry import ShapeUtils
+import functools
+import inspect
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level functions of operations.algorithms that are timed, including
+# the containment and boundary tests behind the public queries
+FUNCTIONS = (
+    'check_crossing', 'distance_between_shapes', 'distance_matrix', 'polygons_intersect',
+    'search_shapes_by_area', 'search_shapes_by_area_range', 'largest_shapes', 'smallest_shapes',
+    'search_shapes_by_position', 'search_shapes_by_positions', '_shape_contains_point', '_batch_contains',
+    'boundaries_intersect',
+)
+MAP_METHODS = (
+    'add_shape', 'add_shapes', 'remove_shape', 'remove_shapes', 'update_shape', 'transform',
+    'total_area', 'total_perimeter', 'totals_by_type', 'totals_by_color', 'find_all_crossings',
+    'nearest', 'save', 'load', 'from_snapshot',
+)
+REGISTRIES: Dict[str, KernelRegistry] = {
+    'crossing': algorithms._crossing_kernels,
+    'distance': algorithms._distance_kernels,
+}
+
+# [calls, seconds] per function name, or per (registry, type1, type2, kernel)
+# for kernels; the wrappers hold on to their record, so it is never replaced
+_records: Dict[Any, List[float]] = {}
+# (owner, name, original attribute) of every patched attribute
+_patches: List[Tuple[Any, str, Any]] = []
+
+
+def _record(key: Any) -> List[float]:
+    return _records.setdefault(key, [0, 0.0])
+
+
+def _timed(function: Callable, record: List[float]) -> Callable:
+    """Wrap a function to count its calls and add up the time spent in them."""
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def timed_generator(*args, **kwargs):
+            # Only the time spent producing items counts, not the caller's
+            # time between them
+            record[0] += 1
+            start = perf_counter()
+            iterator = function(*args, **kwargs)
+            try:
+                while True:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        return
+                    finally:
+                        record[1] += perf_counter() - start
+                    yield item
+                    start = perf_counter()
+            finally:
+                iterator.close()
+        return timed_generator
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record[0] += 1
+            record[1] += perf_counter() - start
+    return timed
+
+
+def _patch(owner: Any, name: str, replacement: Any) -> None:
+    _patches.append((owner, name, owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)))
+    setattr(owner, name, replacement)
+
+
+def _patch_method(cls: type, name: str) -> None:
+    """Replace a method, static method or class method of cls with a timed one."""
+    attribute = cls.__dict__[name]
+    record = _record(f"{cls.__name__}.{name}")
+    if isinstance(attribute, (staticmethod, classmethod)):
+        _patch(cls, name, type(attribute)(_timed(attribute.__func__, record)))
+    else:
+        _patch(cls, name, _timed(attribute, record))
+
+
+def _kernel_wrapper(registry: str) -> Callable[[type, type, Kernel], Kernel]:
+    def wrap(type1: type, type2: type, kernel: Kernel) -> Kernel:
+        name = getattr(kernel, '__name__', type(kernel).__name__)
+        return _timed(kernel, _record((registry, type1.__name__, type2.__name__, name)))
+    return wrap
+
+
+def is_enabled() -> bool:
+    """Whether the instrumentation is currently enabled."""
+    return bool(_patches)
+
+
+def enable() -> None:
+    """
+    Start counting calls and time in the hot paths.
+
+    The functions of operations.algorithms listed in FUNCTIONS, the Map
+    methods listed in MAP_METHODS and the public static methods of
+    ShapeUtils are replaced by timed wrappers; the functions are also
+    replaced in every loaded module that imported them by name. The shape
+    pair kernels of check_crossing and distance_between_shapes are timed
+    per pair of concrete shape types. Times are inclusive: a function's
+    time includes that of the instrumented functions it calls.
+
+    Nothing is wrapped while disabled, so the instrumentation costs
+    nothing until it is enabled. Only the current process is measured,
+    not the workers of a ParallelMap. Enabling again has no effect.
+    """
+    if _patches:
+        return
+    for name in FUNCTIONS:
+        original = getattr(algorithms, name)
+        timed = _timed(original, _record(name))
+        for module in list(sys.modules.values()):
+            if getattr(module, '__dict__', {}).get(name) is original:
+                _patch(module, name, timed)
+    for name in MAP_METHODS:
+        _patch_method(Map, name)
+    for name, attribute in list(ShapeUtils.__dict__.items()):
+        if isinstance(attribute, staticmethod) and not name.startswith('_'):
+            _patch_method(ShapeUtils, name)
+    for name, registry in REGISTRIES.items():
+        registry.instrument(_kernel_wrapper(name))
+
+
+def disable() -> None:
+    """Restore the original functions and kernels; the counts are kept."""
+    for registry in REGISTRIES.values():
+        registry.instrument(None)
+    while _patches:
+        owner, name, original = _patches.pop()
+        setattr(owner, name, original)
+
+
+def reset() -> None:
+    """Set every count and time back to zero."""
+    for record in _records.values():
+        record[0] = 0
+        record[1] = 0.0
+
+
+def _totals() -> Dict[Any, Tuple[int, float]]:
+    return {key: (int(calls), seconds) for key, (calls, seconds) in _records.items()}
+
+
+def _stats(totals: Dict[Any, Tuple[int, float]]) -> Dict[str, Dict[str, Any]]:
+    functions: Dict[str, Dict[str, Any]] = {}
+    kernels: Dict[str, Dict[str, Any]] = {name: {} for name in REGISTRIES}
+    for key, (calls, seconds) in sorted(totals.items(), key=lambda item: str(item[0])):
+        if not calls:
+            continue
+        if isinstance(key, tuple):
+            registry, type1, type2, kernel = key
+            kernels[registry][f"{type1},{type2}"] = {'kernel': kernel, 'calls': calls, 'seconds': seconds}
+        else:
+            functions[key] = {'calls': calls, 'seconds': seconds}
+    return {'functions': functions, 'kernels': kernels}
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """
+    Counts and times recorded since the last reset.
+
+    Returns:
+        {'functions': {name: {'calls', 'seconds'}}, 'kernels': {registry:
+        {'Type1,Type2': {'kernel', 'calls', 'seconds'}}}} with the
+        registries 'crossing' and 'distance'; entries without calls are
+        left out
+    """
+    return _stats(_totals())
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus(stats: Optional[Dict[str, Dict[str, Any]]] = None, prefix: str = 'shapes') -> str:
+    """
+    Format counts and times in the Prometheus text exposition format.
+
+    Args:
+        stats: Result of snapshot or of a profile (default: the current snapshot)
+        prefix: Prefix of the metric names (default: 'shapes')
+
+    Returns:
+        Counters {prefix}_function_calls_total and
+        {prefix}_function_seconds_total labelled by function, and
+        {prefix}_kernel_calls_total and {prefix}_kernel_seconds_total
+        labelled by registry, kernel, type1 and type2
+    """
+    stats = snapshot() if stats is None else stats
+    functions = [(f'function="{_label(name)}"', entry) for name, entry in stats['functions'].items()]
+    kernels = []
+    for registry, pairs in stats['kernels'].items():
+        for pair, entry in pairs.items():
+            type1, type2 = pair.split(',')
+            kernels.append((f'registry="{_label(registry)}",kernel="{_label(entry["kernel"])}",'
+                            f'type1="{_label(type1)}",type2="{_label(type2)}"', entry))
+
+    lines = []
+    for kind, samples in (('function', functions), ('kernel', kernels)):
+        for field, unit in (('calls', 'Calls'), ('seconds', 'Seconds spent in')):
+            metric = f"{prefix}_{kind}_{field}_total"
+            lines.append(f"# HELP {metric} {unit} instrumented {kind}s.")
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f"{metric}{{{labels}}} {entry[field]!r}" for labels, entry in samples)
+    return '\n'.join(lines) + '\n'
+
+
+class Profile:
+    """Counts and times recorded during one profile block."""
+
+    __slots__ = ('stats',)
+
+    def __init__(self):
+        # Filled in when the block ends, in the format of snapshot
+        self.stats: Dict[str, Dict[str, Any]] = {'functions': {}, 'kernels': {name: {} for name in REGISTRIES}}
+
+    def prometheus(self, prefix: str = 'shapes') -> str:
+        """The block's counts and times in the Prometheus text format."""
+        return prometheus(self.stats, prefix)
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """
+    Profile a block of Map operations.
+
+    The instrumentation is enabled for the block, unless it already was,
+    and disabled again afterwards. Calls made in the block are counted in
+    the global snapshot as well.
+
+    Example:
+        with profile() as result:
+            list(shape_map.find_all_crossings())
+        print(result.stats['kernels']['crossing'])
+
+    Returns:
+        Context manager giving a Profile, whose stats hold the counts and
+        times of the block once it ends
+    """
+    was_enabled = is_enabled()
+    before = _totals()
+    result = Profile()
+    enable()
+    try:
+        yield result
+    finally:
+        if not was_enabled:
+            disable()
+        result.stats = _stats({key: (calls - before.get(key, (0, 0.0))[0], seconds - before.get(key, (0, 0.0))[1])
+                               for key, (calls, seconds) in _totals().items()})
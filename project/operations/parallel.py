@@ -0,0 +1,247 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from operations.algorithms import Map, check_crossing, search_shapes_by_positions
+from operations.snapshot import Snapshot
+from operations.spatial_index import sweep_and_prune
+from shapes.base import Shape
+import io
+import math
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+Tile = Tuple[float, float, float, float]
+
+# Copy of the published map, built once in each worker process
+_worker_map: Optional[Map] = None
+
+
+def _start_worker(block_name: str) -> None:
+    """Build this worker's copy of the map from the snapshot in shared memory."""
+    global _worker_map
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        with Snapshot(block.buf) as snapshot:
+            _worker_map = Map.from_snapshot(snapshot)
+    finally:
+        block.close()
+
+
+def _positions_task(points: List[Tuple[float, float]]) -> List[List[int]]:
+    shape_id = _worker_map.shape_id
+    return [sorted(map(shape_id, hits)) for hits in search_shapes_by_positions(_worker_map, points)]
+
+
+def _areas_task(areas: List[float], abs_tol: float, rel_tol: float) -> List[List[int]]:
+    find = _worker_map.area_index.find
+    return [sorted(find(area, abs_tol=abs_tol, rel_tol=rel_tol)) for area in areas]
+
+
+def _crossings_task(query: Tile, owned: Tile) -> List[Tuple[int, int]]:
+    """
+    Crossing pairs whose bounding boxes overlap in a corner that lies in the owned area.
+
+    The lower-left corner of the overlap of two boxes lies in both of
+    them, so both shapes are found by the query, and in exactly one tile
+    of a grid whose tiles own half-open areas.
+    """
+    index = _worker_map.spatial_index
+    get_shape = _worker_map.get_shape
+    own_x0, own_y0, own_x1, own_y1 = owned
+    entries = [(shape_id, index.bbox(shape_id)) for shape_id in sorted(index.query_bbox(query))]
+    pairs = []
+    for id1, id2 in sweep_and_prune(entries):
+        box1, box2 = index.bbox(id1), index.bbox(id2)
+        corner_x, corner_y = max(box1[0], box2[0]), max(box1[1], box2[1])
+        if (own_x0 <= corner_x < own_x1 and own_y0 <= corner_y < own_y1
+                and check_crossing(get_shape(id1), get_shape(id2))):
+            pairs.append((id1, id2))
+    return pairs
+
+
+class ParallelMap:
+    """
+    Runs queries on a Map across a pool of worker processes.
+
+    The map is written once as a snapshot into a shared memory block, from
+    which each worker builds its own copy as it starts; after that, tasks
+    carry only query arguments and return shape IDs, which are turned back
+    into the shapes of the original map. The extent of the map is cut into
+    a grid of tiles: point queries are grouped by the tile each point falls
+    in, and crossings are found one tile at a time.
+
+    The workers see the map as it was when the pool was started or last
+    refreshed; call refresh() after changing the map.
+
+    Only the snapshot is shared: each worker decodes it into a Map of its
+    own, so every process holds a full copy of the shapes and their
+    indexes, and memory use grows with the number of workers. Since the
+    map is published as a snapshot, it may only hold the built-in shape
+    types; shapes of other types, subclasses included, raise TypeError
+    when the map is published.
+
+    Queries find the same shapes as the serial functions, but every list
+    of results is ordered by shape ID rather than in the order the serial
+    function gives.
+    """
+
+    def __init__(self, map: Map, workers: Optional[int] = None, tiles_per_side: Optional[int] = None):
+        """
+        Publish a map and start the worker processes.
+
+        Args:
+            map: The collection of shapes to query
+            workers: Number of worker processes (default: os.cpu_count())
+            tiles_per_side: Tiles along each axis of the grid (default: enough
+                for about four tiles per worker)
+
+        Raises:
+            TypeError: If the map holds a shape that cannot be written to a
+                snapshot, such as an instance of a shape subclass
+        """
+        self.map = map
+        self.workers = workers or os.cpu_count() or 1
+        self.tiles_per_side = tiles_per_side or math.isqrt(4 * self.workers - 1) + 1
+        self._block: Optional[shared_memory.SharedMemory] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Publish the current state of the map and restart the workers.
+
+        Raises:
+            TypeError: If the map holds a shape that cannot be written to a
+                snapshot; the old workers are stopped all the same
+        """
+        self.close()
+        buffer = io.BytesIO()
+        self.map.save(buffer)
+        data = buffer.getbuffer()
+        self._block = shared_memory.SharedMemory(create=True, size=len(data))
+        self._block.buf[:len(data)] = data
+        data.release()
+        self._tiles = self._grid()
+        self._executor = ProcessPoolExecutor(self.workers, initializer=_start_worker,
+                                             initargs=(self._block.name,))
+
+    def close(self) -> None:
+        """Stop the workers and free the shared memory block."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+    def __enter__(self) -> 'ParallelMap':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _grid(self) -> List[Tuple[Tile, Tile]]:
+        """
+        The query box and owned area of each tile, row by row.
+
+        Query boxes cover the extent of the map; the owned areas are
+        half-open and the outer ones reach to infinity, so every point
+        belongs to exactly one tile.
+        """
+        boxes = [box for _, box in self.map.spatial_index.items()]
+        self._extent = None
+        if not boxes:
+            return [((0.0, 0.0, 0.0, 0.0), (-math.inf, -math.inf, math.inf, math.inf))]
+        self._extent = (min(box[0] for box in boxes), min(box[1] for box in boxes),
+                        max(box[2] for box in boxes), max(box[3] for box in boxes))
+        min_x, min_y, max_x, max_y = self._extent
+        n = self.tiles_per_side
+        xs = [min_x + (max_x - min_x) * i / n for i in range(n + 1)]
+        ys = [min_y + (max_y - min_y) * i / n for i in range(n + 1)]
+        own_xs = [-math.inf] + xs[1:-1] + [math.inf]
+        own_ys = [-math.inf] + ys[1:-1] + [math.inf]
+        return [((xs[i], ys[j], xs[i + 1], ys[j + 1]), (own_xs[i], own_ys[j], own_xs[i + 1], own_ys[j + 1]))
+                for j in range(n) for i in range(n)]
+
+    def _tile_of(self, x: float, y: float) -> int:
+        """Index of the tile a point falls in, the nearest one for points outside the map."""
+        if len(self._tiles) == 1:
+            return 0
+        min_x, min_y, max_x, max_y = self._extent
+        n = self.tiles_per_side
+        i = int((x - min_x) / (max_x - min_x) * n) if max_x > min_x else 0
+        j = int((y - min_y) / (max_y - min_y) * n) if max_y > min_y else 0
+        return min(max(j, 0), n - 1) * n + min(max(i, 0), n - 1)
+
+    def _shapes(self, ids: List[int]) -> List[Shape]:
+        get_shape = self.map.get_shape
+        return [get_shape(shape_id) for shape_id in ids]
+
+    def search_shapes_by_positions(self, points: Sequence[Tuple[float, float]]) -> List[List[Shape]]:
+        """
+        Find the shapes containing each of many points.
+
+        The same shapes as search_shapes_by_positions finds, which lists
+        them in the order of Map.shapes instead.
+
+        Args:
+            points: Sequence of (x, y) coordinates
+
+        Returns:
+            One list of containing shapes per point, ordered by shape ID
+        """
+        points = [(float(x), float(y)) for x, y in points]
+        by_tile: Dict[int, List[int]] = {}
+        for i, (x, y) in enumerate(points):
+            by_tile.setdefault(self._tile_of(x, y), []).append(i)
+        groups = list(by_tile.values())
+        results = self._executor.map(_positions_task, [[points[i] for i in group] for group in groups])
+
+        hits: List[List[Shape]] = [[] for _ in points]
+        for group, group_hits in zip(groups, results):
+            for i, ids in zip(group, group_hits):
+                hits[i] = self._shapes(ids)
+        return hits
+
+    def search_shapes_by_areas(self, areas: Sequence[float], abs_tol: float = 0.0,
+                               rel_tol: float = 0.0) -> List[List[Shape]]:
+        """
+        Find the shapes with each of many areas.
+
+        The same shapes as search_shapes_by_area finds, which lists them
+        in order of area instead.
+
+        Args:
+            areas: The target area values
+            abs_tol: Maximum absolute difference (default: 0.0)
+            rel_tol: Maximum relative difference (default: 0.0)
+
+        Returns:
+            One list of matching shapes per area, ordered by shape ID
+        """
+        areas = list(areas)
+        size = max(1, math.ceil(len(areas) / self.workers))
+        chunks = [areas[i:i + size] for i in range(0, len(areas), size)]
+        results = self._executor.map(_areas_task, chunks, [abs_tol] * len(chunks), [rel_tol] * len(chunks))
+        return [self._shapes(ids) for chunk_hits in results for ids in chunk_hits]
+
+    def find_all_crossings(self) -> List[Tuple[Shape, Shape]]:
+        """
+        Find every pair of intersecting shapes.
+
+        The same pairs as Map.find_all_crossings finds, which yields them
+        in the order of its sweep instead.
+
+        Returns:
+            (shape1, shape2) pairs that intersect, with shape1 added to the
+            map before shape2, ordered by the IDs of shape1 and shape2
+        """
+        queries, owned = zip(*self._tiles)
+        pairs = sorted(pair for tile_pairs in self._executor.map(_crossings_task, queries, owned)
+                       for pair in tile_pairs)
+        get_shape = self.map.get_shape
+        return [(get_shape(id1), get_shape(id2)) for id1, id2 in pairs]
@@ -0,0 +1,148 @@
+from typing import List, Optional, Tuple
+
+Point = Tuple[float, float]
+
+
+class _Segment:
+    """Polygon edge oriented from its lexicographically smaller endpoint."""
+
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'slope', 'owner', 'index')
+
+    def __init__(self, p: Point, q: Point, owner: int, index: int):
+        if q < p:
+            p, q = q, p
+        self.x1, self.y1 = p
+        self.x2, self.y2 = q
+        self.slope = (self.y2 - self.y1) / (self.x2 - self.x1) if self.x2 != self.x1 else float('inf')
+        self.owner = owner
+        self.index = index
+
+    def y_at(self, x: float, y: float) -> float:
+        """Height of the segment on the sweep line through the event point (x, y)."""
+        if self.x1 == self.x2:
+            # Vertical segments are tilted slightly: they meet the line at the event
+            return min(max(y, self.y1), self.y2)
+        if x == self.x1:
+            return self.y1
+        if x == self.x2:
+            return self.y2
+        return self.y1 + (x - self.x1) * self.slope
+
+
+def _orientation(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> float:
+    """Twice the signed area of the triangle abc, > 0 for a left turn."""
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _on_segment(s: _Segment, x: float, y: float) -> bool:
+    """Check if a point collinear with s lies within its bounding box."""
+    return min(s.x1, s.x2) <= x <= max(s.x1, s.x2) and min(s.y1, s.y2) <= y <= max(s.y1, s.y2)
+
+
+def _touch(a: _Segment, b: _Segment) -> bool:
+    """Check if two closed segments share at least one point."""
+    d1 = _orientation(a.x1, a.y1, a.x2, a.y2, b.x1, b.y1)
+    d2 = _orientation(a.x1, a.y1, a.x2, a.y2, b.x2, b.y2)
+    d3 = _orientation(b.x1, b.y1, b.x2, b.y2, a.x1, a.y1)
+    d4 = _orientation(b.x1, b.y1, b.x2, b.y2, a.x2, a.y2)
+    if ((d1 > 0 and d2 < 0) or (d1 < 0 and d2 > 0)) and ((d3 > 0 and d4 < 0) or (d3 < 0 and d4 > 0)):
+        return True
+    return ((d1 == 0 and _on_segment(a, b.x1, b.y1)) or (d2 == 0 and _on_segment(a, b.x2, b.y2))
+            or (d3 == 0 and _on_segment(b, a.x1, a.y1)) or (d4 == 0 and _on_segment(b, a.x2, a.y2)))
+
+
+def _conflict(a: _Segment, b: _Segment, sizes: Tuple[int, int]) -> Optional[bool]:
+    """
+    Classify a pair of neighbouring segments.
+
+    Returns True if edges of different polygons touch, None if edges of the
+    same polygon meet anywhere other than at a shared vertex, and False
+    otherwise.
+    """
+    if a.owner != b.owner:
+        return True if _touch(a, b) else False
+    n = sizes[a.owner]
+    if (a.index - b.index) % n not in (1, n - 1):
+        return None if _touch(a, b) else False
+    # Adjacent edges share a vertex; they must not fold back over each other
+    for x, y in ((b.x1, b.y1), (b.x2, b.y2)):
+        if (x, y) in ((a.x1, a.y1), (a.x2, a.y2)):
+            continue
+        if _orientation(a.x1, a.y1, a.x2, a.y2, x, y) == 0 and _on_segment(a, x, y):
+            return None
+    for x, y in ((a.x1, a.y1), (a.x2, a.y2)):
+        if (x, y) in ((b.x1, b.y1), (b.x2, b.y2)):
+            continue
+        if _orientation(b.x1, b.y1, b.x2, b.y2, x, y) == 0 and _on_segment(b, x, y):
+            return None
+    return False
+
+
+def boundaries_intersect(poly1: List[Point], poly2: List[Point]) -> Optional[bool]:
+    """
+    Check if the boundaries of two simple polygons touch or cross.
+
+    A Shamos-Hoey sweep: edges enter and leave a status list ordered by
+    height on a vertical sweep line, and only edges that become neighbours
+    in that list are tested, so there are O(n + m) intersection tests and
+    O((n + m) log k) height comparisons, where k is the most edges the
+    sweep line crosses at once. The status list is a plain Python list,
+    so inserting an edge, and finding and removing it again, each take up
+    to k steps and the worst case is O((n + m) k); k is small for typical
+    polygons, and those steps are memory moves and identity checks done
+    in C. The sweep stops at the first pair of touching
+    edges from different polygons. Edges are closed, so shared points
+    count.
+
+    Args:
+        poly1: List of (x, y) vertex coordinates of the first polygon
+        poly2: List of (x, y) vertex coordinates of the second polygon
+
+    Returns:
+        True if an edge of poly1 touches an edge of poly2, False if none
+        does, or None if the sweep found a polygon that is not simple, in
+        which case the result is unknown
+    """
+    sizes = (len(poly1), len(poly2))
+    events = []
+    serial = 0
+    for owner, polygon in enumerate((poly1, poly2)):
+        n = len(polygon)
+        for index in range(n):
+            segment = _Segment(polygon[index], polygon[(index + 1) % n], owner, index)
+            # At a shared point, insertions come before removals so touching edges meet
+            events.append((segment.x1, segment.y1, 0, serial, segment))
+            events.append((segment.x2, segment.y2, 1, serial, segment))
+            serial += 1
+    events.sort()
+
+    active: List[_Segment] = []
+    for x, y, kind, _, segment in events:
+        if kind == 0:
+            key = (y, segment.slope)
+            low, high = 0, len(active)
+            while low < high:
+                middle = (low + high) // 2
+                other = active[middle]
+                if (other.y_at(x, y), other.slope) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            active.insert(low, segment)
+            neighbours = []
+            if low > 0:
+                neighbours.append(active[low - 1])
+            if low + 1 < len(active):
+                neighbours.append(active[low + 1])
+            for other in neighbours:
+                result = _conflict(segment, other, sizes)
+                if result is not False:
+                    return result
+        else:
+            position = active.index(segment)
+            del active[position]
+            if 0 < position < len(active):
+                result = _conflict(active[position - 1], active[position], sizes)
+                if result is not False:
+                    return result
+    return False
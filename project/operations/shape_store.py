@@ -0,0 +1,328 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.base import Shape
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'Triangle': ('a', 'b', 'c', 'x', 'y', 'angle'),
+    'Rectangle': ('a', 'b', 'x', 'y', 'angle'),
+    'Circle': ('r', 'x', 'y', 'angle'),
+}
+
+
+def _kind(shape: Shape) -> Optional[str]:
+    """Name of the column table a shape belongs to, or None if it has none."""
+    if isinstance(shape, Rectangle):
+        return 'Rectangle'
+    if isinstance(shape, Circle):
+        return 'Circle'
+    if isinstance(shape, Triangle):
+        return 'Triangle'
+    return None
+
+
+class _Table:
+    """Growable set of float64 columns for one primitive type."""
+
+    def __init__(self, columns: Tuple[str, ...], capacity: int = 16):
+        self.names = columns
+        self.columns = {name: np.zeros(capacity) for name in columns}
+        self.shapes: List[Shape] = []
+        self.rows: Dict[Shape, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.shapes)
+
+    def column(self, name: str) -> 'np.ndarray':
+        return self.columns[name][:len(self.shapes)]
+
+    def add(self, shape: Shape) -> None:
+        row = len(self.shapes)
+        if row == len(self.columns['x']):
+            for name, values in self.columns.items():
+                grown = np.zeros(2 * len(values))
+                grown[:row] = values
+                self.columns[name] = grown
+        self.shapes.append(shape)
+        self.rows[shape] = row
+        self.write(shape, row)
+
+    def write(self, shape: Shape, row: int) -> None:
+        for name in self.names:
+            self.columns[name][row] = getattr(shape, name)
+
+    def remove(self, shape: Shape) -> None:
+        row = self.rows.pop(shape)
+        last = len(self.shapes) - 1
+        if row != last:
+            moved = self.shapes[last]
+            for values in self.columns.values():
+                values[row] = values[last]
+            self.shapes[row] = moved
+            self.rows[moved] = row
+        self.shapes.pop()
+
+
+class ShapeStore:
+    """
+    Columnar mirror of a collection of shapes backed by NumPy arrays.
+
+    Triangles, rectangles and circles (including their labelled and
+    colored subclasses) are kept as per-type float64 columns of their
+    attributes, so totals, filters and statistics run as vectorized
+    kernels. The shape objects remain the source of truth: each row refers
+    back to its object, and ``update`` must be called after a mirrored
+    shape changes. Shapes of other types are tracked separately and
+    evaluated through their own methods.
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        if np is None:
+            raise ImportError('ShapeStore requires numpy')
+        self._tables = {kind: _Table(columns) for kind, columns in COLUMNS.items()}
+        self._others: Dict[Shape, None] = {}
+
+    def __len__(self) -> int:
+        return sum(len(table) for table in self._tables.values()) + len(self._others)
+
+    def __contains__(self, shape: Shape) -> bool:
+        kind = _kind(shape)
+        if kind is None:
+            return shape in self._others
+        return shape in self._tables[kind].rows
+
+    def add(self, shape: Shape) -> None:
+        """
+        Mirror a shape in the store.
+
+        Args:
+            shape: The shape to add
+
+        Raises:
+            KeyError: If the shape is already stored
+        """
+        if shape in self:
+            raise KeyError('Shape is already stored')
+        kind = _kind(shape)
+        if kind is None:
+            self._others[shape] = None
+        else:
+            self._tables[kind].add(shape)
+
+    def update(self, shape: Shape) -> None:
+        """
+        Copy the current attributes of a stored shape into its row.
+
+        Args:
+            shape: The shape that changed
+
+        Raises:
+            KeyError: If the shape is not stored
+        """
+        kind = _kind(shape)
+        if kind is None:
+            if shape not in self._others:
+                raise KeyError('Shape is not stored')
+            return
+        table = self._tables[kind]
+        table.write(shape, table.rows[shape])
+
+    def update_many(self, shapes: Iterable[Shape]) -> None:
+        """
+        Copy the current attributes of many stored shapes into their rows.
+
+        Each column of each type is written with one vectorized assignment.
+
+        Args:
+            shapes: The shapes that changed
+
+        Raises:
+            KeyError: If a shape is not stored, in which case no row is written
+        """
+        by_kind: Dict[str, List[Shape]] = {}
+        for shape in shapes:
+            if shape not in self:
+                raise KeyError('Shape is not stored')
+            kind = _kind(shape)
+            if kind is not None:
+                by_kind.setdefault(kind, []).append(shape)
+        for kind, kind_shapes in by_kind.items():
+            table = self._tables[kind]
+            rows = np.fromiter((table.rows[shape] for shape in kind_shapes), dtype=np.intp, count=len(kind_shapes))
+            for name in table.names:
+                table.columns[name][rows] = [getattr(shape, name) for shape in kind_shapes]
+
+    def remove(self, shape: Shape) -> None:
+        """
+        Remove a shape from the store.
+
+        Args:
+            shape: The shape to remove
+
+        Raises:
+            KeyError: If the shape is not stored
+        """
+        kind = _kind(shape)
+        if kind is None:
+            del self._others[shape]
+        else:
+            self._tables[kind].remove(shape)
+
+    def column(self, kind: str, name: str) -> 'np.ndarray':
+        """
+        Get a read-only view of one column.
+
+        Args:
+            kind: Table name ('Triangle', 'Rectangle' or 'Circle')
+            name: Attribute name, e.g. 'x' or 'r'
+
+        Returns:
+            Array with one value per stored shape of that kind
+        """
+        view = self._tables[kind].column(name).view()
+        view.flags.writeable = False
+        return view
+
+    def shape_at(self, kind: str, row: int) -> Shape:
+        """
+        Get the shape object mirrored by a row.
+
+        Args:
+            kind: Table name ('Triangle', 'Rectangle' or 'Circle')
+            row: Row index within that table
+
+        Returns:
+            The shape stored in that row
+        """
+        return self._tables[kind].shapes[row]
+
+    def areas(self, kind: str) -> 'np.ndarray':
+        """
+        Compute the area of every stored shape of one kind.
+
+        Degenerate triangles whose sides violate the triangle inequality
+        count as zero area.
+
+        Args:
+            kind: Table name ('Triangle', 'Rectangle' or 'Circle')
+
+        Returns:
+            Array of areas in row order
+        """
+        table = self._tables[kind]
+        if kind == 'Rectangle':
+            return table.column('a') * table.column('b')
+        if kind == 'Circle':
+            return 3.14 * table.column('r') ** 2
+        a, b, c = table.column('a'), table.column('b'), table.column('c')
+        s = (a + b + c) / 2
+        return np.sqrt(np.maximum(s * (s - a) * (s - b) * (s - c), 0.0))
+
+    def perimeters(self, kind: str) -> 'np.ndarray':
+        """
+        Compute the perimeter of every stored shape of one kind.
+
+        Args:
+            kind: Table name ('Triangle', 'Rectangle' or 'Circle')
+
+        Returns:
+            Array of perimeters in row order
+        """
+        table = self._tables[kind]
+        if kind == 'Rectangle':
+            return 2 * (table.column('a') + table.column('b'))
+        if kind == 'Circle':
+            return 2 * 3.14 * table.column('r')
+        return table.column('a') + table.column('b') + table.column('c')
+
+    def total_area(self) -> float:
+        """
+        Calculate the total area of all stored shapes.
+
+        Returns:
+            The sum of all shape areas
+        """
+        total = sum(float(self.areas(kind).sum()) for kind in self._tables)
+        return total + sum(shape.area() for shape in self._others)
+
+    def total_perimeter(self) -> float:
+        """
+        Calculate the total perimeter of all stored shapes.
+
+        Returns:
+            The sum of all shape perimeters
+        """
+        total = sum(float(self.perimeters(kind).sum()) for kind in self._tables)
+        return total + sum(shape.perimeter() for shape in self._others)
+
+    def filter_by_area(self, min_area: Optional[float] = None,
+                       max_area: Optional[float] = None) -> List[Shape]:
+        """
+        Find stored shapes with area inside a closed interval.
+
+        Args:
+            min_area: Lower bound, or None for no lower bound
+            max_area: Upper bound, or None for no upper bound
+
+        Returns:
+            List of matching shapes grouped by kind
+        """
+        result = []
+        for kind, table in self._tables.items():
+            areas = self.areas(kind)
+            mask = np.ones(len(areas), dtype=bool)
+            if min_area is not None:
+                mask &= areas >= min_area
+            if max_area is not None:
+                mask &= areas <= max_area
+            result.extend(table.shapes[row] for row in np.flatnonzero(mask))
+        for shape in self._others:
+            area = shape.area()
+            if (min_area is None or area >= min_area) and (max_area is None or area <= max_area):
+                result.append(shape)
+        return result
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Compute per-type statistics of the stored shapes.
+
+        Returns:
+            Mapping of type name to count, total/mean/min/max area and
+            total perimeter; types without shapes are omitted
+        """
+        stats = {}
+        for kind in self._tables:
+            areas = self.areas(kind)
+            if len(areas):
+                stats[kind] = self._summary(areas, float(self.perimeters(kind).sum()))
+        others: Dict[str, List[Shape]] = {}
+        for shape in self._others:
+            others.setdefault(shape.__class__.__name__, []).append(shape)
+        for name, shapes in others.items():
+            areas = np.array([shape.area() for shape in shapes])
+            stats[name] = self._summary(areas, sum(shape.perimeter() for shape in shapes))
+        return stats
+
+    @staticmethod
+    def _summary(areas: 'np.ndarray', total_perimeter: float) -> Dict[str, float]:
+        return {
+            'count': len(areas),
+            'total_area': float(areas.sum()),
+            'mean_area': float(areas.mean()),
+            'min_area': float(areas.min()),
+            'max_area': float(areas.max()),
+            'total_perimeter': total_perimeter,
+        }
@@ -0,0 +1,384 @@
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from array import array
+from shapes.base import Shape
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.primitives import LabelledColoredTriangle, LabelledColoredRectangle, LabelledColoredCircle
+from shapes.poligons import Polygon
+import mmap as mmap_module
+import struct
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MAGIC = b'SHAPEMAP'
+FORMAT_VERSION = 1
+
+# Magic, format version, flags, section count, next shape ID, offset of the
+# section table
+_HEADER = struct.Struct('<8sHHIQQ')
+# Tag, record size, offset and record count of a section
+_SECTION = struct.Struct('<4sIQQ')
+# Sections start at multiples of 8 bytes, so their doubles can be read in place
+_ALIGNMENT = 8
+
+# ID, angle, first vertex in the vertex heap and vertex count
+_POLYGON = struct.Struct('<qdQQ')
+_POLYGON_TAG = b'POLY'
+# Vertices of all polygons, one (x, y) pair of doubles each
+_VERTICES_TAG = b'VERT'
+_VERTEX_SIZE = 16
+# End offsets of the strings in the blob, one unsigned 64-bit integer each
+_STRING_ENDS_TAG = b'STRE'
+# UTF-8 text of all strings, back to back
+_STRINGS_TAG = b'STRS'
+
+
+class _Kind:
+    """Fixed-width record layout of one shape type."""
+
+    def __init__(self, tag: bytes, shape_type: type, fields: Tuple[str, ...], labelled: bool = False):
+        self.tag = tag
+        self.type = shape_type
+        self.fields = fields
+        self.labelled = labelled
+        # ID, the fields and, for labelled shapes, string indexes of color and label
+        self.record = struct.Struct('<q' + 'd' * len(fields) + ('II' if labelled else ''))
+
+    def pack(self, shape_id: int, shape: Shape, string_index) -> bytes:
+        values = [getattr(shape, field) for field in self.fields]
+        if self.labelled:
+            values += [string_index(shape.color), string_index(shape.label)]
+        return self.record.pack(shape_id, *values)
+
+    def dtype(self) -> 'np.dtype':
+        columns = [('id', '<i8')] + [(field, '<f8') for field in self.fields]
+        if self.labelled:
+            columns += [('color', '<u4'), ('label', '<u4')]
+        return np.dtype(columns)
+
+
+_KINDS = [
+    _Kind(b'TRI0', Triangle, ('a', 'b', 'c', 'x', 'y', 'angle')),
+    _Kind(b'TRI1', LabelledColoredTriangle, ('a', 'b', 'c', 'x', 'y', 'angle'), labelled=True),
+    _Kind(b'REC0', Rectangle, ('a', 'b', 'x', 'y', 'angle')),
+    _Kind(b'REC1', LabelledColoredRectangle, ('a', 'b', 'x', 'y', 'angle'), labelled=True),
+    _Kind(b'CIR0', Circle, ('r', 'x', 'y', 'angle')),
+    _Kind(b'CIR1', LabelledColoredCircle, ('r', 'x', 'y', 'angle'), labelled=True),
+]
+_KINDS_BY_NAME = {kind.type.__name__: kind for kind in _KINDS}
+_LABELLED_TYPES = {kind.type for kind in _KINDS if kind.labelled}
+
+_RECORD_SIZES = {kind.tag: kind.record.size for kind in _KINDS}
+_RECORD_SIZES.update({_POLYGON_TAG: _POLYGON.size, _VERTICES_TAG: _VERTEX_SIZE,
+                      _STRING_ENDS_TAG: 8, _STRINGS_TAG: 1})
+
+
+def _begin_section(file: BinaryIO, start: int) -> int:
+    """Pad the file to the section alignment and return the section offset from the snapshot start."""
+    offset = file.tell() - start
+    padding = -offset % _ALIGNMENT
+    if padding:
+        file.write(bytes(padding))
+    return offset + padding
+
+
+def _little_endian(values: array) -> array:
+    """The array itself on little-endian machines, a byte-swapped copy elsewhere."""
+    if sys.byteorder == 'little':
+        return values
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
+
+
+def write_snapshot(target: Union[str, BinaryIO], shapes: Iterable[Tuple[int, Shape]], next_id: int = 0) -> None:
+    """
+    Write shapes to a snapshot file.
+
+    Records are streamed to the file one section at a time, so saving
+    does not hold an encoded copy of the whole collection in memory.
+
+    Args:
+        target: Path of the file to write, or a seekable binary file to
+            write the snapshot to from its current position
+        shapes: Pairs of shape ID and shape
+        next_id: ID the loaded collection should give its next new shape
+
+    Raises:
+        TypeError: If a shape is not one of the built-in shape types, or
+            the color or label of a labelled shape is not a string
+    """
+    groups: Dict[type, List[Tuple[int, Shape]]] = {kind.type: [] for kind in _KINDS}
+    groups[Polygon] = []
+    for shape_id, shape in shapes:
+        group = groups.get(type(shape))
+        if group is None:
+            raise TypeError(f"Cannot save shapes of type {type(shape).__name__}")
+        # Checked before anything is written, so a bad shape does not leave a partial file
+        if type(shape) in _LABELLED_TYPES and not (isinstance(shape.color, str) and isinstance(shape.label, str)):
+            raise TypeError(f"Cannot save shape {shape_id}: its color and label must be strings")
+        group.append((shape_id, shape))
+
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'wb') as file:
+            _write_sections(file, groups, next_id)
+    else:
+        _write_sections(target, groups, next_id)
+
+
+def _write_sections(file: BinaryIO, groups: Dict[type, List[Tuple[int, Shape]]], next_id: int) -> None:
+    """Write the grouped shapes as a snapshot starting at the file's current position."""
+    strings: Dict[str, int] = {}
+
+    def string_index(text: str) -> int:
+        index = strings.get(text)
+        if index is None:
+            index = strings[text] = len(strings)
+        return index
+
+    start = file.tell()
+    sections = []
+    file.write(bytes(_HEADER.size))
+
+    for kind in _KINDS:
+        items = groups[kind.type]
+        offset = _begin_section(file, start)
+        for shape_id, shape in items:
+            file.write(kind.pack(shape_id, shape, string_index))
+        sections.append((kind.tag, kind.record.size, offset, len(items)))
+
+    polygons = groups[Polygon]
+    offset = _begin_section(file, start)
+    first = 0
+    for shape_id, polygon in polygons:
+        count = len(polygon.coords) // 2
+        file.write(_POLYGON.pack(shape_id, polygon.angle, first, count))
+        first += count
+    sections.append((_POLYGON_TAG, _POLYGON.size, offset, len(polygons)))
+
+    offset = _begin_section(file, start)
+    for _, polygon in polygons:
+        _little_endian(polygon.coords).tofile(file)
+    sections.append((_VERTICES_TAG, _VERTEX_SIZE, offset, first))
+
+    encoded = [text.encode('utf-8') for text in strings]
+    ends = array('Q')
+    end = 0
+    for text in encoded:
+        end += len(text)
+        ends.append(end)
+    offset = _begin_section(file, start)
+    _little_endian(ends).tofile(file)
+    sections.append((_STRING_ENDS_TAG, 8, offset, len(ends)))
+    offset = file.tell() - start
+    for text in encoded:
+        file.write(text)
+    sections.append((_STRINGS_TAG, 1, offset, end))
+
+    table_offset = _begin_section(file, start)
+    for section in sections:
+        file.write(_SECTION.pack(*section))
+    end_of_snapshot = file.tell()
+    file.seek(start)
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(sections), next_id, table_offset))
+    file.seek(end_of_snapshot)
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file or buffer.
+
+    A snapshot holds one section of fixed-width little-endian records per
+    shape type, a heap of polygon vertices and a table of the color and
+    label strings, which labelled shapes refer to by index. A header with
+    a format version and a table of sections locate them in the file.
+
+    With mmap, the file is mapped into memory rather than read, so opening
+    takes the same time whatever its size: shapes are decoded one at a
+    time as they are iterated over, and records() and vertices() wrap the
+    mapped pages as NumPy arrays without copying them. The view must be
+    closed, and arrays taken from it dropped, before the file can be
+    changed.
+    """
+
+    def __init__(self, source: Union[str, bytes, memoryview], mmap: bool = True):
+        """
+        Open a snapshot file or buffer.
+
+        Args:
+            source: Path of the file, or a bytes-like object holding the
+                snapshot, such as the buffer of a shared memory block, which
+                is read in place and must outlive the snapshot
+            mmap: Map the file into memory instead of reading it (default: True)
+
+        Raises:
+            ValueError: If the file is not a snapshot, was written by an
+                unsupported format version, or is truncated
+        """
+        if isinstance(source, (str, os.PathLike)):
+            name = source
+            with open(source, 'rb') as file:
+                if os.fstat(file.fileno()).st_size < _HEADER.size:
+                    raise ValueError(f"{name} is not a shape map snapshot")
+                if mmap:
+                    self._buffer = mmap_module.mmap(file.fileno(), 0, access=mmap_module.ACCESS_READ)
+                else:
+                    self._buffer = file.read()
+        else:
+            name = 'buffer'
+            self._buffer = source
+        self._view = memoryview(self._buffer).cast('B')
+        size = len(self._view)
+        if size < _HEADER.size:
+            self.close()
+            raise ValueError(f"{name} is not a shape map snapshot")
+
+        magic, version, _, section_count, self.next_id, table_offset = _HEADER.unpack_from(self._view)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{name} is not a shape map snapshot")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot format version {version}")
+
+        if table_offset + section_count * _SECTION.size > size:
+            self.close()
+            raise ValueError(f"{name} is truncated or corrupt")
+        self._sections: Dict[bytes, Tuple[int, int]] = {}
+        for tag, record_size, offset, count in _SECTION.iter_unpack(
+                self._view[table_offset:table_offset + section_count * _SECTION.size]):
+            if _RECORD_SIZES.get(tag, record_size) != record_size or offset + record_size * count > size:
+                self.close()
+                raise ValueError(f"{name} is truncated or corrupt")
+            self._sections[tag] = (offset, count)
+        if len(self._sections) != len(_RECORD_SIZES):
+            self.close()
+            raise ValueError(f"{name} is truncated or corrupt")
+
+        self._strings: List[Optional[str]] = [None] * self._sections[_STRING_ENDS_TAG][1]
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Release the file.
+
+        Raises:
+            BufferError: If arrays from records() or vertices() still exist
+        """
+        self._view.release()
+        if isinstance(self._buffer, mmap_module.mmap):
+            self._buffer.close()
+
+    def __len__(self) -> int:
+        return sum(count for count in self.counts().values())
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Number of shapes of each type.
+
+        Returns:
+            Mapping of class name to shape count
+        """
+        counts = {kind.type.__name__: self._sections[kind.tag][1] for kind in _KINDS}
+        counts[Polygon.__name__] = self._sections[_POLYGON_TAG][1]
+        return counts
+
+    def _section(self, tag: bytes, record_size: int) -> memoryview:
+        offset, count = self._sections[tag]
+        return self._view[offset:offset + record_size * count]
+
+    def string(self, index: int) -> str:
+        """
+        Get a color or label from the string table.
+
+        Args:
+            index: Index of the string
+
+        Returns:
+            The decoded string
+        """
+        text = self._strings[index]
+        if text is None:
+            ends_offset, _ = self._sections[_STRING_ENDS_TAG]
+            start = struct.unpack_from('<Q', self._view, ends_offset + 8 * (index - 1))[0] if index else 0
+            end = struct.unpack_from('<Q', self._view, ends_offset + 8 * index)[0]
+            blob_offset, _ = self._sections[_STRINGS_TAG]
+            text = self._strings[index] = str(self._view[blob_offset + start:blob_offset + end], 'utf-8')
+        return text
+
+    def __iter__(self) -> Iterator[Tuple[int, Shape]]:
+        """
+        Decode the shapes one at a time.
+
+        Yields:
+            Pairs of shape ID and a newly built shape
+        """
+        for kind in _KINDS:
+            fields = len(kind.fields)
+            for record in kind.record.iter_unpack(self._section(kind.tag, kind.record.size)):
+                if kind.labelled:
+                    yield record[0], kind.type(*record[1:fields + 1], color=self.string(record[-2]),
+                                               label=self.string(record[-1]))
+                else:
+                    yield record[0], kind.type(*record[1:])
+
+        vertices_offset, _ = self._sections[_VERTICES_TAG]
+        for shape_id, angle, first, count in _POLYGON.iter_unpack(self._section(_POLYGON_TAG, _POLYGON.size)):
+            start = vertices_offset + first * _VERTEX_SIZE
+            coords = array('d')
+            coords.frombytes(self._view[start:start + count * _VERTEX_SIZE])
+            yield shape_id, Polygon.from_coords(_little_endian(coords), angle)
+
+    def records(self, type_name: str) -> 'np.ndarray':
+        """
+        The records of one shape type as a read-only structured array.
+
+        The array wraps the file's bytes without copying them. Its fields
+        are 'id', the shape's attributes and, for labelled shapes, the
+        'color' and 'label' string indexes; polygons have 'id', 'angle',
+        'first_vertex' and 'vertex_count' into vertices().
+
+        Args:
+            type_name: Class name of the shapes, e.g. 'Circle'
+
+        Returns:
+            One row per shape
+
+        Raises:
+            ImportError: If NumPy is not installed
+            KeyError: If the type cannot be stored in a snapshot
+        """
+        if np is None:
+            raise ImportError('Snapshot.records requires numpy')
+        if type_name == Polygon.__name__:
+            tag = _POLYGON_TAG
+            dtype = np.dtype([('id', '<i8'), ('angle', '<f8'), ('first_vertex', '<u8'), ('vertex_count', '<u8')])
+        else:
+            kind = _KINDS_BY_NAME[type_name]
+            tag, dtype = kind.tag, kind.dtype()
+        offset, count = self._sections[tag]
+        return np.frombuffer(self._view, dtype=dtype, count=count, offset=offset)
+
+    def vertices(self) -> 'np.ndarray':
+        """
+        The vertex heap of the polygons as a read-only (n, 2) array, without copying.
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        if np is None:
+            raise ImportError('Snapshot.vertices requires numpy')
+        offset, count = self._sections[_VERTICES_TAG]
+        return np.frombuffer(self._view, dtype='<f8', count=2 * count, offset=offset).reshape(-1, 2)
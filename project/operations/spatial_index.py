@@ -0,0 +1,626 @@
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+from heapq import heappop, heappush
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+BBox = Tuple[float, float, float, float]
+
+
+class SpatialGrid:
+    """
+    Uniform grid index over axis-aligned bounding boxes.
+
+    Every item is registered in each cell its bounding box overlaps, so a
+    point query only has to look at a single cell. Items that would span
+    more than ``max_cells_per_item`` cells, or whose box is not finite,
+    are kept in a separate list that is checked on every query instead of
+    flooding the grid.
+
+    When no cell size is given the grid tunes it to the mean item extent
+    and rebuilds itself each time the number of items doubles, which keeps
+    the amortised insertion cost constant.
+    """
+
+    def __init__(self, cell_size: Optional[float] = None, max_cells_per_item: int = 64):
+        """
+        Initialize an empty grid.
+
+        Args:
+            cell_size: Side length of a grid cell (default: tuned automatically)
+            max_cells_per_item: Maximum number of cells a single item may occupy
+                before it is stored as an oversized item
+
+        Raises:
+            ValueError: If cell_size is not positive
+        """
+        if cell_size is not None and cell_size <= 0:
+            raise ValueError('Cell size must be positive')
+        self._auto = cell_size is None
+        self._cell_size = cell_size
+        self._max_cells_per_item = max_cells_per_item
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, None]] = {}
+        self._large: Dict[Hashable, None] = {}
+        self._items: Dict[Hashable, Tuple[BBox, int]] = {}
+        self._occupied: Optional[Tuple[int, int, int, int]] = None
+        self._seq = 0
+        self._version = 0
+        self._packed: Optional['PackedGrid'] = None
+        self._extent_sum = 0.0
+        self._tuned_at = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    @property
+    def cell_size(self) -> Optional[float]:
+        """Get the current cell size (None until the first item is inserted)."""
+        return self._cell_size
+
+    def insert(self, key: Hashable, bbox: BBox) -> None:
+        """
+        Add an item to the index.
+
+        Args:
+            key: Hashable identifier of the item
+            bbox: Bounding box as (min_x, min_y, max_x, max_y)
+
+        Raises:
+            KeyError: If the key is already indexed
+        """
+        if key in self._items:
+            raise KeyError(f"Item {key!r} is already indexed")
+        self._items[key] = (bbox, self._seq)
+        self._seq += 1
+        self._version += 1
+        self._extent_sum += self._extent(bbox)
+
+        if self._auto and len(self._items) >= 2 * max(self._tuned_at, 32):
+            self.rebuild()
+        else:
+            if self._cell_size is None:
+                self._cell_size = self._extent(bbox) or 1.0
+            self._register(key, bbox)
+
+    def insert_many(self, items: Iterable[Tuple[Hashable, BBox]]) -> None:
+        """
+        Add many items to the index.
+
+        The automatic cell size is tuned at most once for the whole batch
+        instead of each time the number of items doubles.
+
+        Args:
+            items: Iterable of (key, bbox) pairs
+
+        Raises:
+            KeyError: If a key is already indexed or repeated, in which case
+                no item is added
+        """
+        items = list(items)
+        keys = {key for key, _ in items}
+        if len(keys) != len(items) or any(key in self._items for key in keys):
+            raise KeyError('Items are already indexed or repeated')
+        added = []
+        for key, bbox in items:
+            self._items[key] = (bbox, self._seq)
+            self._seq += 1
+            self._extent_sum += self._extent(bbox)
+            added.append(key)
+        if not added:
+            return
+        self._version += 1
+
+        if self._auto and len(self._items) >= 2 * max(self._tuned_at, 32):
+            self.rebuild()
+            return
+        if self._cell_size is None:
+            self._cell_size = self._extent(self._items[added[0]][0]) or 1.0
+        for key in added:
+            self._register(key, self._items[key][0])
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove an item from the index.
+
+        Args:
+            key: Identifier of the item
+
+        Raises:
+            KeyError: If the key is not indexed
+        """
+        bbox, _ = self._items.pop(key)
+        self._version += 1
+        self._extent_sum -= self._extent(bbox)
+        self._unregister(key, bbox)
+
+    def update(self, key: Hashable, bbox: BBox) -> None:
+        """
+        Replace the bounding box of an indexed item.
+
+        Args:
+            key: Identifier of the item
+            bbox: New bounding box
+
+        Raises:
+            KeyError: If the key is not indexed
+        """
+        old_bbox, seq = self._items[key]
+        if old_bbox == bbox:
+            return
+        self._version += 1
+        self._items[key] = (bbox, seq)
+        self._extent_sum += self._extent(bbox) - self._extent(old_bbox)
+        # Small moves often stay within the same cells
+        if self._cell_range(bbox) != self._cell_range(old_bbox):
+            self._unregister(key, old_bbox)
+            self._register(key, bbox)
+
+    def update_many(self, items: Iterable[Tuple[Hashable, BBox]]) -> None:
+        """
+        Replace the bounding boxes of many indexed items.
+
+        When more than half of the items change cells, the grid is rebuilt
+        once instead of moving each item between cells.
+
+        Args:
+            items: Iterable of (key, bbox) pairs
+
+        Raises:
+            KeyError: If a key is not indexed, in which case no item is updated
+        """
+        items = list(items)
+        if not all(key in self._items for key, _ in items):
+            raise KeyError('Items are not indexed')
+        changed = False
+        moved = []
+        for key, bbox in items:
+            old_bbox, seq = self._items[key]
+            if old_bbox == bbox:
+                continue
+            changed = True
+            self._items[key] = (bbox, seq)
+            self._extent_sum += self._extent(bbox) - self._extent(old_bbox)
+            if self._cell_range(bbox) != self._cell_range(old_bbox):
+                moved.append((key, old_bbox, bbox))
+        if not changed:
+            return
+        self._version += 1
+        if 2 * len(moved) > len(self._items):
+            self.rebuild()
+            return
+        for key, old_bbox, bbox in moved:
+            self._unregister(key, old_bbox)
+            self._register(key, bbox)
+
+    def bbox(self, key: Hashable) -> BBox:
+        """
+        Get the bounding box stored for an item.
+
+        Args:
+            key: Identifier of the item
+
+        Returns:
+            Bounding box as (min_x, min_y, max_x, max_y)
+        """
+        return self._items[key][0]
+
+    def items(self) -> Iterator[Tuple[Hashable, BBox]]:
+        """
+        Iterate over indexed items.
+
+        Returns:
+            Iterator of (key, bbox) pairs in insertion order
+        """
+        for key, (bbox, _) in self._items.items():
+            yield key, bbox
+
+    def query_point(self, x: float, y: float) -> List[Hashable]:
+        """
+        Find items whose bounding box contains a point.
+
+        Args:
+            x: X-coordinate of the point
+            y: Y-coordinate of the point
+
+        Returns:
+            Keys of matching items in insertion order
+        """
+        if not self._items:
+            return []
+        cs = self._cell_size
+        candidates = list(self._cells.get((math.floor(x / cs), math.floor(y / cs)), ()))
+        candidates.extend(self._large)
+
+        items = self._items
+        hits = []
+        for key in candidates:
+            (min_x, min_y, max_x, max_y), seq = items[key]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                hits.append((seq, key))
+        hits.sort(key=lambda hit: hit[0])
+        return [key for _, key in hits]
+
+    def group_points(self, points: Sequence[Tuple[float, float]]) -> List[Tuple[List[int], List[Hashable]]]:
+        """
+        Group points by grid cell and collect candidates once per group.
+
+        The candidates of a group are every item registered in its cell
+        plus the oversized items; they still have to be tested against the
+        individual points.
+
+        Args:
+            points: Sequence of (x, y) coordinates
+
+        Returns:
+            List of (point indices, candidate keys in insertion order) pairs;
+            groups without candidates are omitted
+        """
+        if not self._items:
+            return []
+        cs = self._cell_size
+        groups: Dict[Tuple[int, int], List[int]] = {}
+        for i, (x, y) in enumerate(points):
+            cell = (math.floor(x / cs), math.floor(y / cs))
+            group = groups.get(cell)
+            if group is None:
+                groups[cell] = [i]
+            else:
+                group.append(i)
+
+        items = self._items
+        result = []
+        for cell, indices in groups.items():
+            keys = list(self._cells.get(cell, ()))
+            keys.extend(self._large)
+            if keys:
+                keys.sort(key=lambda key: items[key][1])
+                result.append((indices, keys))
+        return result
+
+    def packed(self) -> 'PackedGrid':
+        """
+        Get a NumPy snapshot of the grid for vectorized batch queries.
+
+        The snapshot is built on first use and reused until the grid
+        changes (requires numpy).
+
+        Returns:
+            PackedGrid reflecting the current contents
+        """
+        if self._packed is None or self._packed.version != self._version:
+            self._packed = PackedGrid(self)
+        return self._packed
+
+    def query_bbox(self, bbox: BBox) -> List[Hashable]:
+        """
+        Find items whose bounding box overlaps a box.
+
+        Args:
+            bbox: Query box as (min_x, min_y, max_x, max_y)
+
+        Returns:
+            Keys of matching items in insertion order
+        """
+        if not self._items:
+            return []
+        q_min_x, q_min_y, q_max_x, q_max_y = bbox
+        cell_range = self._cell_range(bbox)
+        # A query box that is not finite scans every occupied cell
+        ix0, iy0, ix1, iy1 = cell_range or (-math.inf, -math.inf, math.inf, math.inf)
+
+        seen: Dict[Hashable, None] = dict.fromkeys(self._large)
+        cells = self._cells
+        if cell_range is None or (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > len(cells):
+            for (ix, iy), bucket in cells.items():
+                if ix0 <= ix <= ix1 and iy0 <= iy <= iy1:
+                    seen.update(bucket)
+        else:
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    bucket = cells.get((ix, iy))
+                    if bucket:
+                        seen.update(bucket)
+
+        items = self._items
+        hits = []
+        for key in seen:
+            (min_x, min_y, max_x, max_y), seq = items[key]
+            if min_x <= q_max_x and q_min_x <= max_x and min_y <= q_max_y and q_min_y <= max_y:
+                hits.append((seq, key))
+        hits.sort(key=lambda hit: hit[0])
+        return [key for _, key in hits]
+
+    def nearest(self, bbox: BBox, distance: Callable[[Hashable], float], k: int = 1,
+                max_distance: Optional[float] = None,
+                exclude: Optional[Hashable] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Find the items closest to a query box using best-first search.
+
+        Cells are visited in rings of growing radius around the query box.
+        Every item seen is queued by the distance between bounding boxes,
+        which is a lower bound of its exact distance, and the exact
+        ``distance`` callback only runs once an item reaches the front of
+        the queue. Items whose exact distance is infinite are skipped.
+
+        Args:
+            bbox: Query box as (min_x, min_y, max_x, max_y)
+            distance: Callback returning the exact distance to an item key
+            k: Number of items to return (default: 1)
+            max_distance: Ignore items farther than this (default: no limit)
+            exclude: Key to leave out of the results, e.g. the query item
+
+        Returns:
+            Up to k (key, distance) pairs ordered by increasing distance
+        """
+        if k <= 0 or not self._items:
+            return []
+        limit = math.inf if max_distance is None else max_distance
+        items = self._items
+        heap: List[Tuple[float, int, bool, Hashable]] = []
+        seen: Set[Hashable] = set()
+        results: List[Tuple[Hashable, float]] = []
+
+        def push(key: Hashable) -> None:
+            if key in seen or key == exclude:
+                return
+            seen.add(key)
+            item_bbox, seq = items[key]
+            bound = _box_distance(bbox, item_bbox)
+            if bound <= limit:
+                heappush(heap, (bound, seq, False, key))
+
+        def drain(bound: float) -> bool:
+            while heap and heap[0][0] <= bound:
+                dist, seq, exact, key = heappop(heap)
+                if exact:
+                    results.append((key, dist))
+                    if len(results) == k:
+                        return True
+                else:
+                    dist = distance(key)
+                    if dist < math.inf and dist <= limit:
+                        heappush(heap, (dist, seq, True, key))
+            return False
+
+        for key in self._large:
+            push(key)
+
+        cell_range = self._cell_range(bbox)
+        if cell_range is None:
+            # A query box that is not finite is at distance 0 from every item
+            for key in items:
+                push(key)
+            drain(math.inf)
+            return results
+        ix0, iy0, ix1, iy1 = cell_range
+        radius = 0
+        while True:
+            for cell in self._ring(ix0 - radius, iy0 - radius, ix1 + radius, iy1 + radius, radius):
+                for key in self._cells.get(cell, ()):
+                    push(key)
+
+            covered = self._occupied is None or (
+                ix0 - radius <= self._occupied[0] and iy0 - radius <= self._occupied[1]
+                and ix1 + radius >= self._occupied[2] and iy1 + radius >= self._occupied[3])
+            # Anything not seen yet lies outside the scanned block of cells
+            unseen_bound = math.inf if covered else radius * self._cell_size
+            if drain(unseen_bound) or covered or unseen_bound > limit:
+                break
+            radius += 1
+
+        if len(results) < k:
+            drain(math.inf)
+        return results
+
+    def rebuild(self) -> None:
+        """Re-register every item, re-tuning the cell size if it is automatic."""
+        self._cells = {}
+        self._large = {}
+        self._occupied = None
+        if self._auto and self._items:
+            self._cell_size = (self._extent_sum / len(self._items)) or 1.0
+        self._tuned_at = len(self._items)
+        self._version += 1
+        for key, (bbox, _) in self._items.items():
+            self._register(key, bbox)
+
+    @staticmethod
+    def _extent(bbox: BBox) -> float:
+        # Unbounded boxes do not take part in tuning the cell size
+        extent = max(bbox[2] - bbox[0], bbox[3] - bbox[1])
+        return extent if math.isfinite(extent) else 0.0
+
+    def _cell_range(self, bbox: BBox) -> Optional[Tuple[int, int, int, int]]:
+        """Cells a box overlaps, or None for a box that is not finite."""
+        if not all(map(math.isfinite, bbox)):
+            return None
+        cs = self._cell_size
+        return (math.floor(bbox[0] / cs), math.floor(bbox[1] / cs),
+                math.floor(bbox[2] / cs), math.floor(bbox[3] / cs))
+
+    def _ring(self, x0: int, y0: int, x1: int, y1: int, radius: int) -> List[Tuple[int, int]]:
+        """Cells on the border of a block, or all of them for the innermost block."""
+        if radius == 0:
+            size = (x1 - x0 + 1) * (y1 - y0 + 1)
+        else:
+            size = 2 * (x1 - x0 + 1) + 2 * max(y1 - y0 - 1, 0)
+        if size > len(self._cells):
+            inner = (x0 + 1, y0 + 1, x1 - 1, y1 - 1) if radius else None
+            return [(ix, iy) for ix, iy in self._cells
+                    if x0 <= ix <= x1 and y0 <= iy <= y1
+                    and not (inner and inner[0] <= ix <= inner[2] and inner[1] <= iy <= inner[3])]
+        if radius == 0:
+            return [(ix, iy) for ix in range(x0, x1 + 1) for iy in range(y0, y1 + 1)]
+        ring = [(ix, y0) for ix in range(x0, x1 + 1)]
+        ring.extend((ix, y1) for ix in range(x0, x1 + 1))
+        ring.extend((x0, iy) for iy in range(y0 + 1, y1))
+        ring.extend((x1, iy) for iy in range(y0 + 1, y1))
+        return ring
+
+    def _register(self, key: Hashable, bbox: BBox) -> None:
+        cell_range = self._cell_range(bbox)
+        if cell_range is None:
+            self._large[key] = None
+            return
+        ix0, iy0, ix1, iy1 = cell_range
+        if (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > self._max_cells_per_item:
+            self._large[key] = None
+            return
+        if self._occupied is None:
+            self._occupied = (ix0, iy0, ix1, iy1)
+        else:
+            ox0, oy0, ox1, oy1 = self._occupied
+            self._occupied = (min(ox0, ix0), min(oy0, iy0), max(ox1, ix1), max(oy1, iy1))
+        cells = self._cells
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket is None:
+                    bucket = cells[(ix, iy)] = {}
+                bucket[key] = None
+
+    def _unregister(self, key: Hashable, bbox: BBox) -> None:
+        if key in self._large:
+            del self._large[key]
+            return
+        ix0, iy0, ix1, iy1 = self._cell_range(bbox)
+        cells = self._cells
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                bucket = cells.get((ix, iy))
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del cells[(ix, iy)]
+
+
+def _encode_cells(ix: 'np.ndarray', iy: 'np.ndarray') -> 'np.ndarray':
+    """Pack cell coordinates into single int64 codes."""
+    return (ix.astype(np.int64) << 32) | (iy.astype(np.int64) & 0xFFFFFFFF)
+
+
+class PackedGrid:
+    """
+    Immutable array form of a SpatialGrid used by batch queries.
+
+    Items are numbered by insertion order. Cell memberships are stored as
+    a sorted array of cell codes with start offsets into a flat array of
+    item numbers, so candidate lookup for many points is a single
+    searchsorted followed by a CSR expansion.
+    """
+
+    def __init__(self, grid: SpatialGrid):
+        """
+        Build the snapshot.
+
+        Args:
+            grid: The grid to pack
+
+        Raises:
+            ImportError: If numpy is not installed
+        """
+        if np is None:
+            raise ImportError('PackedGrid requires numpy')
+        self.version = grid._version
+        self.cell_size = grid._cell_size or 1.0
+        self.keys: List[Hashable] = list(grid._items)
+        self.extras: Dict[str, object] = {}
+        self.bboxes = np.array([bbox for bbox, _ in grid._items.values()], dtype=float).reshape(-1, 4)
+
+        # Expand every item into the cells its box overlaps, as _register
+        # does; boxes that are not finite are oversized
+        finite = np.isfinite(self.bboxes).all(axis=1)
+        cells = np.floor(np.where(finite[:, None], self.bboxes, 0.0) / self.cell_size).astype(np.int64)
+        widths = cells[:, 2] - cells[:, 0] + 1
+        heights = cells[:, 3] - cells[:, 1] + 1
+        is_large = ~finite | (widths * heights > grid._max_cells_per_item)
+        self.large = np.flatnonzero(is_large)
+        counts = np.where(is_large, 0, widths * heights)
+        members = np.repeat(np.arange(len(self.keys)), counts)
+        local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        codes = _encode_cells(cells[members, 0] + local % widths[members],
+                              cells[members, 1] + local // widths[members])
+        order = np.lexsort((members, codes))
+        self.entries = members[order]
+        self.cell_codes, self.cell_starts, self.cell_counts = np.unique(
+            codes[order], return_index=True, return_counts=True)
+
+    def candidate_pairs(self, xs: 'np.ndarray', ys: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Find every (point, item) pair where the item's box contains the point.
+
+        Args:
+            xs: Array of point x-coordinates
+            ys: Array of point y-coordinates
+
+        Returns:
+            Arrays (point numbers, item numbers) sorted by point, then by
+            item insertion order
+        """
+        n = len(xs)
+        point_numbers = np.arange(n)
+        counts = np.zeros(n, dtype=np.int64)
+        starts = np.zeros(n, dtype=np.int64)
+        if len(self.cell_codes):
+            codes = _encode_cells(np.floor(xs / self.cell_size), np.floor(ys / self.cell_size))
+            pos = np.minimum(np.searchsorted(self.cell_codes, codes), len(self.cell_codes) - 1)
+            found = self.cell_codes[pos] == codes
+            counts[found] = self.cell_counts[pos[found]]
+            starts[found] = self.cell_starts[pos[found]]
+
+        total = int(counts.sum())
+        pair_points = np.repeat(point_numbers, counts)
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts - starts, counts)
+        pair_items = self.entries[offsets]
+        if len(self.large):
+            pair_points = np.concatenate([pair_points, np.repeat(point_numbers, len(self.large))])
+            pair_items = np.concatenate([pair_items, np.tile(self.large, n)])
+
+        boxes = self.bboxes[pair_items]
+        px, py = xs[pair_points], ys[pair_points]
+        keep = (boxes[:, 0] <= px) & (px <= boxes[:, 2]) & (boxes[:, 1] <= py) & (py <= boxes[:, 3])
+        pair_points, pair_items = pair_points[keep], pair_items[keep]
+        order = np.lexsort((pair_items, pair_points))
+        return pair_points[order], pair_items[order]
+
+
+def _box_distance(a: BBox, b: BBox) -> float:
+    """Euclidean distance between two axis-aligned boxes (0 if they overlap)."""
+    dx = max(b[0] - a[2], a[0] - b[2], 0.0)
+    dy = max(b[1] - a[3], a[1] - b[3], 0.0)
+    return math.hypot(dx, dy)
+
+
+def sweep_and_prune(entries: Iterable[Tuple[Hashable, BBox]]) -> Iterator[Tuple[Hashable, Hashable]]:
+    """
+    Find all pairs of overlapping bounding boxes.
+
+    Boxes are swept along the x axis in order of their left edge while an
+    active list holds the boxes still open at the sweep position, so only
+    boxes that overlap in x are compared in y.
+
+    Args:
+        entries: Iterable of (key, bbox) pairs
+
+    Returns:
+        Iterator of (key1, key2) pairs whose boxes overlap (touching counts),
+        with key1 preceding key2 in the input order
+    """
+    boxes = list(entries)
+    order = sorted(range(len(boxes)), key=lambda i: boxes[i][1][0])
+    active: List[int] = []
+
+    for i in order:
+        key, (min_x, min_y, max_x, max_y) = boxes[i]
+        active = [j for j in active if boxes[j][1][2] >= min_x]
+        for j in active:
+            other_key, other_bbox = boxes[j]
+            if other_bbox[1] <= max_y and min_y <= other_bbox[3]:
+                yield (other_key, key) if j < i else (key, other_key)
+        active.append(i)
@@ -0,0 +1,372 @@
+"""
+Asyncio query service for a loaded Map.
+
+Clients send requests over a localhost TCP or Unix socket connection as
+frames of a 4-byte big-endian length followed by a UTF-8 JSON object:
+
+    {"id": 1, "action": "search_by_position", "args": {"x": 5, "y": 5}}
+
+and receive {"id": 1, "result": ...} or {"id": 1, "error": "..."} in the
+same framing. Actions are the values of ShapeActions, with shapes given
+by their map IDs, plus 'stats' for the latency percentiles. Requests on
+one connection may be pipelined; responses carry the request ID.
+
+Usage:
+    python service.py map.snapshot [--port 8765 | --unix /tmp/shapes.sock]
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from operations.algorithms import Map, ShapeActions, search_shapes_by_positions
+from main import perform_shape_action
+import argparse
+import asyncio
+import json
+import math
+import struct
+import time
+
+_LENGTH = struct.Struct('>I')
+# Largest request or response frame accepted
+MAX_FRAME = 16 * 1024 * 1024
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """
+    Read one length-prefixed JSON frame.
+
+    Returns:
+        The decoded object, or None at the end of the stream
+
+    Raises:
+        ValueError: If the frame is too large or not valid JSON
+    """
+    try:
+        header = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError(f"Frame of {length} bytes is too large")
+    return json.loads(await reader.readexactly(length))
+
+
+def write_frame(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+    """Queue one length-prefixed JSON frame for sending."""
+    data = json.dumps(message).encode('utf-8')
+    writer.write(_LENGTH.pack(len(data)) + data)
+
+
+class ShapeService:
+    """
+    Serves ShapeActions queries on one map to many clients.
+
+    Requests are queued as they arrive and executed in batches on a single
+    worker thread, so the map is only ever read by one thread and the
+    event loop stays free to accept requests while a batch runs. All
+    position queries of a batch are answered by one
+    search_shapes_by_positions call; the other actions run one after
+    another through perform_shape_action. The latency of each request,
+    from arrival to its result, is kept for the most recent requests.
+    """
+
+    def __init__(self, shape_map: Map, max_batch: int = 4096, latency_window: int = 100_000):
+        """
+        Initialize the service.
+
+        Args:
+            shape_map: The collection of shapes to query
+            max_batch: Most requests executed together (default: 4096)
+            latency_window: Number of recent request latencies kept (default: 100,000)
+        """
+        self.map = shape_map
+        self.max_batch = max_batch
+        self.batches = 0
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._pending: List[Tuple[ShapeActions, Dict[str, Any], asyncio.Future, float]] = []
+        self._runner: Optional[asyncio.Task] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shape-service')
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0, path: Optional[str] = None) -> None:
+        """
+        Start accepting connections.
+
+        Args:
+            host: Address to listen on (default: localhost)
+            port: TCP port, 0 for any free port (default: 0)
+            path: Listen on this Unix socket instead of TCP
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, path=path)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port)
+
+    @property
+    def address(self) -> Any:
+        """Address the service listens on: (host, port) for TCP, the path for a Unix socket."""
+        return self._server.sockets[0].getsockname()
+
+    async def close(self) -> None:
+        """Stop accepting connections and wait for the worker thread."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._runner is not None:
+            await self._runner
+        self._executor.shutdown()
+
+    async def query(self, action: str, args: Dict[str, Any]) -> Any:
+        """
+        Run one request, batched with any others that arrive meanwhile.
+
+        Args:
+            action: A ShapeActions value
+            args: Arguments of the action
+
+        Returns:
+            The JSON-compatible result
+
+        Raises:
+            ValueError: If the action is unknown
+            KeyError: If a shape ID is not on the map
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((ShapeActions(action), args, future, time.perf_counter()))
+        if self._runner is None:
+            self._runner = asyncio.ensure_future(self._run_batches())
+        return await future
+
+    def latency(self) -> Dict[str, float]:
+        """
+        Latency percentiles of the recent requests.
+
+        Returns:
+            Request count, and p50 and p99 latency in milliseconds
+        """
+        latencies = sorted(self._latencies)
+        if not latencies:
+            return {'count': 0, 'p50_ms': 0.0, 'p99_ms': 0.0}
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, math.ceil(p * len(latencies)) - 1)] * 1e3
+
+        return {'count': len(latencies), 'p50_ms': percentile(0.5), 'p99_ms': percentile(0.99)}
+
+    async def _run_batches(self) -> None:
+        """Execute queued requests until none are left."""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self.batches += 1
+                try:
+                    outcomes = await loop.run_in_executor(
+                        self._executor, self._execute, [(action, args) for action, args, _, _ in batch])
+                except Exception as error:
+                    outcomes = [(error, None)] * len(batch)
+                done = time.perf_counter()
+                for (_, _, future, arrived), (error, value) in zip(batch, outcomes):
+                    self._latencies.append(done - arrived)
+                    if future.cancelled():
+                        continue
+                    if error is None:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(error)
+        finally:
+            self._runner = None
+
+    def _execute(self, batch: List[Tuple[ShapeActions, Dict[str, Any]]]) -> List[Tuple[Optional[Exception], Any]]:
+        """
+        Run a batch of requests on the worker thread; one (error, result) pair per request.
+
+        A request that fails, whatever the exception, only fails itself.
+        """
+        outcomes: List[Tuple[Optional[Exception], Any]] = [(None, None)] * len(batch)
+        positions = [i for i, (action, _) in enumerate(batch) if action is ShapeActions.SEARCH_BY_POSITION]
+        for i, (action, args) in enumerate(batch):
+            if action is not ShapeActions.SEARCH_BY_POSITION:
+                try:
+                    outcomes[i] = (None, self._run(action, args))
+                except Exception as error:
+                    outcomes[i] = (error, None)
+
+        points = []
+        for i in positions:
+            try:
+                points.append((i, (float(batch[i][1]['x']), float(batch[i][1]['y']))))
+            except Exception as error:
+                outcomes[i] = (error, None)
+        if points:
+            shape_id = self.map.shape_id
+            try:
+                hits = search_shapes_by_positions(self.map, [point for _, point in points])
+            except Exception as error:
+                for i, _ in points:
+                    outcomes[i] = (error, None)
+            else:
+                for (i, _), point_hits in zip(points, hits):
+                    outcomes[i] = (None, [shape_id(shape) for shape in point_hits])
+        return outcomes
+
+    def _run(self, action: ShapeActions, args: Dict[str, Any]) -> Any:
+        """Run one action other than a position query."""
+        get_shape = self.map.get_shape
+        if action in (ShapeActions.CROSSING, ShapeActions.DISTANCE):
+            return perform_shape_action(action, get_shape(args['shape1']), get_shape(args['shape2']))
+        shape_id = self.map.shape_id
+        return [shape_id(shape) for shape in perform_shape_action(action, self.map, float(args['area']))]
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one connection, several at a time."""
+        tasks = set()
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except ValueError as error:
+                    write_frame(writer, {'id': None, 'error': str(error)})
+                    break
+                if request is None:
+                    break
+                task = asyncio.ensure_future(self._answer(request, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.wait(tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _answer(self, request: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+            if request.get('action') == 'stats':
+                response = {'id': request_id, 'result': self.latency()}
+            else:
+                result = await self.query(request.get('action'), request.get('args') or {})
+                response = {'id': request_id, 'result': result}
+        except KeyError as error:
+            response = {'id': request_id, 'error': f"Unknown shape or missing argument {error}"}
+        except (TypeError, ValueError) as error:
+            response = {'id': request_id, 'error': str(error)}
+        except Exception as error:
+            response = {'id': request_id, 'error': f"{type(error).__name__}: {error}"}
+        if not writer.is_closing():
+            write_frame(writer, response)
+            await writer.drain()
+
+
+class ShapeClient:
+    """
+    Client of a ShapeService.
+
+    Requests may be sent concurrently from several tasks over the one
+    connection; each awaits its own response.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.ensure_future(self._receive())
+
+    @classmethod
+    async def connect(cls, host: str = '127.0.0.1', port: int = 0, path: Optional[str] = None) -> 'ShapeClient':
+        """
+        Connect to a service over TCP or, if path is given, a Unix socket.
+
+        Returns:
+            The connected client
+        """
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, action: str, **args: Any) -> Any:
+        """
+        Send a request and wait for its result.
+
+        Args:
+            action: A ShapeActions value, or 'stats'
+            **args: Arguments of the action
+
+        Returns:
+            The result sent by the service
+
+        Raises:
+            RuntimeError: If the service answered with an error
+            ConnectionError: If the connection closed first
+        """
+        request_id = self._next_id
+        self._next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        write_frame(self._writer, {'id': request_id, 'action': action, 'args': args})
+        await self._writer.drain()
+        return await future
+
+    async def _receive(self) -> None:
+        try:
+            while True:
+                response = await read_frame(self._reader)
+                if response is None:
+                    break
+                future = self._waiting.pop(response.get('id'), None)
+                if future is None or future.done():
+                    continue
+                if 'error' in response:
+                    future.set_exception(RuntimeError(response['error']))
+                else:
+                    future.set_result(response['result'])
+        except (ConnectionError, ValueError):
+            pass
+        for future in self._waiting.values():
+            if not future.done():
+                future.set_exception(ConnectionError('Connection closed'))
+        self._waiting.clear()
+
+    async def close(self) -> None:
+        """Close the connection."""
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._receiver
+
+
+async def serve(shape_map: Map, host: str, port: int, path: Optional[str],
+                report: Callable[[str], None] = print) -> None:
+    """Serve a map until cancelled, then report the latency percentiles."""
+    service = ShapeService(shape_map)
+    await service.start(host, port, path)
+    report(f"Serving {len(shape_map)} shapes on {service.address}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
+        report(f"Latency: {service.latency()}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Serve ShapeActions queries on a map snapshot.')
+    parser.add_argument('snapshot', help='map snapshot written by Map.save')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='listen on this Unix socket instead of TCP')
+    options = parser.parse_args()
+    try:
+        asyncio.run(serve(Map.load(options.snapshot), options.host, options.port, options.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,214 @@
-from typing import Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from abc import ABC, abstractmethod
+from operator import attrgetter
+import sys
 
 
-class Shape(ABC):
-    """Abstract base class for all geometric shapes."""
+# Observers are called with the shape and the kind of change: 'geometry',
+# 'angle', 'color' or 'label'
+Observer = Callable[[Any, str], None]
+
+
+def vertices_bbox(vertices: Iterable[Tuple[float, float]]) -> Tuple[float, float, float, float]:
+    """
+    Axis-aligned bounding box of a list of vertices.
+
+    Args:
+        vertices: (x, y) coordinates
+
+    Returns:
+        Tuple of (min_x, min_y, max_x, max_y)
+
+    Raises:
+        ValueError: If there are no vertices
+    """
+    vertices = list(vertices)
+    if not vertices:
+        raise ValueError('Cannot take the bounding box of no vertices')
+    xs = [v[0] for v in vertices]
+    ys = [v[1] for v in vertices]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def observed_attribute(name: str, change: str, doc: str,
+                       convert: Optional[Callable[[Any], Any]] = None) -> property:
+    """
+    Create a property that notifies the object's observers when assigned.
+    
+    The value is stored under a leading underscore.
+    
+    Args:
+        name: Public attribute name
+        change: Kind of change reported to observers
+        doc: Docstring of the property
+        convert: Function applied to assigned values before they are
+            stored (default: None)
+        
+    Returns:
+        The property object
+    """
+    storage = '_' + name
+
+    def setter(self, value: Any) -> None:
+        if convert is not None:
+            value = convert(value)
+        setattr(self, storage, value)
+        self._changed(change)
+
+    return property(attrgetter(storage), setter, doc=doc)
+
+
+def geometry_attribute(name: str, doc: str) -> property:
+    """
+    Create a property for an attribute that defines a shape's geometry.
+    
+    The value is stored under a leading underscore and assigning it drops
+    the shape's memoized derived geometry and reports a 'geometry' change.
+    
+    Args:
+        name: Public attribute name
+        doc: Docstring of the property
+        
+    Returns:
+        The property object
+    """
+    storage = '_' + name
+
+    def setter(self, value: float) -> None:
+        setattr(self, storage, value)
+        self._invalidate()
+
+    return property(attrgetter(storage), setter, doc=doc)
+
+
+class Observable:
+    """
+    Base class for objects that report changes to subscribed observers.
+    
+    Every change increments a version counter. Objects without observers
+    store no observer list, so a change then costs one increment.
+    """
+
+    __slots__ = ('_observers', '_version')
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> 'Observable':
+        # Slots have no class-level defaults, so they are set here, before
+        # any __init__ assigns an observed attribute
+        self = super().__new__(cls)
+        self._observers: Optional[List[Observer]] = None
+        self._version = 0
+        return self
+
+    @property
+    def version(self) -> int:
+        """Number of changes made to the object so far."""
+        return self._version
+
+    def subscribe(self, observer: Observer) -> None:
+        """
+        Call an observer after every change of the object.
+        
+        Args:
+            observer: Function called with the object and the kind of change
+        """
+        if self._observers is None:
+            self._observers = []
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer: Observer) -> None:
+        """
+        Stop calling an observer.
+        
+        Args:
+            observer: A previously subscribed function
+            
+        Raises:
+            ValueError: If the observer is not subscribed
+        """
+        if not self._observers:
+            raise ValueError('Observer is not subscribed')
+        self._observers.remove(observer)
+        if not self._observers:
+            self._observers = None
+
+    def _changed(self, change: str) -> None:
+        """Bump the version and notify the observers of a change."""
+        self._version += 1
+        if self._observers:
+            self._notify(change)
+
+    def _notify(self, change: str) -> None:
+        for observer in tuple(self._observers):
+            observer(self, change)
+
+
+# Slots that copies and pickles of a shape do not take over
+_TRANSIENT_SLOTS = frozenset(('_observers', '_version', '_cache', '__dict__', '__weakref__'))
+
+
+class Shape(Observable, ABC):
+    """
+    Abstract base class for all geometric shapes.
+    
+    Shapes store their attributes in __slots__ rather than a per-instance
+    __dict__. Subclasses should declare __slots__ for the storage of their
+    own attributes to keep that layout.
+    """
+
+    # _cache holds memoized derived geometry, dropped whenever the geometry
+    # changes
+    __slots__ = ('_cache',)
+
+    def __new__(cls, *args: Any, **kwargs: Any) -> 'Shape':
+        # Sets the Observable slots as well, saving a call per shape
+        self = object.__new__(cls)
+        self._observers = None
+        self._version = 0
+        self._cache: Optional[Dict[str, Any]] = None
+        return self
+
+    def __getstate__(self) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        """
+        State used by copy and pickle.
+
+        Observers, version and cache are left out, so a copy or an
+        unpickled shape starts unobserved, at version 0 and with an empty
+        cache instead of sharing them with the original.
+        """
+        state = {}
+        for cls in type(self).__mro__:
+            slots = cls.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in _TRANSIENT_SLOTS and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return getattr(self, '__dict__', None), state
+
+    def _cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return a memoized derived value, computing it on first use.
+        
+        Args:
+            name: Cache key of the value
+            compute: Function computing the value
+            
+        Returns:
+            The cached or freshly computed value
+        """
+        cache = self._cache
+        if cache is None:
+            cache = self._cache = {}
+        elif name in cache:
+            return cache[name]
+        value = cache[name] = compute()
+        return value
+
+    def _invalidate(self) -> None:
+        """Drop all memoized derived values after the geometry changed and notify observers."""
+        self._cache = None
+        # Inlined _changed: this runs on every move and resize
+        self._version += 1
+        if self._observers:
+            self._notify('geometry')
     
     @abstractmethod
     def area(self) -> float:
@@ -25,8 +230,27 @@ class Shape(ABC):
         """
         pass
 
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """
+        Get the axis-aligned bounding box of the shape.
+        
+        The box encloses the geometry used by the intersection, distance
+        and containment tests and is cached until the geometry changes.
+        Subclasses override this; it is not abstract so that shape types
+        written before it existed can still be created.
+        
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y)
+
+        Raises:
+            NotImplementedError: If the subclass does not define it
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not define bbox()")
+
 class Movable(ABC):
     """Abstract base class for objects that can be moved in 2D space."""
+
+    __slots__ = ()
     
     @abstractmethod
     def move(self, dx: float, dy: float) -> Any:
@@ -44,6 +268,8 @@ class Movable(ABC):
 
 class Rotatable(ABC):
     """Abstract base class for objects that can be rotated."""
+
+    __slots__ = ()
     
     @abstractmethod
     def rotate(self, angle_degrees: float) -> Any:
@@ -58,8 +284,23 @@ class Rotatable(ABC):
         """
         pass        
 
-class ColorMixin:
-    """Mixin class that adds color property to objects."""
+def _intern(value: Any) -> Any:
+    """Intern strings so that many objects share one copy of each."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class ColorMixin(Observable):
+    """
+    Mixin class that adds color property to objects.
+    
+    Colors are interned, as a few distinct colors are shared by many
+    shapes. The mixin has no slots of its own, because two bases with
+    slots cannot be combined; classes using it declare a '_color' slot.
+    """
+
+    __slots__ = ()
+
+    color = observed_attribute('color', 'color', 'Color name or hex code', convert=_intern)
     
     def __init__(self, color: str = 'black', **kwargs):
         """
@@ -86,8 +327,16 @@ class ColorMixin:
         return self
 
 
-class LabelMixin:
-    """Mixin class that adds label property to objects."""
+class LabelMixin(Observable):
+    """
+    Mixin class that adds label property to objects.
+    
+    Classes using it declare a '_label' slot.
+    """
+
+    __slots__ = ()
+
+    label = observed_attribute('label', 'label', 'Text label')
     
     def __init__(self, label: str = '', **kwargs):
         """
@@ -1,9 +1,122 @@
-from typing import List, Tuple
-from .base import Shape, Movable, Rotatable
+from typing import Iterable, Iterator, List, Sequence, Tuple, Union
+from array import array
+from collections.abc import Sequence as SequenceABC
+from itertools import chain
+from .base import Shape, Movable, Rotatable, observed_attribute, vertices_bbox
 import math
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+# Vertex count from which move and rotate transform the coordinate buffer
+# with NumPy instead of a Python loop
+NUMPY_MIN_VERTICES = 64
+
+
+def _apply_affine(coords: array, a: float, b: float, c: float, d: float, tx: float, ty: float) -> None:
+    """
+    Map every point of an interleaved coordinate buffer in place.
+
+    Each (x, y) becomes (a*x + b*y + tx, c*x + d*y + ty). The NumPy and
+    Python paths evaluate the same expressions and give the same result.
+    """
+    if np is not None and len(coords) >= 2 * NUMPY_MIN_VERTICES:
+        xy = np.frombuffer(coords, dtype=np.float64).reshape(-1, 2)
+        x = xy[:, 0].copy()
+        y = xy[:, 1]
+        xy[:, 0] = a * x + b * y + tx
+        xy[:, 1] = c * x + d * y + ty
+        return
+    for i in range(0, len(coords), 2):
+        x = coords[i]
+        y = coords[i + 1]
+        coords[i] = a * x + b * y + tx
+        coords[i + 1] = c * x + d * y + ty
+
+
+class VertexView(SequenceABC):
+    """
+    Read-only sequence of (x, y) tuples over a polygon's coordinate buffer.
+
+    The view is live: it shows the vertices as they are when it is read,
+    so copy it with list() to keep the vertices from before a change.
+    It compares equal to any sequence of the same vertices.
+    """
+
+    __slots__ = ('_coords',)
+
+    def __init__(self, coords: array):
+        self._coords = coords
+
+    def __len__(self) -> int:
+        return len(self._coords) // 2
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[float, float], List[Tuple[float, float]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        n = len(self._coords) // 2
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('vertex index out of range')
+        return (self._coords[2 * index], self._coords[2 * index + 1])
+
+    def __iter__(self) -> Iterator[Tuple[float, float]]:
+        return zip(self._coords[0::2], self._coords[1::2])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SequenceABC) or isinstance(other, str):
+            return NotImplemented
+        return list(self) == [tuple(vertex) for vertex in other]
+
+    def __repr__(self) -> str:
+        return f'VertexView({list(self)!r})'
+
 class Polygon(Shape, Movable, Rotatable):
-    """A polygon defined by a list of vertices."""
+    """
+    A polygon defined by a list of vertices.
+
+    The vertices are stored as one contiguous array('d') of interleaved
+    x and y coordinates, which move and rotate update in place. Every
+    coordinate is therefore converted to float: integers beyond 2**53 in
+    magnitude are rounded, and the exact integer arithmetic of the
+    ShapeUtils predicates only applies to vertex lists of Python ints,
+    not to Polygon shapes.
+    """
+
+    __slots__ = ('_coords', '_angle')
+
+    angle = observed_attribute('angle', 'angle', 'Rotation angle in degrees')
+
+    @property
+    def vertices(self) -> Sequence[Tuple[float, float]]:
+        """
+        Get the vertices of the polygon.
+        
+        Returns a read-only view of the coordinate buffer; assign a new
+        list of vertices to change them.
+        
+        Returns:
+            Sequence of (x, y) vertex coordinates
+        """
+        return VertexView(self._coords)
+
+    @vertices.setter
+    def vertices(self, vertices: Iterable[Tuple[float, float]]) -> None:
+        self._coords = array('d', chain.from_iterable(vertices))
+        self._invalidate()
+
+    @property
+    def coords(self) -> array:
+        """
+        Interleaved x, y coordinates of the vertices.
+
+        The buffer is shared with the polygon and must not be modified;
+        NumPy can wrap it without copying through numpy.frombuffer.
+        """
+        return self._coords
     
     def __init__(self, vertices: List[Tuple[float, float]], angle: float = 0):
         """
@@ -20,7 +133,42 @@ class Polygon(Shape, Movable, Rotatable):
             raise ValueError('Polygon must have at least 3 vertices')
         self.vertices = vertices
         self.angle = angle
-    
+
+    def __getstate__(self):
+        # The coordinate buffer is updated in place, so copies get their own
+        dict_state, state = super().__getstate__()
+        state['_coords'] = array('d', self._coords)
+        return dict_state, state
+
+    @classmethod
+    def from_coords(cls, coords: Iterable[float], angle: float = 0) -> 'Polygon':
+        """
+        Create a polygon from interleaved coordinates x0, y0, x1, y1, ...
+
+        An array('d') is copied with a single memory copy, without going
+        through a list of vertex tuples.
+
+        Args:
+            coords: Interleaved x, y coordinates of the vertices
+            angle: Rotation angle in degrees
+
+        Returns:
+            The new polygon
+
+        Raises:
+            ValueError: If there is an odd number of coordinates or fewer
+                than 3 vertices
+        """
+        buffer = array('d', coords)
+        if len(buffer) % 2:
+            raise ValueError('Coordinates must come in x, y pairs')
+        if len(buffer) < 6:
+            raise ValueError('Polygon must have at least 3 vertices')
+        polygon = cls.__new__(cls)
+        polygon._coords = buffer
+        polygon.angle = angle
+        return polygon
+
     def perimeter(self) -> float:
         """
         Calculate the perimeter of the polygon.
@@ -31,15 +179,30 @@ class Polygon(Shape, Movable, Rotatable):
         Raises:
             ValueError: If polygon has fewer than 3 vertices
         """
-        n = len(self.vertices)
+        n = len(self._coords) // 2
         if n < 3:
             raise ValueError('Polygon must have at least 3 vertices')
+        return self._cached('perimeter', self._perimeter)
+
+    def _perimeter(self) -> float:
+        vertices = self.to_vertices()
+        n = len(vertices)
         p = 0
-        for i in range(len(self.vertices)):
-            x1, y1 = self.vertices[i]
-            x2, y2 = self.vertices[(i + 1) % n]  
+        for i in range(n):
+            x1, y1 = vertices[i]
+            x2, y2 = vertices[(i + 1) % n]
             p += math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2) 
         return p
+
+    def to_vertices(self) -> List[Tuple[float, float]]:
+        """
+        Get the vertices of the polygon as a list.
+        
+        Returns:
+            List of (x, y) vertex coordinates. The list is cached until
+            the geometry changes and must not be modified.
+        """
+        return self._cached('vertices', lambda: list(VertexView(self._coords)))
     
     def area(self) -> float:
         """
@@ -48,9 +211,32 @@ class Polygon(Shape, Movable, Rotatable):
         Returns:
             Area of the polygon
         """
-        n = len(self.vertices)
-        s = abs(sum([self.vertices[i][0] * self.vertices[(i+1) % n][1] -  self.vertices[i][1] * self.vertices[(i+1) % n][0] for i in range(len(self.vertices))])) / 2
-        return s
+        return self._cached('area', self._area)
+
+    def _area(self) -> float:
+        return abs(self._cached('twice_signed_area', self._twice_signed_area)) / 2
+
+    def _twice_signed_area(self) -> float:
+        # Area and centroid read the buffer directly, as rotate needs them
+        # after every change
+        coords = self._coords
+        if np is not None and len(coords) >= 2 * NUMPY_MIN_VERTICES:
+            x, y, x_next, y_next = self._numpy_edges()
+            return float((x * y_next - x_next * y).sum())
+        return sum(self._cross_products())
+
+    def _cross_products(self) -> List[float]:
+        """Cross product of the endpoints of every edge, x_i * y_i+1 - x_i+1 * y_i."""
+        xs = self._coords[0::2]
+        ys = self._coords[1::2]
+        return [x * y_next - x_next * y
+                for x, y, x_next, y_next in zip(xs, ys, xs[1:] + xs[:1], ys[1:] + ys[:1])]
+
+    def _numpy_edges(self) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """Coordinates of the start and end points of every edge."""
+        xy = np.frombuffer(self._coords, dtype=np.float64).reshape(-1, 2)
+        x, y = xy[:, 0], xy[:, 1]
+        return x, y, np.roll(x, -1), np.roll(y, -1)
     
     def _calculate_centroid(self) -> Tuple[float, float]:
         """
@@ -59,24 +245,78 @@ class Polygon(Shape, Movable, Rotatable):
         Returns:
             Tuple of (x, y) coordinates of the centroid
         """
-        n = len(self.vertices)
-        area = self.area()
-       
-        if area == 0:
-            x_sum = sum(v[0] for v in self.vertices)
-            y_sum = sum(v[1] for v in self.vertices)
-            return (x_sum / n, y_sum / n)
+        return self._cached('centroid', self._centroid)
+
+    def _centroid(self) -> Tuple[float, float]:
+        # The moments are signed, so they are divided by the signed area
+        # for the centroid to be right for clockwise polygons too
+        if np is not None and len(self._coords) >= 2 * NUMPY_MIN_VERTICES:
+            x, y, x_next, y_next = self._numpy_edges()
+            cross = x * y_next - x_next * y
+            twice_area = self._cached('twice_signed_area', lambda: float(cross.sum()))
+            if twice_area == 0:
+                return (float(x.mean()), float(y.mean()))
+            cx = float(((x + x_next) * cross).sum())
+            cy = float(((y + y_next) * cross).sum())
+        else:
+            xs = self._coords[0::2]
+            ys = self._coords[1::2]
+            cross = self._cross_products()
+            twice_area = self._cached('twice_signed_area', lambda: sum(cross))
+            if twice_area == 0:
+                return (sum(xs) / len(xs), sum(ys) / len(ys))
+            cx = sum([(x + x_next) * c for x, x_next, c in zip(xs, xs[1:] + xs[:1], cross)])
+            cy = sum([(y + y_next) * c for y, y_next, c in zip(ys, ys[1:] + ys[:1], cross)])
+        return (cx / (3 * twice_area), cy / (3 * twice_area))
+
+    def is_convex(self) -> bool:
+        """
+        Check if the polygon is convex.
         
-        cx = sum([(self.vertices[i][0] + self.vertices[(i+1)%n][0]) * (self.vertices[i][0] * self.vertices[(i+1)%n][1] - self.vertices[(i+1)%n][0] * self.vertices[i][1]) for i in range(n)])
-        cy = sum([(self.vertices[i][1] + self.vertices[(i+1)%n][1]) * (self.vertices[i][0] * self.vertices[(i+1)%n][1] - self.vertices[(i+1)%n][0] * self.vertices[i][1]) for i in range(n)])
-        cx /= (6 * area)
-        cy /= (6 * area)
+        A convex polygon turns the same way at every vertex (collinear
+        vertices are ignored) and winds around its interior only once,
+        which rules out self-intersecting stars. Polygons with no turn at
+        all are degenerate and not convex.
         
-        return (cx, cy)
+        Returns:
+            True if the polygon is convex, False otherwise
+        """
+        return self._cached('convex', self._is_convex)
+
+    def _is_convex(self) -> bool:
+        vertices = self.to_vertices()
+        n = len(vertices)
+        orientation = 0
+        x_signs = []
+        for i in range(n):
+            x0, y0 = vertices[i - 1]
+            x1, y1 = vertices[i]
+            x2, y2 = vertices[(i + 1) % n]
+            cross = (x1 - x0) * (y2 - y1) - (y1 - y0) * (x2 - x1)
+            if cross != 0:
+                turn = 1 if cross > 0 else -1
+                if orientation == 0:
+                    orientation = turn
+                elif turn != orientation:
+                    return False
+            if x2 != x1:
+                x_signs.append(x2 > x1)
+        # The x direction of a simple convex boundary reverses exactly twice
+        flips = sum(x_signs[i] != x_signs[i - 1] for i in range(len(x_signs)))
+        return orientation != 0 and flips <= 2
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """
+        Get the axis-aligned bounding box of the polygon.
+        
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y)
+        """
+        return self._cached('bbox', lambda: vertices_bbox(self.to_vertices()))
    
     def move(self, dx: float, dy: float) -> 'Polygon':
         """
-        Move the polygon by shifting all vertices.
+        Move the polygon by shifting all vertices in place.
         
         Args:
             dx: Offset in x direction
@@ -85,41 +325,38 @@ class Polygon(Shape, Movable, Rotatable):
         Returns:
             Self reference for method chaining
         """
-        self.vertices = [(x + dx, y + dy) for x, y in self.vertices]
+        coords = self._coords
+        if np is not None and len(coords) >= 2 * NUMPY_MIN_VERTICES:
+            np.frombuffer(coords, dtype=np.float64).reshape(-1, 2)[:] += (dx, dy)
+        else:
+            for i in range(0, len(coords), 2):
+                coords[i] += dx
+                coords[i + 1] += dy
+        self._invalidate()
         return self
     
     def rotate(self, angle_degrees: float) -> 'Polygon':
         """
         Rotate the polygon around its centroid.
         
+        The vertices are transformed in place by a single affine map
+        whose cosine and sine are computed once per call.
+        
         Args:
             angle_degrees: Angle to rotate in degrees
             
         Returns:
             Self reference for method chaining
         """
-        self.angle = (self.angle + angle_degrees) % 360
-        
         angle_rad = math.radians(angle_degrees)
-        
-        centroid = self._calculate_centroid()
-        cx, cy = centroid
-
-        new_vertices = []
-        for x, y in self.vertices:
-            # Translate to origin
-            x_translated = x - cx
-            y_translated = y - cy
-            
-            # Rotate
-            x_rotated = x_translated * math.cos(angle_rad) - y_translated * math.sin(angle_rad)
-            y_rotated = x_translated * math.sin(angle_rad) + y_translated * math.cos(angle_rad)
-            
-            # Translate back
-            new_x = x_rotated + cx
-            new_y = y_rotated + cy
-            
-            new_vertices.append((new_x, new_y))
-        
-        self.vertices = new_vertices
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad)
+        cx, cy = self._calculate_centroid()
+
+        # Rotation about (cx, cy): p' = R (p - c) + c
+        _apply_affine(self._coords, cos_a, -sin_a, sin_a, cos_a,
+                      cx - cos_a * cx + sin_a * cy, cy - sin_a * cx - cos_a * cy)
+        # _invalidate reports the change, so the angle is stored silently
+        self._angle = (self._angle + angle_degrees) % 360
+        self._invalidate()
         return self
\ No newline at end of file
@@ -1,9 +1,19 @@
-from typing import Tuple
-from .base import Shape, ColorMixin, LabelMixin, Movable, Rotatable
+from typing import List, Tuple
+from .base import Shape, ColorMixin, LabelMixin, Movable, Rotatable, geometry_attribute, observed_attribute
+from .base import vertices_bbox
 
 
 class Triangle(Shape, Movable, Rotatable):
     """Triangle shape with position, angle and dimensions."""
+
+    __slots__ = ('_a', '_b', '_c', '_x', '_y', '_angle')
+
+    a = geometry_attribute('a', 'Length of first side')
+    b = geometry_attribute('b', 'Length of second side')
+    c = geometry_attribute('c', 'Length of third side')
+    x = geometry_attribute('x', 'X-coordinate of position')
+    y = geometry_attribute('y', 'Y-coordinate of position')
+    angle = observed_attribute('angle', 'angle', 'Rotation angle in degrees')
     
     def __init__(self, a: float, b: float, c: float, x: float, y: float, angle: float):
         """
@@ -30,6 +40,9 @@ class Triangle(Shape, Movable, Rotatable):
         Returns:
             Area of the triangle
         """
+        return self._cached('area', self._heron)
+
+    def _heron(self) -> float:
         s = (self.a + self.b + self.c) / 2
         return (s * (s - self.a) * (s - self.b) * (s - self.c)) ** 0.5
     
@@ -40,6 +53,26 @@ class Triangle(Shape, Movable, Rotatable):
             Perimeter of the triangle
         """
         return self.a + self.b + self.c
+
+    def to_vertices(self) -> List[Tuple[float, float]]:
+        """Get the corner points of the triangle.
+        
+        The list is cached and shared between calls, so it must not be
+        modified.
+        
+        Returns:
+            List of (x, y) vertex coordinates
+        """
+        return self._cached('vertices', lambda: [
+            (self.x, self.y), (self.x + self.a, self.y), (self.x + self.a / 2, self.y + self.b)])
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """Get the axis-aligned bounding box of the triangle.
+        
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y)
+        """
+        return self._cached('bbox', lambda: vertices_bbox(self.to_vertices()))
     
     def move(self, dx: float, dy: float) -> 'Triangle':
         """Move the triangle by the specified offsets.
@@ -51,8 +84,9 @@ class Triangle(Shape, Movable, Rotatable):
         Returns:
             Self reference for method chaining
         """
-        self.x += dx
-        self.y += dy
+        self._x += dx
+        self._y += dy
+        self._invalidate()
         
         return self
     
@@ -71,6 +105,14 @@ class Triangle(Shape, Movable, Rotatable):
     
 class Rectangle(Shape, Movable, Rotatable):
     """Rectangle shape with position, angle and dimensions."""
+
+    __slots__ = ('_a', '_b', '_x', '_y', '_angle')
+
+    a = geometry_attribute('a', 'Width of rectangle')
+    b = geometry_attribute('b', 'Height of rectangle')
+    x = geometry_attribute('x', 'X-coordinate of position')
+    y = geometry_attribute('y', 'Y-coordinate of position')
+    angle = observed_attribute('angle', 'angle', 'Rotation angle in degrees')
     
     def __init__(self, a: float, b: float, x: float, y: float, angle: float):
         """
@@ -104,6 +146,27 @@ class Rectangle(Shape, Movable, Rotatable):
             Perimeter of the rectangle
         """
         return 2 * (self.a + self.b)
+
+    def to_vertices(self) -> List[Tuple[float, float]]:
+        """Get the corner points of the rectangle.
+        
+        The list is cached and shared between calls, so it must not be
+        modified.
+        
+        Returns:
+            List of (x, y) vertex coordinates
+        """
+        return self._cached('vertices', lambda: [
+            (self.x, self.y), (self.x + self.a, self.y),
+            (self.x + self.a, self.y + self.b), (self.x, self.y + self.b)])
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """Get the axis-aligned bounding box of the rectangle.
+        
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y)
+        """
+        return self._cached('bbox', lambda: vertices_bbox(self.to_vertices()))
     
     def move(self, dx: float, dy: float) -> 'Rectangle':
         """Move the rectangle by the specified offsets.
@@ -115,8 +178,9 @@ class Rectangle(Shape, Movable, Rotatable):
         Returns:
             Self reference for method chaining
         """
-        self.x += dx
-        self.y += dy
+        self._x += dx
+        self._y += dy
+        self._invalidate()
         
         return self
     
@@ -135,6 +199,13 @@ class Rectangle(Shape, Movable, Rotatable):
     
 class Circle(Shape, Movable, Rotatable):
     """Circle shape with position, angle and radius."""
+
+    __slots__ = ('_r', '_x', '_y', '_angle')
+
+    r = geometry_attribute('r', 'Radius of the circle')
+    x = geometry_attribute('x', 'X-coordinate of center')
+    y = geometry_attribute('y', 'Y-coordinate of center')
+    angle = observed_attribute('angle', 'angle', 'Rotation angle in degrees')
     
     def __init__(self, r: float, x: float, y: float, angle: float):
         """
@@ -184,6 +255,15 @@ class Circle(Shape, Movable, Rotatable):
             Circumference of the circle
         """
         return 2 * 3.14 * self.r
+
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """Get the axis-aligned bounding box of the circle.
+        
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y)
+        """
+        return self._cached('bbox', lambda: (
+            self.x - self.r, self.y - self.r, self.x + self.r, self.y + self.r))
     
     def move(self, dx: float, dy: float) -> 'Circle':
         """Move the circle by the specified offsets.
@@ -195,8 +275,9 @@ class Circle(Shape, Movable, Rotatable):
         Returns:
             Self reference for method chaining
         """
-        self.x += dx
-        self.y += dy
+        self._x += dx
+        self._y += dy
+        self._invalidate()
         
         return self
     
@@ -215,6 +296,8 @@ class Circle(Shape, Movable, Rotatable):
 
 class LabelledColoredRectangle(Rectangle, ColorMixin, LabelMixin):
     """Rectangle with additional color and label attributes."""
+
+    __slots__ = ('_color', '_label')
     
     def __init__(self, a: float, b: float, x: float = 0, y: float = 0, angle: float = 0, 
                  color: str = 'black', label: str = ''):
@@ -236,6 +319,8 @@ class LabelledColoredRectangle(Rectangle, ColorMixin, LabelMixin):
 
 class LabelledColoredCircle(Circle, ColorMixin, LabelMixin):
     """Circle with additional color and label attributes."""
+
+    __slots__ = ('_color', '_label')
     
     def __init__(self, r: float, x: float = 0, y: float = 0, angle: float = 0, 
                  color: str = 'black', label: str = ''):
@@ -256,6 +341,8 @@ class LabelledColoredCircle(Circle, ColorMixin, LabelMixin):
 
 class LabelledColoredTriangle(Triangle, ColorMixin, LabelMixin):
     """Triangle with additional color and label attributes."""
+
+    __slots__ = ('_color', '_label')
     
     def __init__(self, a: float, b: float, c: float, x: float = 0, y: float = 0, angle: float = 0, 
                  color: str = 'black', label: str = ''):
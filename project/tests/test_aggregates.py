@@ -0,0 +1,91 @@
+import unittest
+import math
+import random
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.aggregates import CompensatedSum, ShapeAggregates
+from shapes.primitives import Rectangle, Circle, LabelledColoredRectangle, LabelledColoredCircle
+
+
+class TestCompensatedSum(unittest.TestCase):
+    """Test cases for the compensated running sum."""
+
+    def test_small_values_are_not_lost(self):
+        """Test values far below the rounding step of the sum still count."""
+        total = CompensatedSum()
+        total.add(1e16)
+        for _ in range(1000):
+            total.add(1.0)
+        total.add(-1e16)
+        self.assertEqual(total.value, 1000.0)
+
+    def test_no_drift_under_churn(self):
+        """Test adding and removing values many times matches an exact sum."""
+        rng = random.Random(1)
+        total = CompensatedSum()
+        live = []
+        for _ in range(20000):
+            if live and rng.random() < 0.5:
+                total.add(-live.pop(rng.randrange(len(live))))
+            else:
+                value = rng.uniform(0, 1e6) * 10 ** rng.randint(-6, 6)
+                live.append(value)
+                total.add(value)
+        self.assertEqual(total.value, math.fsum(live))
+
+
+class TestShapeAggregates(unittest.TestCase):
+    """Test cases for the ShapeAggregates running totals."""
+
+    def setUp(self):
+        self.aggregates = ShapeAggregates()
+        self.red = LabelledColoredRectangle(2, 3, 0, 0, 0, color='red')
+        self.circle = Circle(1, 0, 0, 0)
+        self.red_circle = LabelledColoredCircle(2, 5, 5, 0, color='red')
+        for key, shape in enumerate((self.red, self.circle, self.red_circle)):
+            self.aggregates.add(key, shape)
+
+    def test_totals(self):
+        """Test overall totals and per-type and per-color breakdowns."""
+        self.assertAlmostEqual(self.aggregates.total_area, 6 + 3.14 + 4 * 3.14)
+        self.assertAlmostEqual(self.aggregates.total_perimeter, 10 + 2 * 3.14 + 4 * 3.14)
+        by_type = self.aggregates.by_type()
+        self.assertEqual(set(by_type), {'LabelledColoredRectangle', 'Circle', 'LabelledColoredCircle'})
+        self.assertEqual(by_type['Circle']['count'], 1)
+        by_color = self.aggregates.by_color()
+        self.assertEqual(list(by_color), ['red'])
+        self.assertEqual(by_color['red']['count'], 2)
+        self.assertAlmostEqual(by_color['red']['total_area'], 6 + 4 * 3.14)
+
+    def test_update_uses_remembered_contribution(self):
+        """Test a changed shape is subtracted with the values it was added with."""
+        self.red.set_color('blue')
+        self.red.a = 10
+        self.aggregates.update(0, self.red)
+        self.assertAlmostEqual(self.aggregates.by_color()['blue']['total_area'], 30)
+        self.assertAlmostEqual(self.aggregates.by_color()['red']['total_area'], 4 * 3.14)
+        self.assertAlmostEqual(self.aggregates.total_area, 30 + 5 * 3.14)
+
+    def test_remove(self):
+        """Test removing every shape leaves exactly zero and no groups."""
+        self.aggregates.remove(1)
+        self.assertNotIn('Circle', self.aggregates.by_type())
+        self.aggregates.remove(0)
+        self.aggregates.remove(2)
+        self.assertEqual(self.aggregates.total_area, 0)
+        self.assertEqual(self.aggregates.by_color(), {})
+        with self.assertRaises(KeyError):
+            self.aggregates.remove(0)
+
+    def test_duplicate_add(self):
+        """Test adding a counted key raises KeyError."""
+        with self.assertRaises(KeyError):
+            self.aggregates.add(0, Rectangle(1, 1, 0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from operations.algorithms import (
     Map, ShapeActions, check_crossing, distance_between_shapes,
-    search_shapes_by_area, search_shapes_by_position, polygons_intersect
+    search_shapes_by_area, search_shapes_by_position, polygons_intersect,
+    search_shapes_by_area_range, largest_shapes, smallest_shapes,
+    search_shapes_by_positions, register_crossing_kernel, register_distance_kernel,
+    distance_matrix, _crossing_kernels, _distance_kernels
 )
 from shapes.primitives import Triangle, Rectangle, Circle
-from utils.geometry import ShapeUtils
+from shapes.primitives import LabelledColoredRectangle, LabelledColoredCircle, LabelledColoredTriangle
+from shapes.base import Shape
+from shapes.poligons import Polygon
+from utils.geometry import ShapeUtils, np
+from unittest import mock
+import random
+
+
+def restore_kernels(test):
+    """Undo kernels a test registers on the global registries once it ends."""
+    for registry in (_crossing_kernels, _distance_kernels):
+        # Cleanups run last in first out: restore the table, then drop the cache
+        test.addCleanup(registry._resolved.clear)
+        test.addCleanup(setattr, registry, '_kernels', dict(registry._kernels))
+
 
 class TestShapeUtils(unittest.TestCase):
     """Test cases for the ShapeUtils utility class."""
@@ -89,7 +106,128 @@ class TestShapeUtils(unittest.TestCase):
         concave = [(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)]
         self.assertTrue(ShapeUtils.is_point_inside_polygon_way2((2, 2), concave))
         self.assertFalse(ShapeUtils.is_point_inside_polygon_way2((6, 6), concave))
-    
+
+        # Test point outside only the closing edge
+        triangle = [(0, 0), (10, 0), (0, 10)]
+        self.assertFalse(ShapeUtils.is_point_inside_polygon_way2((-1, 5), triangle))
+    
+    def test_is_point_inside_polygon_way1_is_silent(self):
+        """Test the angle method only traces through the debug logger."""
+        polygon = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        with mock.patch('builtins.print') as mocked_print:
+            ShapeUtils.is_point_inside_polygon_way1((5, 5), polygon)
+        mocked_print.assert_not_called()
+        with self.assertLogs('utils.geometry', level='DEBUG') as logs:
+            ShapeUtils.is_point_inside_polygon_way1((5, 5), polygon)
+        self.assertTrue(any('Inside: True' in line for line in logs.output))
+
+    def test_is_point_inside_polygon(self):
+        """Test crossing and winding strategies, including boundaries."""
+        concave = [(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)]
+        for strategy in ('crossing', 'winding', 'angle'):
+            self.assertTrue(ShapeUtils.is_point_inside_polygon((2, 2), concave, strategy))
+            self.assertFalse(ShapeUtils.is_point_inside_polygon((5, 8), concave, strategy))
+            self.assertFalse(ShapeUtils.is_point_inside_polygon((11, 11), concave, strategy))
+
+        for strategy in ('crossing', 'winding'):
+            self.assertTrue(ShapeUtils.is_point_inside_polygon((5, 0), concave, strategy))
+            self.assertTrue(ShapeUtils.is_point_inside_polygon((10, 10), concave, strategy))
+            self.assertTrue(ShapeUtils.is_point_inside_polygon((7, 7), concave, strategy))
+            # Ray through a vertex must not be double counted
+            self.assertTrue(ShapeUtils.is_point_inside_polygon((3, 5), concave, strategy))
+            self.assertFalse(ShapeUtils.is_point_inside_polygon((-1, 5), concave, strategy))
+
+        with self.assertRaises(ValueError):
+            ShapeUtils.is_point_inside_polygon((2, 2), concave, 'unknown')
+
+    def test_is_point_inside_self_intersecting_polygon(self):
+        """Test crossing and winding rules differ inside a pentagram's core."""
+        star = [(0, 10), (6, -8), (-10, 3), (10, 3), (-6, -8)]
+        self.assertFalse(ShapeUtils.is_point_inside_polygon((0, 0), star, 'crossing'))
+        self.assertTrue(ShapeUtils.is_point_inside_polygon((0, 0), star, 'winding'))
+
+    def test_is_point_inside_polygon_large_integers(self):
+        """Test predicates stay exact for large integer coordinates."""
+        big = 10 ** 18
+        triangle = [(0, 0), (big, 0), (0, big)]
+        self.assertTrue(ShapeUtils.is_point_inside_polygon((big // 2, big // 2), triangle))
+        self.assertFalse(ShapeUtils.is_point_inside_polygon((big // 2 + 1, big // 2), triangle))
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_points_inside_polygon(self):
+        """Test vectorized point-in-polygon checks."""
+        concave = [(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)]
+        xs = np.array([2, 6, 11, 5, 10, 0])
+        ys = np.array([2, 8, 11, 0, 5, 10])
+        result = ShapeUtils.points_inside_polygon(xs, ys, concave)
+        self.assertEqual(list(result), [True, False, False, True, True, True])
+
+    def test_point_segment_distance(self):
+        """Test distances to the interior and endpoints of a segment."""
+        self.assertEqual(ShapeUtils.point_segment_distance((5, 3), (0, 0), (10, 0)), 3)
+        self.assertEqual(ShapeUtils.point_segment_distance((13, 4), (0, 0), (10, 0)), 5)
+        self.assertEqual(ShapeUtils.point_segment_distance((-3, -4), (0, 0), (10, 0)), 5)
+        self.assertEqual(ShapeUtils.point_segment_distance((3, 4), (0, 0), (0, 0)), 5)
+
+    def test_polygons_distance(self):
+        """Test boundary distances between separate polygons."""
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        self.assertEqual(ShapeUtils.polygons_distance(square, [(13, 4), (20, 0), (20, 10)]), 3)
+        self.assertEqual(ShapeUtils.polygons_distance([(13, 4), (20, 0), (20, 10)], square), 3)
+
+    def test_separating_axis_test(self):
+        """Test SAT intersection results and minimum translation vectors."""
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        self.assertEqual(ShapeUtils.separating_axis_test(square, [(20, 0), (30, 0), (25, 5)]), (False, None))
+
+        intersects, mtv = ShapeUtils.separating_axis_test(square, [(8, 2), (20, 2), (20, 8), (8, 8)])
+        self.assertTrue(intersects)
+        self.assertAlmostEqual(mtv[0], -2)
+        self.assertAlmostEqual(mtv[1], 0)
+
+        intersects, mtv = ShapeUtils.separating_axis_test(square, [(10, 0), (20, 0), (20, 10)])
+        self.assertTrue(intersects)
+        self.assertAlmostEqual(math.hypot(*mtv), 0)
+
+    def test_separating_axis_test_containment(self):
+        """Test the translation vector separates a contained polygon."""
+        inner = [(4, 1), (6, 1), (6, 3), (4, 3)]
+        outer = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        intersects, (dx, dy) = ShapeUtils.separating_axis_test(inner, outer)
+        self.assertTrue(intersects)
+        self.assertEqual((dx, dy), (0, -3))
+
+    def test_separating_axis_test_matches_edge_tests(self):
+        """Test SAT agrees with polygons_intersect on random triangles."""
+        rng = random.Random(5)
+        for _ in range(500):
+            tri1 = [(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(3)]
+            tri2 = [(rng.randint(0, 20), rng.randint(0, 20)) for _ in range(3)]
+            if Polygon(tri1).area() == 0 or Polygon(tri2).area() == 0:
+                continue
+            self.assertEqual(ShapeUtils.separating_axis_test(tri1, tri2)[0],
+                             polygons_intersect(tri1, tri2), (tri1, tri2))
+
+    def test_separating_axis_test_large_convex_polygons(self):
+        """Test SAT on many-vertex polygons against the edge tests and its own MTV."""
+        rng = random.Random(8)
+
+        def convex_polygon(n, cx, cy, r):
+            angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(n))
+            return [(cx + r * math.cos(a), cy + r * math.sin(a)) for a in angles]
+
+        for _ in range(200):
+            poly1 = convex_polygon(rng.randint(5, 30), 0, 0, rng.uniform(5, 10))
+            poly2 = convex_polygon(rng.randint(5, 30), rng.uniform(-20, 20), rng.uniform(-20, 20),
+                                   rng.uniform(5, 10))
+            intersects, mtv = ShapeUtils.separating_axis_test(poly1, poly2)
+            self.assertEqual(intersects, polygons_intersect(poly1, poly2))
+            if intersects:
+                moved = [(x + mtv[0] * 1.001, y + mtv[1] * 1.001) for x, y in poly1]
+                self.assertFalse(ShapeUtils.separating_axis_test(moved, poly2)[0])
+                moved = [(x + mtv[0] * 0.999, y + mtv[1] * 0.999) for x, y in poly1]
+                self.assertTrue(ShapeUtils.separating_axis_test(moved, poly2)[0])
+
     def test_line_intersects(self):
         """Test line intersection detection."""
         # Intersecting lines
@@ -124,6 +262,25 @@ class TestMap(unittest.TestCase):
         self.assertEqual(len(self.map.shapes), initial_count + 1)
         self.assertIn(self.rectangle, self.map.shapes)
     
+    def test_add_shape_without_bbox(self):
+        """Test shapes that do not define bbox() can still be added and queried."""
+        class Blob(Shape):
+            def area(self):
+                return 2.0
+
+            def perimeter(self):
+                return 5.0
+
+        blob = Blob()
+        self.map.add_shapes([self.rectangle, blob])
+        self.assertIn(blob, self.map)
+        self.assertEqual(self.map.total_area(), self.rectangle.area() + 2.0)
+        self.assertEqual(search_shapes_by_area(self.map, 2.0), [blob])
+        self.assertEqual(search_shapes_by_position(self.map, self.rectangle.x, self.rectangle.y), [self.rectangle])
+        self.assertEqual(search_shapes_by_positions(self.map, [(1e9, 1e9)]), [[]])
+        self.map.remove_shape(blob)
+        self.assertEqual(len(self.map.spatial_index), 1)
+
     def test_add_invalid_shape(self):
         """Test adding an invalid shape raises TypeError."""
         with self.assertRaises(TypeError):
@@ -139,6 +296,59 @@ class TestMap(unittest.TestCase):
         self.assertNotIn(self.rectangle, self.map.shapes)
         self.assertIn(self.circle, self.map.shapes)
     
+    def test_shape_ids(self):
+        """Test shapes get stable IDs that are never reused."""
+        rect_id = self.map.add_shape(self.rectangle)
+        circle_id = self.map.add_shape(self.circle)
+        self.assertNotEqual(rect_id, circle_id)
+        self.assertEqual(self.map.add_shape(self.rectangle), rect_id)
+        self.assertEqual(len(self.map), 2)
+        self.assertIs(self.map.get_shape(circle_id), self.circle)
+        self.assertEqual(self.map.shape_id(self.circle), circle_id)
+
+        self.map.remove_shape(self.rectangle)
+        with self.assertRaises(KeyError):
+            self.map.get_shape(rect_id)
+        self.assertEqual(self.map.shape_id(self.circle), circle_id)
+        self.assertNotIn(self.map.add_shape(self.rectangle), (rect_id, circle_id))
+
+    def test_remove_swaps_last_shape(self):
+        """Test removal moves the last shape into the freed slot."""
+        self.map.add_shapes([self.rectangle, self.circle, self.triangle])
+        self.map.remove_shape(self.rectangle)
+        self.assertEqual(self.map.shapes, [self.triangle, self.circle])
+        self.map.remove_shape(self.circle)
+        self.assertEqual(self.map.shapes, [self.triangle])
+        self.assertEqual(search_shapes_by_position(self.map, 7, 6), [self.triangle])
+
+    def test_bulk_add_and_remove(self):
+        """Test adding and removing many shapes at once."""
+        circles = [Circle(1, 3 * i, 0, 0) for i in range(1000)]
+        ids = self.map.add_shapes(circles)
+        self.assertEqual(len(set(ids)), 1000)
+        self.map.remove_shapes(circles[::2])
+        self.assertEqual(len(self.map), 500)
+        self.assertEqual(set(self.map.shapes), set(circles[1::2]))
+        self.assertEqual(search_shapes_by_position(self.map, 3, 0), [circles[1]])
+        self.assertEqual(search_shapes_by_position(self.map, 0, 0), [])
+
+    def test_add_shapes_is_atomic(self):
+        """Test a non-shape in a bulk add leaves the map unchanged."""
+        with self.assertRaises(TypeError):
+            self.map.add_shapes([self.rectangle, "Not a shape"])
+        self.assertEqual(len(self.map), 0)
+
+        # Sides that do not form a triangle give a complex area
+        self.map.add_shape(self.circle)
+        for add in (self.map.add_shape, lambda shape: self.map.add_shapes([self.rectangle, shape])):
+            with self.assertRaises(ValueError):
+                add(Triangle(1, 1, 10, 0, 0, 0))
+            self.assertEqual(len(self.map), 1)
+            self.assertEqual((len(self.map.spatial_index), len(self.map.area_index), len(self.map.aggregates)),
+                             (1, 1, 1))
+            self.assertNotIn(self.rectangle, self.map)
+        self.assertEqual(self.map.add_shapes([self.rectangle, self.circle, self.rectangle]), [1, 0, 1])
+
     def test_remove_nonexistent_shape(self):
         """Test removing a shape that isn't in the map."""
         initial_count = len(self.map.shapes)
@@ -159,11 +369,132 @@ class TestMap(unittest.TestCase):
         expected_perimeter = self.rectangle.perimeter() + self.circle.perimeter()
         self.assertAlmostEqual(self.map.total_perimeter(), expected_perimeter)
     
+    def test_running_totals(self):
+        """Test totals and breakdowns follow adds, removes and updates."""
+        blue = LabelledColoredRectangle(2, 2, 0, 0, 0, color='blue')
+        self.map.add_shapes([self.rectangle, self.circle, blue])
+        self.map.remove_shape(self.circle)
+        blue.a = 5
+        blue.set_color('green')
+        self.map.update_shape(blue)
+        self.assertAlmostEqual(self.map.total_area(), self.rectangle.area() + 10)
+        self.assertAlmostEqual(self.map.total_perimeter(), self.rectangle.perimeter() + 14)
+        self.assertEqual(self.map.totals_by_color(), {'green': {'count': 1, 'total_area': 10, 'total_perimeter': 14}})
+        self.assertEqual(set(self.map.totals_by_type()), {'Rectangle', 'LabelledColoredRectangle'})
+
+    def test_map_follows_shape_changes(self):
+        """Test the indexes and totals follow shapes changed after being added."""
+        red = LabelledColoredCircle(1, 0, 0, 0, color='red')
+        self.map.add_shapes([self.rectangle, red])
+        red.move(100, 100)
+        red.r = 2
+        red.set_color('blue')
+        self.assertEqual(search_shapes_by_position(self.map, 100, 100), [red])
+        self.assertEqual(search_shapes_by_position(self.map, 0, 0), [self.rectangle])
+        self.assertEqual(search_shapes_by_area(self.map, red.area()), [red])
+        self.assertAlmostEqual(self.map.total_area(), self.rectangle.area() + 4 * 3.14)
+        self.assertEqual(list(self.map.totals_by_color()), ['blue'])
+
+        # Removed shapes no longer update the map
+        self.map.remove_shape(red)
+        red.move(-100, -100)
+        self.assertEqual(search_shapes_by_position(self.map, 0, 0), [self.rectangle])
+
+    def test_transform_selection(self):
+        """Test transform moves and rotates only the selected shapes."""
+        ids = self.map.add_shapes([self.rectangle, self.circle, self.triangle])
+        moved = self.map.transform(ids[:2], dx=100, dy=0, angle=30)
+        self.assertEqual(moved, ids[:2])
+        self.assertEqual((self.rectangle.x, self.circle.x, self.triangle.x), (100, 104, 5))
+        self.assertEqual((self.rectangle.angle, self.circle.angle, self.triangle.angle), (30, 30, 0))
+        self.assertEqual(search_shapes_by_position(self.map, 104, 4), [self.circle])
+        self.assertEqual(search_shapes_by_position(self.map, 1, 1), [])
+
+        moved = self.map.transform(lambda shape: isinstance(shape, Triangle), dy=-5)
+        self.assertEqual(moved, [ids[2]])
+        self.assertEqual(search_shapes_by_position(self.map, 7, 1), [self.triangle])
+
+    def test_transform_about_pivot(self):
+        """Test a pivot turns the selection rigidly about that point."""
+        square = Polygon([(9, -1), (11, -1), (11, 1), (9, 1)])
+        circle = Circle(1, 0, 10, 0)
+        ids = self.map.add_shapes([square, circle, self.rectangle])
+        self.map.transform(ids, angle=90, pivot=(0, 0))
+        expected = [(1, 9), (1, 11), (-1, 11), (-1, 9)]
+        for actual, vertex in zip(square.vertices, expected):
+            self.assertAlmostEqual(actual[0], vertex[0])
+            self.assertAlmostEqual(actual[1], vertex[1])
+        self.assertAlmostEqual(circle.x, -10)
+        self.assertAlmostEqual(circle.y, 0)
+        # The rectangle's bounding box center (2.5, 1.5) goes to (-1.5, 2.5)
+        self.assertAlmostEqual(self.rectangle.x, -4)
+        self.assertAlmostEqual(self.rectangle.y, 1)
+        self.assertEqual(search_shapes_by_position(self.map, 0, 10), [square])
+        self.assertAlmostEqual(self.map.total_area(), 4 + 3.14 + 15)
+
+    def test_transform_refreshes_indexes_once(self):
+        """Test transform skips per-shape index updates but still notifies other observers."""
+        ids = self.map.add_shapes([self.rectangle, self.circle])
+        changes = []
+        self.circle.subscribe(lambda shape, change: changes.append(change))
+        with mock.patch.object(self.map.spatial_index, 'update') as update:
+            self.map.transform(ids, dx=1, dy=1, angle=10)
+        update.assert_not_called()
+        self.assertEqual(changes, ['angle', 'geometry'])
+        self.assertEqual(self.map.spatial_index.bbox(ids[0]), self.rectangle.bbox())
+
+    def test_transform_errors(self):
+        """Test unknown IDs and shapes that cannot move leave the map unchanged."""
+        class Marker(Shape):
+            def area(self):
+                return 0.0
+
+            def perimeter(self):
+                return 0.0
+
+            def bbox(self):
+                return (0, 0, 0, 0)
+
+        ids = self.map.add_shapes([self.rectangle, Marker()])
+        with self.assertRaises(KeyError):
+            self.map.transform([ids[0], 99], dx=1)
+        with self.assertRaises(TypeError):
+            self.map.transform(ids, dx=1)
+        self.assertEqual(self.rectangle.x, 0)
+
     def test_empty_map(self):
         """Test operations on an empty map."""
         self.assertEqual(len(self.map.shapes), 0)
         self.assertEqual(self.map.total_area(), 0)
         self.assertEqual(self.map.total_perimeter(), 0)
+        self.assertEqual(list(self.map.find_all_crossings()), [])
+
+    def test_find_all_crossings(self):
+        """Test finding every intersecting pair of shapes."""
+        far_circle = Circle(1, 100, 100, 0)
+        for shape in (self.rectangle, self.circle, self.triangle, far_circle):
+            self.map.add_shape(shape)
+
+        expected = [(a, b) for i, a in enumerate(self.map.shapes)
+                    for b in self.map.shapes[i + 1:] if check_crossing(a, b)]
+        crossings = list(self.map.find_all_crossings())
+        self.assertEqual(len(crossings), len(expected))
+        self.assertEqual(set(crossings), set(expected))
+        self.assertIn((self.rectangle, self.circle), crossings)
+        self.assertFalse(any(far_circle in pair for pair in crossings))
+
+    def test_nearest(self):
+        """Test finding the shapes closest to a point or a shape."""
+        far_rect = Rectangle(2, 2, 50, 0, 0)
+        far_circle = Circle(1, 100, 100, 0)
+        for shape in (self.rectangle, far_rect, far_circle):
+            self.map.add_shape(shape)
+
+        self.assertEqual(self.map.nearest((48, 1)), [(far_rect, 2)])
+        result = self.map.nearest(self.rectangle, k=2)
+        self.assertEqual([shape for shape, _ in result], [far_rect, far_circle])
+        self.assertEqual(result[0][1], distance_between_shapes(self.rectangle, far_rect))
+        self.assertEqual(self.map.nearest((48, 1), k=3, max_distance=10), [(far_rect, 2)])
 
 
 class TestCheckCrossing(unittest.TestCase):
@@ -220,6 +551,77 @@ class TestCheckCrossing(unittest.TestCase):
         rect = Rectangle(5, 5, 0, 0, 0)
         self.assertFalse(check_crossing(circle, rect))
 
+    def test_convex_shapes_use_sat(self):
+        """Test convex polygonal shapes are checked with the SAT engine."""
+        triangle = Triangle(4, 4, 4, 0, 0, 0)
+        polygon = Polygon([(1, 1), (6, 1), (6, 6)])
+        with mock.patch.object(ShapeUtils, 'separating_axis_test',
+                               wraps=ShapeUtils.separating_axis_test) as sat:
+            self.assertTrue(check_crossing(triangle, polygon))
+            self.assertTrue(check_crossing(Rectangle(2, 2, 5, 0, 0), polygon))
+        self.assertEqual(sat.call_count, 2)
+
+    def test_concave_polygon_crossing(self):
+        """Test concave polygons fall back to the edge tests."""
+        concave = Polygon([(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)])
+        self.assertFalse(check_crossing(concave, Rectangle(2, 2, 4, 7, 0)))
+        self.assertTrue(check_crossing(concave, Rectangle(2, 2, 4, 3, 0)))
+
+    def test_disjoint_bounding_boxes_skip_exact_test(self):
+        """Test shapes with disjoint bounding boxes are rejected before the exact test."""
+        circle = Circle(3, 100, 100, 0)
+        rect = Rectangle(5, 5, 0, 0, 0)
+        with mock.patch.object(ShapeUtils, 'circle_rectangle_intersection') as exact:
+            self.assertFalse(check_crossing(circle, rect))
+        exact.assert_not_called()
+
+    def test_overlapping_bounding_boxes_without_crossing(self):
+        """Test overlapping bounding boxes still get the exact test."""
+        circle = Circle(1, 0, 0, 0)
+        rect = Rectangle(5, 5, 0.9, 0.9, 0)
+        self.assertFalse(check_crossing(circle, rect))
+
+    def test_shapes_without_bbox(self):
+        """Test shapes that do not define bbox() skip the box check and use the default kernels."""
+        class Blob(Shape):
+            def area(self):
+                return 1.0
+
+            def perimeter(self):
+                return 4.0
+
+        blob, circle = Blob(), Circle(1, 0, 0, 0)
+        self.assertFalse(check_crossing(blob, circle))
+        self.assertFalse(check_crossing(circle, blob))
+        self.assertEqual(distance_between_shapes(blob, circle), float('inf'))
+
+        shape_map = Map()
+        shape_map.add_shape(circle)
+        shape_map.add_shape(blob)
+        self.assertEqual(list(shape_map.find_all_crossings()), [])
+        self.assertEqual(shape_map.nearest(blob), [])
+
+    def test_labelled_colored_shapes_use_base_kernels(self):
+        """Test subclasses of the primitives are dispatched like their bases."""
+        circle = LabelledColoredCircle(3, 5, 5, 0, color='red', label='c')
+        rect = LabelledColoredRectangle(5, 5, 0, 0, 0, color='blue', label='r')
+        self.assertTrue(check_crossing(circle, rect))
+        self.assertTrue(check_crossing(rect, Rectangle(5, 5, 3, 3, 0)))
+        self.assertAlmostEqual(distance_between_shapes(rect, Circle(1, 10, 2.5, 0)), 4)
+
+    def test_register_kernels(self):
+        """Test new shape types get kernels without editing check_crossing."""
+        class Dot(Circle):
+            pass
+
+        restore_kernels(self)
+        register_crossing_kernel(Dot, Rectangle, lambda dot, rect: 'dot-rect')
+        register_distance_kernel(Dot, Rectangle, lambda dot, rect: 42.0)
+        rect = Rectangle(5, 5, 0, 0, 0)
+        self.assertEqual(check_crossing(rect, Dot(1, 2, 2, 0)), 'dot-rect')
+        self.assertEqual(distance_between_shapes(Dot(1, 2, 2, 0), rect), 42.0)
+        self.assertTrue(check_crossing(Circle(1, 2, 2, 0), rect))
+
 
 class TestDistanceBetweenShapes(unittest.TestCase):
     """Test cases for the distance_between_shapes function."""
@@ -261,6 +663,92 @@ class TestDistanceBetweenShapes(unittest.TestCase):
         # Test reverse order
         self.assertEqual(distance_between_shapes(rect, circle), 7)
 
+    def test_triangle_distances(self):
+        """Test distances from a triangle to every other shape type."""
+        triangle = Triangle(4, 3, 5, 0, 0, 0)  # vertices (0, 0), (4, 0), (2, 3)
+        self.assertEqual(distance_between_shapes(triangle, Rectangle(2, 2, 6, 0, 0)), 2)
+        self.assertEqual(distance_between_shapes(Triangle(4, 3, 5, 0, -5, 0), triangle), 2)
+        self.assertEqual(distance_between_shapes(triangle, Circle(1, 2, -3, 0)), 2)
+        self.assertEqual(distance_between_shapes(Circle(1, 2, -3, 0), triangle), 2)
+        self.assertEqual(distance_between_shapes(triangle, Polygon([(2, 5), (3, 7), (1, 7)])), 2)
+        self.assertEqual(distance_between_shapes(triangle, Circle(0.5, 2, 1, 0)), 0)
+
+    def test_polygon_distances(self):
+        """Test polygon distances, including edge-to-edge and containment cases."""
+        square = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])
+        # The closest points are a vertex of the diamond and an edge of the square
+        diamond = Polygon([(15, 5), (18, 2), (21, 5), (18, 8)])
+        self.assertEqual(distance_between_shapes(square, diamond), 5)
+        self.assertEqual(distance_between_shapes(square, Polygon([(2, 2), (8, 2), (5, 8)])), 0)
+        self.assertEqual(distance_between_shapes(Circle(2, 5, 5, 0), square), 0)
+        self.assertAlmostEqual(distance_between_shapes(Circle(2, 13, 14, 0), square), 3)
+
+    def test_circle_polygon_crossing(self):
+        """Test circles cross triangles and polygons they touch."""
+        triangle = Triangle(4, 3, 5, 0, 0, 0)
+        self.assertTrue(check_crossing(Circle(1, 2, -1, 0), triangle))
+        self.assertFalse(check_crossing(triangle, Circle(1, 2, -1.5, 0)))
+        self.assertTrue(check_crossing(Polygon([(0, 0), (10, 0), (10, 10)]), Circle(1, 7, 3, 0)))
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestDistanceMatrix(unittest.TestCase):
+    """Test cases for the distance_matrix function."""
+
+    def random_shapes(self, count):
+        rng = random.Random(21)
+        shapes = []
+        for i in range(count):
+            x, y = rng.uniform(0, 60), rng.uniform(0, 60)
+            kind = i % 4
+            if kind == 0:
+                shapes.append(Circle(rng.uniform(1, 6), x, y, 0))
+            elif kind == 1:
+                shapes.append(Rectangle(rng.uniform(1, 8), rng.uniform(1, 8), x, y, 0))
+            elif kind == 2:
+                shapes.append(LabelledColoredTriangle(rng.uniform(1, 8), rng.uniform(1, 8), 5, x, y, 0))
+            else:
+                angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(rng.randint(3, 8)))
+                shapes.append(Polygon([(x + rng.uniform(2, 6) * math.cos(a), y + rng.uniform(2, 6) * math.sin(a))
+                                       for a in angles]))
+        return shapes
+
+    def test_matches_pairwise_distances(self):
+        """Test the batched matrix agrees with distance_between_shapes."""
+        shapes = self.random_shapes(60)
+        matrix = distance_matrix(shapes, chunk_size=500)
+        self.assertEqual(matrix.shape, (60, 60))
+        for i, shape1 in enumerate(shapes):
+            for j, shape2 in enumerate(shapes):
+                if i != j:
+                    self.assertAlmostEqual(matrix[i, j], distance_between_shapes(shape1, shape2), places=9)
+        self.assertTrue((np.diag(matrix) == 0).all())
+
+    def test_unbatched_shape_types(self):
+        """Test shapes without a batched form use distance_between_shapes."""
+        class Marker(Shape):
+            def area(self):
+                return 0.0
+
+            def perimeter(self):
+                return 0.0
+
+            def bbox(self):
+                return (0.0, 0.0, 0.0, 0.0)
+
+        restore_kernels(self)
+        register_distance_kernel(Marker, Shape, lambda marker, other: 7.0)
+        shapes = [Circle(1, 0, 0, 0), Marker(), Rectangle(1, 1, 5, 0, 0)]
+        matrix = distance_matrix(shapes)
+        self.assertEqual(matrix[1, 0], 7.0)
+        self.assertEqual(matrix[2, 1], 7.0)
+        self.assertEqual(matrix[1, 1], 0.0)
+        self.assertEqual(matrix[0, 2], 4.0)
+
+    def test_empty(self):
+        """Test an empty sequence gives an empty matrix."""
+        self.assertEqual(distance_matrix([]).shape, (0, 0))
+
 
 class TestSearchShapesByArea(unittest.TestCase):
     """Test cases for the search_shapes_by_area function."""
@@ -299,6 +787,29 @@ class TestSearchShapesByArea(unittest.TestCase):
         self.assertIn(self.rectangle, results)
         self.assertIn(same_area_rect, results)
 
+    def test_find_with_tolerance(self):
+        """Test finding shapes with an area close to the target."""
+        results = search_shapes_by_area(self.map, 25.01, abs_tol=0.1)
+        self.assertEqual(results, [self.rectangle])
+        self.assertEqual(search_shapes_by_area(self.map, 25.01), [])
+
+    def test_find_by_range(self):
+        """Test finding shapes with an area inside a range."""
+        results = search_shapes_by_area_range(self.map, 20, 30)
+        self.assertEqual(results, [self.rectangle, self.circle])
+
+    def test_largest_and_smallest(self):
+        """Test finding the shapes with extreme areas."""
+        self.assertEqual(largest_shapes(self.map, 1), [self.circle])
+        self.assertEqual(smallest_shapes(self.map, 1), [self.triangle])
+
+    def test_resized_shape_after_update(self):
+        """Test a resized shape is found by its new area after update_shape."""
+        self.rectangle.a = 10
+        self.map.update_shape(self.rectangle)
+        self.assertEqual(search_shapes_by_area(self.map, 50), [self.rectangle])
+        self.assertEqual(search_shapes_by_area(self.map, 25), [])
+
 
 class TestSearchShapesByPosition(unittest.TestCase):
     """Test cases for the search_shapes_by_position function."""
@@ -346,6 +857,65 @@ class TestSearchShapesByPosition(unittest.TestCase):
         self.assertIn(rect1, results)
         self.assertIn(rect2, results)
 
+    def test_moved_shape_after_update(self):
+        """Test a moved shape is found at its new position after update_shape."""
+        self.rectangle.move(100, 100)
+        self.map.update_shape(self.rectangle)
+        self.assertNotIn(self.rectangle, search_shapes_by_position(self.map, 2, 2))
+        self.assertIn(self.rectangle, search_shapes_by_position(self.map, 102, 102))
+
+    def test_removed_shape_not_found(self):
+        """Test a removed shape is no longer returned."""
+        self.map.remove_shape(self.rectangle)
+        self.assertNotIn(self.rectangle, search_shapes_by_position(self.map, 2, 2))
+
+
+class TestSearchShapesByPositions(unittest.TestCase):
+    """Test cases for the search_shapes_by_positions batch function."""
+
+    def setUp(self):
+        self.map = Map()
+        rng = random.Random(5)
+        for _ in range(200):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            self.map.add_shape(Rectangle(rng.uniform(1, 10), rng.uniform(1, 10), x, y, 0))
+            self.map.add_shape(Circle(rng.uniform(1, 5), y, x, 0))
+        self.points = [(rng.uniform(-5, 110), rng.uniform(-5, 110)) for _ in range(300)]
+
+    def test_matches_single_point_search(self):
+        """Test batched results equal one search per point."""
+        expected = [search_shapes_by_position(self.map, x, y) for x, y in self.points]
+        self.assertEqual(search_shapes_by_positions(self.map, self.points), expected)
+
+    def test_without_numpy(self):
+        """Test the pure Python fallback gives the same results."""
+        expected = search_shapes_by_positions(self.map, self.points)
+        with mock.patch('operations.algorithms.np', None):
+            self.assertEqual(search_shapes_by_positions(self.map, self.points), expected)
+
+    def test_triangles_and_polygons(self):
+        """Test batched containment for vertex-based shapes."""
+        shape_map = Map()
+        triangle = Triangle(4, 4, 4, 0, 0, 0)
+        polygon = Polygon([(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)])
+        shape_map.add_shape(triangle)
+        shape_map.add_shape(polygon)
+        hits = search_shapes_by_positions(shape_map, [(2, 1), (5, 8), (20, 20)])
+        self.assertEqual(hits, [[triangle, polygon], [], []])
+
+    def test_csr_output(self):
+        """Test the compressed sparse row layout."""
+        hits = search_shapes_by_positions(self.map, self.points)
+        indptr, flat = search_shapes_by_positions(self.map, self.points, csr=True)
+        self.assertEqual(len(indptr), len(self.points) + 1)
+        for i, point_hits in enumerate(hits):
+            self.assertEqual(flat[indptr[i]:indptr[i + 1]], point_hits)
+
+    def test_empty(self):
+        """Test empty inputs."""
+        self.assertEqual(search_shapes_by_positions(self.map, []), [])
+        self.assertEqual(search_shapes_by_positions(Map(), [(1, 1)]), [[]])
+
 
 class TestPolygonsIntersect(unittest.TestCase):
     """Test cases for the polygons_intersect function."""
@@ -361,6 +931,12 @@ class TestPolygonsIntersect(unittest.TestCase):
         poly1 = [(0, 0), (10, 0), (10, 10), (0, 10)]
         poly2 = [(20, 20), (30, 20), (30, 30), (20, 30)]
         self.assertFalse(polygons_intersect(poly1, poly2))
+
+    def test_empty_polygon(self):
+        """Test a polygon without vertices intersects nothing."""
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        self.assertFalse(polygons_intersect([], square))
+        self.assertFalse(polygons_intersect(square, []))
     
     def test_touching_polygons(self):
         """Test touching polygons return True."""
@@ -380,6 +956,41 @@ class TestPolygonsIntersect(unittest.TestCase):
         poly2 = [(5, -5), (15, 5), (5, 15), (-5, 5)]
         self.assertTrue(polygons_intersect(poly1, poly2))
 
+    def test_sweep_mode_for_large_polygons(self):
+        """Test large polygons are checked with the sweep and containment tests."""
+        rng = random.Random(12)
+
+        def coastline(n, cx, cy, radius):
+            vertices = []
+            for i in range(n):
+                r = radius * (1 + 0.2 * rng.random())
+                vertices.append((cx + r * math.cos(2 * math.pi * i / n), cy + r * math.sin(2 * math.pi * i / n)))
+            return vertices
+
+        outer = coastline(100, 0, 0, 100)
+        with mock.patch.object(ShapeUtils, 'line_intersects') as edges:
+            self.assertTrue(polygons_intersect(outer, coastline(100, 150, 0, 100)))
+            self.assertFalse(polygons_intersect(outer, coastline(100, 170, 170, 100)))
+            self.assertTrue(polygons_intersect(outer, coastline(100, 0, 0, 50)))
+            self.assertTrue(polygons_intersect(coastline(100, 0, 0, 50), outer))
+        edges.assert_not_called()
+
+    def test_sweep_mode_falls_back_for_self_intersecting_polygons(self):
+        """Test polygons that are not simple get the pairwise tests."""
+        bowtie = [(0, 0), (100, 100)] + [(100, y) for y in range(99, 0, -1)] + [(0, 100)]
+        for other in ([(40, 10), (60, 10), (50, 20)], [(10, 40), (20, 40), (10, 60)]):
+            with mock.patch('operations.algorithms.SWEEP_MIN_VERTICES', math.inf):
+                expected = polygons_intersect(bowtie, other)
+            self.assertEqual(polygons_intersect(bowtie, other), expected)
+
+    def test_disjoint_bounding_boxes_skip_edge_tests(self):
+        """Test polygons with disjoint bounding boxes skip the edge tests."""
+        poly1 = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        poly2 = [(11, 0), (20, 0), (20, 10)]
+        with mock.patch.object(ShapeUtils, 'line_intersects') as edges:
+            self.assertFalse(polygons_intersect(poly1, poly2))
+        edges.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
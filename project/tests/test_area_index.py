@@ -0,0 +1,85 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.area_index import AreaIndex
+
+
+class TestAreaIndex(unittest.TestCase):
+    """Test cases for the AreaIndex sorted index."""
+
+    def setUp(self):
+        self.index = AreaIndex()
+        for key, area in [('a', 25), ('b', 10), ('c', 25), ('d', 100), ('e', 25.001)]:
+            self.index.insert(key, area)
+
+    def test_find_exact(self):
+        """Test exact lookups return equal areas in insertion order."""
+        self.assertEqual(self.index.find(25), ['a', 'c'])
+        self.assertEqual(self.index.find(11), [])
+
+    def test_find_with_tolerance(self):
+        """Test absolute and relative tolerance lookups."""
+        self.assertEqual(self.index.find(25, abs_tol=0.01), ['a', 'c', 'e'])
+        self.assertEqual(self.index.find(100.5, rel_tol=0.01), ['d'])
+        self.assertEqual(self.index.find(102, rel_tol=0.01), [])
+
+    def test_invalid_tolerance(self):
+        """Test invalid tolerances raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.index.find(25, abs_tol=-1)
+        with self.assertRaises(ValueError):
+            self.index.find(25, rel_tol=1)
+
+    def test_find_range(self):
+        """Test closed range lookups, including open-ended ranges."""
+        self.assertEqual(self.index.find_range(10, 25), ['b', 'a', 'c'])
+        self.assertEqual(self.index.find_range(min_area=26), ['d'])
+        self.assertEqual(self.index.find_range(max_area=10), ['b'])
+        self.assertEqual(len(self.index.find_range()), 5)
+
+    def test_smallest_and_largest(self):
+        """Test top-k lookups in both directions."""
+        self.assertEqual(self.index.smallest(2), ['b', 'a'])
+        self.assertEqual(self.index.largest(2), ['d', 'e'])
+        self.assertEqual(self.index.largest(0), [])
+        self.assertEqual(len(self.index.largest(10)), 5)
+
+    def test_remove_and_update(self):
+        """Test removed and updated entries are reflected in lookups."""
+        self.index.remove('a')
+        self.assertEqual(self.index.find(25), ['c'])
+        self.index.update('c', 7)
+        self.assertEqual(self.index.find(25), [])
+        self.assertEqual(self.index.smallest(1), ['c'])
+        self.assertEqual(self.index.area('c'), 7)
+        with self.assertRaises(KeyError):
+            self.index.remove('a')
+
+    def test_bulk_insert_and_remove(self):
+        """Test bulk inserts and removals keep the index sorted and are atomic."""
+        self.index.insert_many([('f', 5), ('g', 25)])
+        self.assertEqual(self.index.find(25), ['a', 'c', 'g'])
+        self.assertEqual(self.index.smallest(1), ['f'])
+        self.index.remove_many(['a', 'f'])
+        self.assertEqual(self.index.find_range(0, 25), ['b', 'c', 'g'])
+        with self.assertRaises(KeyError):
+            self.index.insert_many([('h', 1), ('b', 1)])
+        with self.assertRaises(KeyError):
+            self.index.remove_many(['b', 'a'])
+        self.assertEqual(self.index.smallest(1), ['b'])
+
+    def test_update_many(self):
+        """Test bulk updates re-sort changed items and are atomic."""
+        self.index.update_many([('a', 1), ('b', 10), ('d', 0.5)])
+        self.assertEqual(self.index.smallest(3), ['d', 'a', 'b'])
+        with self.assertRaises(KeyError):
+            self.index.update_many([('a', 2), ('missing', 2)])
+        self.assertEqual(self.index.area('a'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
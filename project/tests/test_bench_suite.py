@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.suite import compare, make_scene
+from shapes.primitives import Circle
+from shapes.poligons import Polygon
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test cases for the scene generator and regression check of the benchmark suite."""
+
+    def test_scene_is_reproducible(self):
+        """Test the same arguments give the same scene."""
+        first = make_scene(200, seed=3)
+        second = make_scene(200, seed=3)
+        self.assertEqual(len(first), 200)
+        self.assertEqual([shape.bbox() for shape in first], [shape.bbox() for shape in second])
+        self.assertNotEqual([shape.bbox() for shape in first], [shape.bbox() for shape in make_scene(200, seed=4)])
+
+    def test_scene_mix_and_density(self):
+        """Test the mix selects shape kinds and density sets the covered fraction."""
+        circles = make_scene(100, mix={'circle': 1.0})
+        self.assertTrue(all(type(shape) is Circle for shape in circles))
+        polygons = make_scene(50, mix={'polygon': 1.0}, polygon_vertices=12)
+        self.assertTrue(all(type(shape) is Polygon and len(shape.vertices) == 12 for shape in polygons))
+
+        for density in (0.1, 1.0):
+            shapes = make_scene(2000, density=density)
+            extent = max(max(shape.bbox()[2], shape.bbox()[3]) for shape in shapes)
+            self.assertAlmostEqual(sum(shape.area() for shape in shapes) / extent ** 2, density, delta=0.3 * density)
+
+        with self.assertRaises(ValueError):
+            make_scene(10, mix={'hexagon': 1.0})
+
+    def test_compare(self):
+        """Test only slowdowns beyond the threshold count as regressions."""
+        baseline = {'a': 1.0, 'b': 1.0, 'c': 1.0}
+        results = {'a': 1.2, 'b': 1.3, 'c': 0.5, 'new': 9.0}
+        self.assertEqual(compare(results, baseline, threshold=0.25), [('b', 1.0, 1.3, 1.3)])
+        self.assertEqual(compare(results, baseline, threshold=0.5), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
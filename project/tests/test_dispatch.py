@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.dispatch import KernelRegistry
+
+
+class Base:
+    pass
+
+
+class Child(Base):
+    pass
+
+
+class Other:
+    pass
+
+
+class TestKernelRegistry(unittest.TestCase):
+    """Test cases for the KernelRegistry dispatch table."""
+
+    def setUp(self):
+        self.registry = KernelRegistry(lambda a, b: 'default')
+        self.registry.register(Base, Other, lambda a, b: ('base-other', type(a), type(b)))
+
+    def test_default(self):
+        """Test unregistered pairs use the default kernel."""
+        self.assertEqual(self.registry(Other(), Other()), 'default')
+
+    def test_subclasses_and_symmetry(self):
+        """Test kernels apply to subclasses and to swapped arguments."""
+        self.assertEqual(self.registry(Child(), Other()), ('base-other', Child, Other))
+        self.assertEqual(self.registry(Other(), Child()), ('base-other', Child, Other))
+
+    def test_asymmetric_registration(self):
+        """Test a kernel registered without symmetry only matches its own order."""
+        self.registry.register(Other, Base, lambda a, b: 'other-base', symmetric=False)
+        self.assertEqual(self.registry(Other(), Child()), 'other-base')
+        self.assertEqual(self.registry(Child(), Other())[0], 'base-other')
+
+    def test_most_specific_kernel_wins(self):
+        """Test registering a more specific kernel replaces cached resolutions."""
+        self.assertEqual(self.registry(Child(), Other())[0], 'base-other')
+        self.registry.register(Child, Other, lambda a, b: 'child-other')
+        self.assertEqual(self.registry(Child(), Other()), 'child-other')
+        self.assertEqual(self.registry(Base(), Other())[0], 'base-other')
+
+    def test_resolve_is_cached(self):
+        """Test a type pair is resolved once."""
+        kernel = self.registry.resolve(Child, Other)
+        self.assertIs(self.registry.resolve(Child, Other), kernel)
+
+    def test_instrument(self):
+        """Test the wrapper sees each concrete pair and is removed again."""
+        seen = []
+
+        def wrapper(type1, type2, kernel):
+            seen.append((type1, type2, kernel.__name__))
+            return lambda a, b: ('wrapped', kernel(a, b))
+
+        self.registry.instrument(wrapper)
+        self.assertEqual(self.registry(Other(), Child()), ('wrapped', ('base-other', Child, Other)))
+        self.registry(Other(), Child())
+        self.assertEqual(seen, [(Other, Child, '<lambda>')])
+        self.registry.instrument(None)
+        self.assertEqual(self.registry(Other(), Child()), ('base-other', Child, Other))
+
+
+if __name__ == '__main__':
+    unittest.main()
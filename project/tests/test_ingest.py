@@ -0,0 +1,127 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import Map
+from operations.ingest import build_shape, ingest, iter_shapes
+from shapes.primitives import Triangle, Rectangle, Circle, LabelledColoredCircle
+from shapes.poligons import Polygon
+
+
+class TestIngest(unittest.TestCase):
+    """Test cases for reading shapes from CSV and JSON Lines files."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(text)
+        return path
+
+    def test_build_shape(self):
+        """Test rows become shapes, with defaults for missing values."""
+        circle = build_shape({'type': 'circle', 'r': '2'})
+        self.assertIs(type(circle), Circle)
+        self.assertEqual((circle.r, circle.x, circle.y, circle.angle), (2, 0, 0, 0))
+
+        labelled = build_shape({'type': 'LabelledColoredCircle', 'r': 1, 'color': 'red', 'label': ''})
+        self.assertIsInstance(labelled, LabelledColoredCircle)
+        self.assertEqual((labelled.color, labelled.label), ('red', ''))
+
+        self.assertEqual(build_shape({'type': 'Polygon', 'vertices': '0 0 4 0 4 3'}).area(), 6)
+        self.assertEqual(build_shape({'type': 'Polygon', 'vertices': [[0, 0], [4, 0], [4, 3]]}).area(), 6)
+
+    def test_build_shape_invalid(self):
+        """Test unknown types and missing or invalid values are rejected."""
+        for row in ({'type': 'hexagon'}, {'type': 'circle'}, {'type': 'circle', 'r': 'wide'},
+                    {'type': 'triangle', 'a': 3, 'b': 4}, {'type': 'polygon', 'vertices': '0 0 1 1'},
+                    {'type': 'triangle', 'a': 1, 'b': 1, 'c': 10}, {'type': 'circle', 'r': 0},
+                    {'type': 'rectangle', 'a': -1, 'b': 2}, {'type': 'circle', 'r': 'inf'},
+                    {'type': 'circle', 'r': 1, 'x': 'nan'}, {'type': 'polygon', 'vertices': '0 0 1 0 inf 1'},
+                    {'type': 'labelledcoloredcircle', 'r': 1, 'color': 5},
+                    {'type': 'labelledcoloredcircle', 'r': 1, 'label': ['a']}):
+            with self.assertRaises(ValueError):
+                build_shape(row)
+
+    def test_csv(self):
+        """Test a CSV file with a header is ingested into the map."""
+        path = self.write('shapes.csv', 'type,a,b,c,r,x,y,angle,color,label,vertices\n'
+                                        'Rectangle,2,3,,,1,1,0,,,\n'
+                                        'triangle,3,4,5,,,,,,,\n'
+                                        'LabelledColoredCircle,,,,1,5,5,,blue,"a, b",\n'
+                                        'polygon,,,,,,,10,,,0 0 4 0 4 3\n')
+        shape_map = Map()
+        report = ingest(shape_map, path)
+        self.assertEqual(report.rows, 4)
+        self.assertEqual([type(shape) for shape in shape_map.shapes],
+                         [Rectangle, Triangle, LabelledColoredCircle, Polygon])
+        self.assertEqual(shape_map.get_shape(2).label, 'a, b')
+        self.assertEqual(shape_map.get_shape(3).angle, 10)
+        self.assertIs(shape_map.nearest((5, 5))[0][0], shape_map.get_shape(2))
+
+    def test_jsonl_in_chunks(self):
+        """Test JSON Lines are read across chunk boundaries, skipping blank lines."""
+        rows = [{'type': 'circle', 'r': i + 1, 'x': i} for i in range(7)]
+        path = self.write('shapes.jsonl', '\n'.join(json.dumps(row) for row in rows[:3]) + '\n\n'
+                                          + '\n'.join(json.dumps(row) for row in rows[3:]) + '\n')
+        reports = []
+        shape_map = Map()
+        report = ingest(shape_map, path, chunk_size=2, progress=lambda r: reports.append(r.rows))
+        self.assertEqual(report.rows, 7)
+        self.assertEqual(reports, [2, 4, 6])
+        self.assertEqual([shape.r for shape in shape_map.shapes], [1, 2, 3, 4, 5, 6, 7])
+        self.assertGreater(report.rows_per_second, 0)
+
+    def test_errors_name_the_line(self):
+        """Test a bad row names its line and leaves the map unchanged."""
+        path = self.write('shapes.jsonl', '{"type": "circle", "r": 1}\n\n{"type": "circle", "r": }\n')
+        shape_map = Map()
+        with self.assertRaisesRegex(ValueError, 'line 3'):
+            ingest(shape_map, path)
+        self.assertEqual(len(shape_map), 0)
+
+        path = self.write('shapes.ndjson', '{"type": "circle", "r": 1} {"type": "circle", "r": 2}\n')
+        with self.assertRaisesRegex(ValueError, 'line 1'):
+            list(iter_shapes(path))
+
+        path = self.write('shapes.jsonl', '{"type": "circle", "r": 1}\n'
+                                          '{"type": "labelledcoloredcircle", "r": 1, "color": 5}\n')
+        with self.assertRaisesRegex(ValueError, "line 2: Value for 'color' must be text"):
+            list(iter_shapes(path))
+
+        path = self.write('shapes.csv', 'type,r\ncircle,1\ncircle,-\n')
+        with self.assertRaisesRegex(ValueError, 'line 3'):
+            ingest(shape_map, path)
+        self.assertEqual(len(shape_map), 0)
+
+    def test_invalid_shape_leaves_map_unchanged(self):
+        """Test a row describing an impossible shape fails before any index is touched."""
+        shape_map = Map()
+        shape_map.add_shape(Circle(1, 0, 0, 0))
+        path = self.write('shapes.csv', 'type,a,b,c\nrectangle,2,3,\ntriangle,1,1,10\n')
+        with self.assertRaisesRegex(ValueError, 'line 3'):
+            ingest(shape_map, path)
+        self.assertEqual(len(shape_map), 1)
+        self.assertEqual((len(shape_map.spatial_index), len(shape_map.area_index), len(shape_map.aggregates)),
+                         (1, 1, 1))
+        self.assertAlmostEqual(shape_map.total_area(), Circle(1, 0, 0, 0).area())
+
+    def test_unknown_format(self):
+        """Test files of other formats are rejected unless the format is given."""
+        path = self.write('shapes.txt', 'type,r\ncircle,1\n')
+        with self.assertRaises(ValueError):
+            list(iter_shapes(path))
+        self.assertEqual(len(list(iter_shapes(path, file_format='csv'))), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations import algorithms, instrumentation
+from operations.algorithms import Map, ShapeActions
+from operations.instrumentation import profile
+from main import perform_shape_action
+from shapes.primitives import Rectangle, Circle
+from shapes.poligons import Polygon
+from utils.geometry import ShapeUtils
+import main
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for the opt-in call counting and profiling of the hot paths."""
+
+    def setUp(self):
+        self.map = Map()
+        self.circle = Circle(1, 0, 0, 0)
+        self.rectangle = Rectangle(2, 2, 0.5, 0, 0)
+        self.polygon = Polygon([(0, 0), (4, 0), (4, 1), (1, 1), (1, 4), (0, 4)])
+        self.map.add_shapes([self.circle, self.rectangle, self.polygon])
+        self.addCleanup(instrumentation.disable)
+        instrumentation.reset()
+
+    def test_disabled_leaves_originals(self):
+        """Test nothing stays wrapped or counted once disabled."""
+        originals = (algorithms.check_crossing, main.check_crossing, Map.__dict__['find_all_crossings'],
+                     ShapeUtils.__dict__['line_intersects'])
+        instrumentation.enable()
+        self.assertTrue(instrumentation.is_enabled())
+        self.assertIsNot(main.check_crossing, originals[1])
+        instrumentation.disable()
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual((algorithms.check_crossing, main.check_crossing, Map.__dict__['find_all_crossings'],
+                          ShapeUtils.__dict__['line_intersects']), originals)
+        self.assertNotIn('timed', algorithms._crossing_kernels.resolve(Circle, Rectangle).__name__)
+
+        algorithms.check_crossing(self.circle, self.rectangle)
+        self.assertEqual(instrumentation.snapshot()['functions'], {})
+
+    def test_counts_functions_and_kernels(self):
+        """Test calls are counted per function and per concrete type pair."""
+        instrumentation.enable()
+        self.assertEqual(len(list(self.map.find_all_crossings())), 3)
+        self.assertTrue(perform_shape_action(ShapeActions.CROSSING, self.rectangle, self.circle))
+        stats = instrumentation.snapshot()
+
+        functions = stats['functions']
+        self.assertEqual(functions['Map.find_all_crossings']['calls'], 1)
+        self.assertEqual(functions['check_crossing']['calls'], 4)
+        self.assertGreater(functions['check_crossing']['seconds'], 0)
+        crossing = stats['kernels']['crossing']
+        self.assertEqual(crossing['Circle,Rectangle'], {
+            'kernel': 'circle_rectangle_intersection', 'calls': 1,
+            'seconds': crossing['Circle,Rectangle']['seconds']})
+        self.assertEqual(crossing['Rectangle,Circle']['calls'], 1)
+        self.assertEqual(crossing['Circle,Polygon']['kernel'], '_circle_polygon_cross')
+
+        instrumentation.reset()
+        self.assertEqual(instrumentation.snapshot(), {'functions': {}, 'kernels': {'crossing': {}, 'distance': {}}})
+
+    def test_profile(self):
+        """Test a profile holds only the calls made in its block."""
+        instrumentation.enable()
+        algorithms.search_shapes_by_position(self.map, 0.5, 0.5)
+        with profile() as result:
+            algorithms.search_shapes_by_position(self.map, 0.5, 0.5)
+            algorithms.distance_between_shapes(self.circle, self.polygon)
+        self.assertTrue(instrumentation.is_enabled())
+        self.assertEqual(result.stats['functions']['search_shapes_by_position']['calls'], 1)
+        self.assertIn('_shape_contains_point', result.stats['functions'])
+        self.assertEqual(result.stats['kernels']['distance']['Circle,Polygon']['calls'], 1)
+        self.assertEqual(instrumentation.snapshot()['functions']['search_shapes_by_position']['calls'], 2)
+
+        instrumentation.disable()
+        with profile() as result:
+            self.map.total_area()
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(list(result.stats['functions']), ['Map.total_area'])
+
+    def test_prometheus(self):
+        """Test the text export has one counter sample per function and kernel."""
+        with profile() as result:
+            algorithms.check_crossing(self.circle, self.rectangle)
+        text = result.prometheus(prefix='test')
+        self.assertIn('# TYPE test_function_calls_total counter', text)
+        self.assertIn('test_function_calls_total{function="check_crossing"} 1\n', text)
+        self.assertIn('test_kernel_calls_total{registry="crossing",kernel="circle_rectangle_intersection",'
+                      'type1="Circle",type2="Rectangle"} 1\n', text)
+        self.assertIn('test_kernel_seconds_total{registry="crossing"', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import random
+import sys
+import os
+from multiprocessing import shared_memory
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import Map, search_shapes_by_area, search_shapes_by_positions
+from operations.parallel import ParallelMap
+from shapes.primitives import Triangle, Rectangle, Circle, LabelledColoredCircle
+from shapes.poligons import Polygon
+
+
+def random_map(rng, count):
+    shape_map = Map()
+    for _ in range(count):
+        x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+        kind = rng.randrange(4)
+        if kind == 0:
+            shape_map.add_shape(Rectangle(rng.choice([1, 2, 4]), rng.choice([1, 3]), x, y, 0))
+        elif kind == 1:
+            shape_map.add_shape(LabelledColoredCircle(rng.choice([0.5, 1, 3]), x, y, color='red'))
+        elif kind == 2:
+            shape_map.add_shape(Triangle(3, 4, 5, x, y, 0))
+        else:
+            shape_map.add_shape(Polygon([(x, y), (x + 5, y + 1), (x + 2, y + 4)]))
+    return shape_map
+
+
+class TestParallelMap(unittest.TestCase):
+    """Test cases for running Map queries in worker processes."""
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(5)
+        cls.map = random_map(rng, 300)
+        # Removing shapes leaves gaps in the IDs and reorders the shapes list
+        cls.map.remove_shapes(cls.map.shapes[::7])
+        cls.points = [(rng.uniform(-10, 110), rng.uniform(-10, 110)) for _ in range(500)]
+        cls.parallel = ParallelMap(cls.map, workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.parallel.close()
+
+    def ordered(self, shapes):
+        # ParallelMap orders results by shape ID, the serial functions do not
+        return sorted(shapes, key=self.map.shape_id)
+
+    def test_positions_match_serial(self):
+        """Test point queries find the same shapes as the serial search."""
+        expected = search_shapes_by_positions(self.map, self.points)
+        actual = self.parallel.search_shapes_by_positions(self.points)
+        self.assertEqual(actual, [self.ordered(hits) for hits in expected])
+        self.assertTrue(any(actual))
+
+    def test_areas_match_serial(self):
+        """Test area queries find the same shapes as the serial search."""
+        areas = [1, 2, 3, 6, 12, 0.785, 7.5, 99]
+        expected = [self.ordered(search_shapes_by_area(self.map, area, rel_tol=1e-3)) for area in areas]
+        self.assertEqual(self.parallel.search_shapes_by_areas(areas, rel_tol=1e-3), expected)
+
+    def test_crossings_match_serial(self):
+        """Test every crossing pair is found exactly once across tiles."""
+        expected = sorted(tuple(sorted(map(self.map.shape_id, pair))) for pair in self.map.find_all_crossings())
+        actual = [(self.map.shape_id(a), self.map.shape_id(b)) for a, b in self.parallel.find_all_crossings()]
+        self.assertEqual(actual, expected)
+        self.assertGreater(len(actual), 0)
+
+    def test_refresh_and_close(self):
+        """Test refresh publishes changes and close frees the shared memory."""
+        shape_map = Map()
+        with ParallelMap(shape_map, workers=1, tiles_per_side=3) as parallel:
+            self.assertEqual(parallel.search_shapes_by_positions([(0, 0)]), [[]])
+            self.assertEqual(parallel.find_all_crossings(), [])
+            circle = Circle(1, 0, 0, 0)
+            shape_map.add_shape(circle)
+            parallel.refresh()
+            self.assertEqual(parallel.search_shapes_by_positions([(0, 0), (5, 5)]), [[circle], []])
+            name = parallel._block.name
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+    def test_subclass_shapes_are_rejected(self):
+        """Test a map holding a shape subclass cannot be published."""
+        class Disc(Circle):
+            pass
+
+        shape_map = Map()
+        shape_map.add_shape(Disc(1, 0, 0, 0))
+        with self.assertRaises(TypeError):
+            ParallelMap(shape_map, workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import math
+import random
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.segment_sweep import boundaries_intersect, _Segment, _conflict, _touch
+
+
+def star_polygon(rng, n, cx, cy, radius, grid):
+    """Random star-shaped polygon snapped to a grid, which may make it non-simple."""
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(n))
+    vertices = []
+    for angle in angles:
+        r = rng.uniform(radius / 3, radius)
+        vertex = (round((cx + r * math.cos(angle)) / grid) * grid,
+                  round((cy + r * math.sin(angle)) / grid) * grid)
+        if vertex not in vertices:
+            vertices.append(vertex)
+    return vertices
+
+
+def edges(polygon, owner):
+    n = len(polygon)
+    return [_Segment(polygon[i], polygon[(i + 1) % n], owner, i) for i in range(n)]
+
+
+class TestBoundariesIntersect(unittest.TestCase):
+    """Test cases for the boundaries_intersect sweep."""
+
+    square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+
+    def test_crossing_boundaries(self):
+        """Test crossing edges are found."""
+        self.assertTrue(boundaries_intersect(self.square, [(5, 5), (15, 5), (15, 15), (5, 15)]))
+
+    def test_touching_boundaries(self):
+        """Test shared edges and vertices count as touching."""
+        self.assertTrue(boundaries_intersect(self.square, [(10, 0), (20, 0), (20, 10), (10, 10)]))
+        self.assertTrue(boundaries_intersect(self.square, [(10, 10), (20, 10), (20, 20)]))
+        self.assertTrue(boundaries_intersect(self.square, [(10, 5), (20, 0), (20, 10)]))
+
+    def test_separate_boundaries(self):
+        """Test disjoint and nested polygons have separate boundaries."""
+        self.assertFalse(boundaries_intersect(self.square, [(11, 0), (20, 0), (20, 10)]))
+        self.assertFalse(boundaries_intersect(self.square, [(2, 2), (8, 2), (8, 8), (2, 8)]))
+
+    def test_self_intersecting_polygon(self):
+        """Test a polygon that is not simple makes the result unknown."""
+        bowtie = [(0, 0), (10, 10), (10, 0), (0, 10)]
+        self.assertIsNone(boundaries_intersect(bowtie, [(20, 20), (30, 20), (30, 30)]))
+
+    def test_matches_brute_force(self):
+        """Test the sweep agrees with testing every pair of edges on degenerate inputs."""
+        rng = random.Random(4)
+        for _ in range(400):
+            grid = rng.choice([1, 2, 5, 1e-9])
+            poly1 = star_polygon(rng, rng.randint(3, 20), 0, 0, 10, grid)
+            poly2 = star_polygon(rng, rng.randint(3, 20), rng.uniform(-15, 15), rng.uniform(-15, 15), 10, grid)
+            if len(poly1) < 3 or len(poly2) < 3:
+                continue
+
+            edges1, edges2 = edges(poly1, 0), edges(poly2, 1)
+            touching = any(_touch(a, b) for a in edges1 for b in edges2)
+            result = boundaries_intersect(poly1, poly2)
+            if result is None:
+                # Only polygons that are not simple may leave the result unknown
+                sizes = (len(poly1), len(poly2))
+                self.assertTrue(any(_conflict(a, b, sizes) is None
+                                    for polygon_edges in (edges1, edges2)
+                                    for i, a in enumerate(polygon_edges) for b in polygon_edges[i + 1:]))
+            else:
+                self.assertEqual(result, touching, (poly1, poly2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import Map, check_crossing, distance_between_shapes
+from service import ShapeService, ShapeClient, _LENGTH
+from shapes.primitives import Rectangle, Circle
+from shapes.poligons import Polygon
+
+
+class TestShapeService(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the asyncio query service."""
+
+    async def asyncSetUp(self):
+        self.map = Map()
+        self.rectangle = Rectangle(10, 5, 0, 0, 0)
+        self.circle = Circle(5, 5, 5, 0)
+        self.polygon = Polygon([(30, 10), (40, 10), (45, 20), (40, 30)])
+        self.ids = self.map.add_shapes([self.rectangle, self.circle, self.polygon])
+        self.service = ShapeService(self.map)
+        await self.service.start()
+        self.client = await ShapeClient.connect(*self.service.address)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.service.close()
+
+    async def test_actions(self):
+        """Test every ShapeActions value is answered with shape IDs."""
+        rectangle_id, circle_id, polygon_id = self.ids
+        self.assertEqual(await self.client.request('crossing', shape1=rectangle_id, shape2=circle_id),
+                         check_crossing(self.rectangle, self.circle))
+        self.assertAlmostEqual(await self.client.request('distance', shape1=circle_id, shape2=polygon_id),
+                               distance_between_shapes(self.circle, self.polygon))
+        self.assertEqual(await self.client.request('search_by_area', area=50), [rectangle_id])
+        self.assertEqual(await self.client.request('search_by_position', x=5, y=4), [rectangle_id, circle_id])
+        self.assertEqual(await self.client.request('search_by_position', x=100, y=100), [])
+
+    async def test_concurrent_requests_are_batched(self):
+        """Test concurrent requests share batches and each gets its own answer."""
+        points = [(x, 4) for x in range(0, 50)]
+        results = await asyncio.gather(*(self.client.request('search_by_position', x=x, y=y) for x, y in points),
+                                       self.client.request('search_by_area', area=50))
+        self.assertEqual(results[5], [self.ids[0], self.ids[1]])
+        self.assertEqual(results[20], [])
+        self.assertEqual(results[-1], [self.ids[0]])
+        self.assertLess(self.service.batches, len(results))
+
+        stats = await self.client.request('stats')
+        self.assertEqual(stats['count'], len(results))
+        self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+    async def test_errors(self):
+        """Test bad requests get an error without affecting the others."""
+        with self.assertRaises(RuntimeError):
+            await self.client.request('rotate_everything')
+        with self.assertRaises(RuntimeError):
+            await self.client.request('crossing', shape1=self.ids[0], shape2=999)
+        with self.assertRaises(RuntimeError):
+            await self.client.request('search_by_position', x='left', y=0)
+        self.assertEqual(await self.client.request('search_by_area', area=50), [self.ids[0]])
+
+    async def test_unexpected_error_fails_only_its_request(self):
+        """Test a request raising an unexpected exception does not fail the rest of its batch."""
+        other = await ShapeClient.connect(*self.service.address)
+        try:
+            results = await asyncio.wait_for(asyncio.gather(
+                self.client.request('search_by_position', x=5, y=4),
+                other.request('search_by_area', area=10 ** 400),
+                other.request('search_by_position', x=10 ** 400, y=0),
+                self.client.request('search_by_area', area=50),
+                return_exceptions=True), timeout=5)
+        finally:
+            await other.close()
+        self.assertEqual(results[0], [self.ids[0], self.ids[1]])
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertIn('OverflowError', str(results[1]))
+        self.assertIsInstance(results[2], RuntimeError)
+        self.assertEqual(results[3], [self.ids[0]])
+
+        # Queued together, so they certainly run in one batch
+        batches = self.service.batches
+        results = await asyncio.gather(self.service.query('search_by_area', {'area': 10 ** 400}),
+                                       self.service.query('search_by_position', {'x': 5, 'y': 4}),
+                                       return_exceptions=True)
+        self.assertEqual(self.service.batches, batches + 1)
+        self.assertIsInstance(results[0], OverflowError)
+        self.assertEqual(results[1], [self.ids[0], self.ids[1]])
+
+    async def test_oversized_frame_closes_connection(self):
+        """Test a frame above the size limit is refused."""
+        reader, writer = await asyncio.open_connection(*self.service.address)
+        writer.write(_LENGTH.pack(1 << 30))
+        await writer.drain()
+        (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+        self.assertIn(b'too large', await reader.readexactly(length))
+        self.assertEqual(await reader.read(), b'')
+        writer.close()
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), 'Unix sockets are not available')
+    async def test_unix_socket(self):
+        """Test the service can listen on a Unix socket."""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'shapes.sock')
+        service = ShapeService(self.map)
+        await service.start(path=path)
+        client = await ShapeClient.connect(path=path)
+        self.assertEqual(await client.request('search_by_area', area=50), [self.ids[0]])
+        await client.close()
+        await service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.shape_store import ShapeStore, np
+from operations.algorithms import Map
+from shapes.primitives import Triangle, Rectangle, Circle, LabelledColoredCircle
+from shapes.poligons import Polygon
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class TestShapeStore(unittest.TestCase):
+    """Test cases for the columnar ShapeStore."""
+
+    def setUp(self):
+        self.store = ShapeStore()
+        self.shapes = [
+            Rectangle(5, 3, 0, 0, 0),
+            Circle(3, 4, 4, 0),
+            Triangle(3, 4, 5, 5, 5, 0),
+            LabelledColoredCircle(1, 0, 0, 0, color='red'),
+            Polygon([(0, 0), (4, 0), (4, 4), (0, 4)]),
+        ]
+        for shape in self.shapes:
+            self.store.add(shape)
+
+    def test_totals_match_shapes(self):
+        """Test vectorized totals agree with the shape methods."""
+        self.assertAlmostEqual(self.store.total_area(), sum(s.area() for s in self.shapes))
+        self.assertAlmostEqual(self.store.total_perimeter(), sum(s.perimeter() for s in self.shapes))
+
+    def test_columns_and_rows(self):
+        """Test columns hold attributes and rows map back to shapes."""
+        self.assertEqual(list(self.store.column('Circle', 'r')), [3, 1])
+        self.assertIs(self.store.shape_at('Circle', 1), self.shapes[3])
+        with self.assertRaises(ValueError):
+            self.store.column('Circle', 'r')[0] = 10
+
+    def test_remove_swaps_last_row(self):
+        """Test removing a shape keeps the remaining rows consistent."""
+        self.store.remove(self.shapes[1])
+        self.assertNotIn(self.shapes[1], self.store)
+        self.assertIs(self.store.shape_at('Circle', 0), self.shapes[3])
+        self.assertEqual(list(self.store.column('Circle', 'r')), [1])
+        self.assertEqual(len(self.store), 4)
+
+    def test_update(self):
+        """Test updated attributes are copied into the row."""
+        self.shapes[0].a = 10
+        self.store.update(self.shapes[0])
+        self.assertEqual(self.store.areas('Rectangle')[0], 30)
+
+    def test_update_many(self):
+        """Test bulk updates copy every changed shape into its row."""
+        self.shapes[0].a = 10
+        self.shapes[1].move(1, 1)
+        self.store.update_many(self.shapes)
+        self.assertEqual(self.store.areas('Rectangle')[0], 30)
+        self.assertEqual(self.store.column('Circle', 'x')[0], 5)
+        with self.assertRaises(KeyError):
+            self.store.update_many([Circle(1, 0, 0, 0)])
+
+    def test_growth(self):
+        """Test tables grow past their initial capacity."""
+        store = ShapeStore()
+        for i in range(100):
+            store.add(Circle(i, 0, 0, 0))
+        self.assertEqual(len(store.column('Circle', 'r')), 100)
+        self.assertEqual(store.column('Circle', 'r')[99], 99)
+
+    def test_filter_by_area(self):
+        """Test area filters across kinds."""
+        self.assertEqual(self.store.filter_by_area(10, 20), [self.shapes[0], self.shapes[4]])
+        self.assertEqual(self.store.filter_by_area(max_area=6), [self.shapes[2], self.shapes[3]])
+
+    def test_statistics(self):
+        """Test per-type statistics."""
+        stats = self.store.statistics()
+        self.assertEqual(stats['Circle']['count'], 2)
+        self.assertAlmostEqual(stats['Circle']['max_area'], 3.14 * 9)
+        self.assertEqual(stats['Polygon']['total_area'], 16)
+        self.assertEqual(set(stats), {'Rectangle', 'Circle', 'Triangle', 'Polygon'})
+
+    def test_columnar_map(self):
+        """Test a columnar map keeps its store in sync."""
+        shape_map = Map(columnar=True)
+        for shape in self.shapes:
+            shape_map.add_shape(shape)
+        shape_map.remove_shape(self.shapes[0])
+        self.shapes[1].r = 1
+        shape_map.update_shape(self.shapes[1])
+        expected = sum(s.area() for s in shape_map.shapes)
+        self.assertAlmostEqual(shape_map.total_area(), expected)
+        self.assertEqual(len(shape_map.store), 4)
+
+    def test_columnar_map_transform(self):
+        """Test a batch transform writes the moved shapes into the store."""
+        shape_map = Map(columnar=True)
+        ids = shape_map.add_shapes(self.shapes)
+        shape_map.transform(ids, dx=2, angle=45)
+        self.assertEqual(list(shape_map.store.column('Circle', 'x')), [6, 2])
+        self.assertEqual(list(shape_map.store.column('Rectangle', 'angle')), [45])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+import copy
 import math
+import pickle
 import sys
 import os
+from unittest import mock
 
 # Add the parent directory to sys.path to import modules correctly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -9,6 +12,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from shapes.primitives import Triangle, Rectangle, Circle
 from shapes.primitives import LabelledColoredRectangle, LabelledColoredCircle, LabelledColoredTriangle
 from shapes.poligons import Polygon
+from shapes.base import Shape
 
 
 class TestTriangle(unittest.TestCase):
@@ -158,7 +162,36 @@ class TestPolygon(unittest.TestCase):
         # Less than 3 vertices
         with self.assertRaises(ValueError):
             Polygon([(0, 0), (1, 0)], 0)
-    
+
+    def test_from_coords(self):
+        """Test building a polygon from interleaved coordinates."""
+        p = Polygon.from_coords([0, 0, 4, 0, 4, 3], 20)
+        self.assertEqual(p.vertices, [(0, 0), (4, 0), (4, 3)])
+        self.assertEqual(p.angle, 20)
+        self.assertEqual(p.area(), 6)
+        with self.assertRaises(ValueError):
+            Polygon.from_coords([0, 0, 4, 0, 4])
+        with self.assertRaises(ValueError):
+            Polygon.from_coords([0, 0, 4, 0])
+
+    def test_copies_have_their_own_vertices(self):
+        """Test moving a copy of a polygon leaves the original and its cached geometry alone."""
+        p = Polygon([(0, 0), (1, 0), (1, 1)])
+        bbox = p.bbox()
+        for duplicate in (copy.copy(p), copy.deepcopy(p)):
+            duplicate.move(10, 10)
+            self.assertEqual(duplicate.vertices, [(10, 10), (11, 10), (11, 11)])
+        self.assertEqual(p.vertices, [(0, 0), (1, 0), (1, 1)])
+        self.assertEqual(p.bbox(), bbox)
+
+    def test_coordinates_are_floats(self):
+        """Test vertices are stored as floats, rounding integers beyond 2**53."""
+        p = Polygon([(2 ** 53, 0), (10 ** 17 + 1, 0), (0, 1)])
+        self.assertEqual(p.vertices[0], (2 ** 53, 0))
+        self.assertIsInstance(p.vertices[0][0], float)
+        self.assertEqual(p.vertices[1], (float(10 ** 17 + 1), 0))
+        self.assertNotEqual(p.vertices[1][0], 10 ** 17 + 1)
+
     def test_perimeter(self):
         """Test polygon perimeter calculation."""
         # Square with side 1
@@ -205,6 +238,60 @@ class TestPolygon(unittest.TestCase):
             self.assertAlmostEqual(actual[0], expected_vertex[0], places=10)
             self.assertAlmostEqual(actual[1], expected_vertex[1], places=10)
 
+    def test_clockwise_centroid(self):
+        """Test the centroid does not depend on the winding direction."""
+        p = Polygon([(0, 0), (0, 1), (1, 1), (1, 0)])
+        self.assertEqual(p._calculate_centroid(), (0.5, 0.5))
+        p.rotate(90)
+        self.assertAlmostEqual(p.bbox()[0], 0)
+        self.assertAlmostEqual(p.bbox()[3], 1)
+
+    def test_vertex_view(self):
+        """Test the vertices property is a live, read-only sequence of tuples."""
+        p = Polygon([(0, 0), (4, 0), (4, 3)])
+        view = p.vertices
+        self.assertEqual(len(view), 3)
+        self.assertEqual(view[-1], (4, 3))
+        self.assertEqual(view[1:], [(4, 0), (4, 3)])
+        self.assertEqual(list(view), [(0, 0), (4, 0), (4, 3)])
+        with self.assertRaises(IndexError):
+            view[3]
+        with self.assertRaises(TypeError):
+            view[0] = (1, 1)
+        p.move(1, 1)
+        self.assertEqual(view[0], (1, 1))
+        self.assertEqual(p.to_vertices(), [(1, 1), (5, 1), (5, 4)])
+
+    def test_transforms_in_place(self):
+        """Test move and rotate reuse the coordinate buffer on both code paths."""
+        vertices = [(math.cos(i / 10) * (2 + i % 3), math.sin(i / 10) * (2 + i % 3)) for i in range(63)]
+        p = Polygon(vertices)
+        coords = p.coords
+        p.move(1, 2).rotate(33)
+        self.assertIs(p.coords, coords)
+        for threshold in (0, math.inf):
+            with mock.patch('shapes.poligons.NUMPY_MIN_VERTICES', threshold):
+                q = Polygon(vertices).move(1, 2).rotate(33)
+            for actual, expected in zip(q.vertices, p.vertices):
+                self.assertAlmostEqual(actual[0], expected[0], places=9)
+                self.assertAlmostEqual(actual[1], expected[1], places=9)
+
+    def test_is_convex(self):
+        """Test polygon convexity detection."""
+        self.assertTrue(Polygon([(0, 0), (1, 0), (1, 1), (0, 1)]).is_convex())
+        self.assertTrue(Polygon([(0, 0), (1, 0), (2, 0), (1, 1)]).is_convex())
+        self.assertFalse(Polygon([(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)]).is_convex())
+        self.assertFalse(Polygon([(0, 0), (1, 0), (2, 0)]).is_convex())
+
+        star = [(math.cos(math.radians(90 + 144 * i)), math.sin(math.radians(90 + 144 * i)))
+                for i in range(5)]
+        self.assertFalse(Polygon(star).is_convex())
+
+        p = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+        self.assertTrue(p.is_convex())
+        p.vertices = [(0, 0), (10, 0), (10, 10), (5, 5), (0, 10)]
+        self.assertFalse(p.is_convex())
+
 
 class TestColorMixin(unittest.TestCase):
     """Test cases for the ColorMixin."""
@@ -227,6 +314,12 @@ class TestColorMixin(unittest.TestCase):
         circle.set_color("yellow")
         self.assertEqual(circle.color, "yellow")
 
+    def test_colors_are_interned(self):
+        """Test equal colors built at run time share one string object."""
+        first = LabelledColoredCircle(1, color=''.join(['re', 'd']))
+        second = LabelledColoredTriangle(3, 4, 5).set_color(''.join(['r', 'ed']))
+        self.assertIs(first.color, second.color)
+
 
 class TestLabelMixin(unittest.TestCase):
     """Test cases for the LabelMixin."""
@@ -298,5 +391,143 @@ class TestLabelledColoredShapes(unittest.TestCase):
         self.assertEqual(triangle.label, "triangle test")
 
 
+class TestDerivedGeometryCache(unittest.TestCase):
+    """Test cases for cached derived geometry and its invalidation."""
+
+    def test_triangle_area_cached_until_resized(self):
+        """Test the cached triangle area follows side changes."""
+        t = Triangle(3, 4, 5, 0, 0, 0)
+        self.assertEqual(t.area(), 6)
+        t.a, t.b, t.c = 6, 8, 10
+        self.assertEqual(t.area(), 24)
+
+    def test_vertices_follow_move(self):
+        """Test cached vertices and bounding boxes are refreshed by move."""
+        r = Rectangle(2, 3, 0, 0, 0)
+        self.assertIs(r.to_vertices(), r.to_vertices())
+        self.assertEqual(r.bbox(), (0, 0, 2, 3))
+        r.move(1, 1)
+        self.assertEqual(r.to_vertices()[0], (1, 1))
+        self.assertEqual(r.bbox(), (1, 1, 3, 4))
+
+        t = Triangle(4, 2, 3, 0, 0, 0)
+        self.assertEqual(t.bbox(), (0, 0, 4, 2))
+        t.x = 10
+        self.assertEqual(t.to_vertices(), [(10, 0), (14, 0), (12, 2)])
+
+    def test_circle_bbox_follows_radius(self):
+        """Test the cached circle bounding box follows radius changes."""
+        c = Circle(1, 0, 0, 0)
+        self.assertEqual(c.bbox(), (-1, -1, 1, 1))
+        c.r = 2
+        self.assertEqual(c.bbox(), (-2, -2, 2, 2))
+
+    def test_polygon_cache_follows_vertices(self):
+        """Test cached polygon geometry is refreshed by move, rotate and assignment."""
+        p = Polygon([(0, 0), (4, 0), (4, 4), (0, 4)])
+        self.assertEqual(p.area(), 16)
+        self.assertEqual(p._calculate_centroid(), (2, 2))
+        p.move(1, 0)
+        self.assertEqual(p._calculate_centroid(), (3, 2))
+        self.assertEqual(p.bbox(), (1, 0, 5, 4))
+        p.rotate(45)
+        self.assertAlmostEqual(p.bbox()[2], 3 + 2 * math.sqrt(2))
+        p.vertices = [(0, 0), (2, 0), (0, 2)]
+        self.assertEqual(p.area(), 2)
+        self.assertEqual(p.perimeter(), 4 + math.sqrt(8))
+
+
+class TestCompactLayout(unittest.TestCase):
+    """Test cases for the __slots__ layout of shapes."""
+
+    def test_no_instance_dict(self):
+        """Test shapes store their attributes in slots only."""
+        shapes = [Triangle(3, 4, 5, 0, 0, 0), Rectangle(1, 2, 0, 0, 0), Circle(1, 0, 0, 0),
+                  Polygon([(0, 0), (1, 0), (0, 1)]), LabelledColoredRectangle(1, 2, color='red', label='r'),
+                  LabelledColoredCircle(1), LabelledColoredTriangle(3, 4, 5)]
+        for shape in shapes:
+            self.assertFalse(hasattr(shape, '__dict__'), type(shape).__name__)
+            with self.assertRaises(AttributeError):
+                shape.undeclared = 1
+
+
+class TestChangeNotifications(unittest.TestCase):
+    """Test cases for shape observers and version counters."""
+
+    def setUp(self):
+        self.changes = []
+        self.record = lambda shape, change: self.changes.append((shape, change))
+
+    def test_notifications(self):
+        """Test moves, rotations, setters, color and label changes notify observers."""
+        r = LabelledColoredRectangle(2, 3, 0, 0, 0, color='red', label='r')
+        r.subscribe(self.record)
+        r.move(1, 1).rotate(90)
+        r.a = 5
+        r.set_color('blue').set_label('s')
+        self.assertEqual(self.changes, [(r, 'geometry'), (r, 'angle'), (r, 'geometry'), (r, 'color'), (r, 'label')])
+
+    def test_polygon_rotate_notifies_once(self):
+        """Test rotating a polygon reports a single geometry change."""
+        p = Polygon([(0, 0), (4, 0), (4, 4), (0, 4)])
+        p.subscribe(self.record)
+        p.rotate(30)
+        self.assertEqual(self.changes, [(p, 'geometry')])
+        self.assertEqual(p.angle, 30)
+
+    def test_version(self):
+        """Test the version counts changes with or without observers."""
+        c = Circle(1, 0, 0, 0)
+        version = c.version
+        c.move(1, 0)
+        c.r = 2
+        self.assertEqual(c.version, version + 2)
+
+    def test_unsubscribe(self):
+        """Test unsubscribed observers are no longer called."""
+        t = Triangle(3, 4, 5, 0, 0, 0)
+        t.subscribe(self.record)
+        t.unsubscribe(self.record)
+        t.move(1, 1)
+        self.assertEqual(self.changes, [])
+        with self.assertRaises(ValueError):
+            t.unsubscribe(self.record)
+
+
+class TestShapeBase(unittest.TestCase):
+    """Test cases for the Shape base class."""
+
+    def test_subclass_without_bbox(self):
+        """Test shapes defining only area and perimeter can still be created."""
+        class Blob(Shape):
+            def area(self):
+                return 1.0
+
+            def perimeter(self):
+                return 4.0
+
+        blob = Blob()
+        self.assertEqual(blob.area(), 1.0)
+        with self.assertRaises(NotImplementedError):
+            blob.bbox()
+
+    def test_copies_and_pickles_are_unobserved(self):
+        """Test copying or pickling a shape does not carry over its observers, version or cache."""
+        changes = []
+        shape = LabelledColoredRectangle(2, 3, 1, 1, 0, color='red', label='r')
+        shape.subscribe(lambda changed, change: changes.append(changed))
+        shape.move(1, 1)
+        shape.area()
+        for duplicate in (copy.copy(shape), copy.deepcopy(shape), pickle.loads(pickle.dumps(shape))):
+            self.assertIsNot(duplicate, shape)
+            self.assertEqual((duplicate.a, duplicate.b, duplicate.x, duplicate.y), (2, 3, 2, 2))
+            self.assertEqual((duplicate.color, duplicate.label), ('red', 'r'))
+            self.assertEqual(duplicate.version, 0)
+            self.assertIsNone(duplicate._cache)
+            duplicate.move(5, 5)
+        self.assertEqual(changes, [shape])
+        self.assertEqual(shape.x, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import unittest
+import os
+import struct
+import sys
+import tempfile
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.algorithms import Map
+from operations.snapshot import Snapshot, write_snapshot, FORMAT_VERSION
+from shapes.primitives import Triangle, Rectangle, Circle
+from shapes.primitives import LabelledColoredRectangle, LabelledColoredCircle, LabelledColoredTriangle
+from shapes.poligons import Polygon
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test cases for saving and loading binary snapshots."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'map.snapshot')
+
+        self.map = Map()
+        self.map.add_shapes([
+            Triangle(3, 4, 5, 1, 2, 30),
+            Rectangle(2, 3, -1, 0.5, 45),
+            Circle(1.5, 4, 4, 0),
+            LabelledColoredTriangle(3, 4, 5, 0, 0, 10, color='red', label='tri'),
+            LabelledColoredRectangle(1, 2, 3, 4, 5, color='red', label='ünïcode'),
+            LabelledColoredCircle(2, 0, 0, 0, color='#00ff00', label=''),
+            Polygon([(0, 0), (4, 0), (4, 3), (1, 5)], angle=15),
+            Polygon([(10, 10), (12, 10), (11, 12)]),
+        ])
+        # IDs are kept, including gaps left by removed shapes
+        self.map.remove_shape(self.map.get_shape(1))
+
+    def assertSameShape(self, loaded, shape):
+        self.assertIs(type(loaded), type(shape))
+        self.assertEqual(loaded.angle, shape.angle)
+        self.assertEqual(loaded.bbox(), shape.bbox())
+        self.assertEqual(loaded.area(), shape.area())
+        if isinstance(shape, Polygon):
+            self.assertEqual(loaded.vertices, shape.vertices)
+        if hasattr(shape, 'label'):
+            self.assertEqual((loaded.color, loaded.label), (shape.color, shape.label))
+
+    def test_round_trip(self):
+        """Test every shape comes back with its ID, with and without mmap."""
+        self.map.save(self.path)
+        for use_mmap in (True, False):
+            loaded = Map.load(self.path, mmap=use_mmap)
+            self.assertEqual(len(loaded), len(self.map))
+            for shape in self.map.shapes:
+                self.assertSameShape(loaded.get_shape(self.map.shape_id(shape)), shape)
+            self.assertAlmostEqual(loaded.total_area(), self.map.total_area())
+            self.assertEqual(loaded.totals_by_color(), self.map.totals_by_color())
+
+    def test_loaded_map_is_indexed(self):
+        """Test the loaded map answers queries and continues the ID sequence."""
+        self.map.save(self.path)
+        loaded = Map.load(self.path)
+        self.assertIs(loaded.nearest((11, 11))[0][0], loaded.get_shape(7))
+        self.assertEqual(loaded.add_shape(Circle(1, 0, 0, 0)), 8)
+        loaded.get_shape(2).move(100, 0)
+        self.assertIs(loaded.nearest((104, 4))[0][0], loaded.get_shape(2))
+
+    def test_empty_map(self):
+        """Test an empty map saves and loads."""
+        Map().save(self.path)
+        self.assertEqual(len(Map.load(self.path)), 0)
+
+    def test_unsupported_type(self):
+        """Test shapes of other types cannot be saved."""
+        class Dot(Circle):
+            __slots__ = ()
+
+        with self.assertRaises(TypeError):
+            write_snapshot(self.path, [(0, Dot(1, 0, 0, 0))])
+
+        for shape in (LabelledColoredCircle(1, 0, 0, color=None), LabelledColoredCircle(1, 0, 0, label=None)):
+            with self.assertRaises(TypeError):
+                write_snapshot(self.path, [(0, shape)])
+
+    def test_rejects_other_files(self):
+        """Test files that are not snapshots, or of another version, are rejected."""
+        with open(self.path, 'wb') as file:
+            file.write(b'not a snapshot at all, but long enough')
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+        self.map.save(self.path)
+        with open(self.path, 'r+b') as file:
+            file.seek(8)
+            file.write(struct.pack('<H', FORMAT_VERSION + 1))
+        with self.assertRaises(ValueError):
+            Map.load(self.path)
+
+    def test_rejects_truncated_files(self):
+        """Test a snapshot cut short is rejected with ValueError, not a struct error."""
+        self.map.save(self.path)
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        for length in (len(data) // 2, len(data) - 1):
+            with open(self.path, 'wb') as file:
+                file.write(data[:length])
+            for mmap in (True, False):
+                with self.assertRaisesRegex(ValueError, 'truncated or corrupt'):
+                    Snapshot(self.path, mmap=mmap)
+
+    def test_lazy_iteration(self):
+        """Test the snapshot decodes shapes on demand and counts them without decoding."""
+        self.map.save(self.path)
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(len(snapshot), 7)
+            self.assertEqual(snapshot.counts()['Polygon'], 2)
+            shape_id, shape = next(iter(snapshot))
+            self.assertEqual(shape_id, 0)
+            self.assertSameShape(shape, self.map.get_shape(0))
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_records_without_copying(self):
+        """Test records and vertices are read-only arrays over the file."""
+        self.map.save(self.path)
+        with Snapshot(self.path) as snapshot:
+            circles = snapshot.records('LabelledColoredCircle')
+            self.assertEqual(circles['r'].tolist(), [2.0])
+            self.assertEqual(snapshot.string(int(circles['color'][0])), '#00ff00')
+            self.assertFalse(circles.flags.writeable)
+
+            polygons = snapshot.records('Polygon')
+            vertices = snapshot.vertices()
+            first, count = int(polygons['first_vertex'][1]), int(polygons['vertex_count'][1])
+            self.assertEqual(vertices[first:first + count].tolist(), [[10, 10], [12, 10], [11, 12]])
+            del circles, polygons, vertices
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import unittest
+import random
+import sys
+import os
+
+# Add the parent directory to sys.path to import modules correctly
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from operations.spatial_index import SpatialGrid, sweep_and_prune, _box_distance, np
+
+
+class TestSpatialGrid(unittest.TestCase):
+    """Test cases for the SpatialGrid index."""
+
+    def setUp(self):
+        self.grid = SpatialGrid(cell_size=10)
+        self.grid.insert('a', (0, 0, 5, 5))
+        self.grid.insert('b', (3, 3, 25, 25))
+        self.grid.insert('c', (100, 100, 110, 110))
+
+    def test_invalid_cell_size(self):
+        """Test a non-positive cell size raises ValueError."""
+        with self.assertRaises(ValueError):
+            SpatialGrid(cell_size=0)
+
+    def test_query_point(self):
+        """Test point queries return items whose box contains the point."""
+        self.assertEqual(self.grid.query_point(4, 4), ['a', 'b'])
+        self.assertEqual(self.grid.query_point(20, 20), ['b'])
+        self.assertEqual(self.grid.query_point(50, 50), [])
+
+    def test_query_point_on_boundary(self):
+        """Test points on a box boundary are reported."""
+        self.assertEqual(self.grid.query_point(110, 100), ['c'])
+        self.assertEqual(self.grid.query_point(5, 0), ['a'])
+
+    def test_query_bbox(self):
+        """Test box queries return overlapping items."""
+        self.assertEqual(self.grid.query_bbox((20, 20, 105, 105)), ['b', 'c'])
+        self.assertEqual(self.grid.query_bbox((-1e9, -1e9, 1e9, 1e9)), ['a', 'b', 'c'])
+
+    def test_remove(self):
+        """Test removed items are no longer reported."""
+        self.grid.remove('b')
+        self.assertEqual(self.grid.query_point(4, 4), ['a'])
+        self.assertNotIn('b', self.grid)
+        with self.assertRaises(KeyError):
+            self.grid.remove('b')
+
+    def test_duplicate_insert(self):
+        """Test inserting an existing key raises KeyError."""
+        with self.assertRaises(KeyError):
+            self.grid.insert('a', (0, 0, 1, 1))
+
+    def test_insert_many(self):
+        """Test bulk inserts are queryable and reject existing or repeated keys atomically."""
+        self.grid.insert_many([('d', (300, 300, 301, 301)), ('e', (300, 300, 302, 302))])
+        self.assertEqual(self.grid.query_point(300, 300), ['d', 'e'])
+        with self.assertRaises(KeyError):
+            self.grid.insert_many([('f', (0, 0, 1, 1)), ('a', (0, 0, 1, 1))])
+        with self.assertRaises(KeyError):
+            self.grid.insert_many([('f', (0, 0, 1, 1)), ('f', (0, 0, 1, 1))])
+        self.assertNotIn('f', self.grid)
+
+    def test_update(self):
+        """Test updating an item moves it to its new cells."""
+        self.grid.update('a', (200, 200, 201, 201))
+        self.assertEqual(self.grid.query_point(1, 1), [])
+        self.assertEqual(self.grid.query_point(200, 200), ['a'])
+        self.assertEqual(self.grid.bbox('a'), (200, 200, 201, 201))
+
+    def test_update_many(self):
+        """Test bulk updates, including ones that rebuild the grid."""
+        self.grid.update_many([('a', (200, 200, 201, 201)), ('b', (3, 3, 6, 6))])
+        self.assertEqual(self.grid.query_point(200, 200), ['a'])
+        self.assertEqual(self.grid.query_point(5.5, 5.5), ['b'])
+        self.grid.update_many([(key, (x0 + 1000, y0, x1 + 1000, y1)) for key, (x0, y0, x1, y1) in self.grid.items()])
+        self.assertEqual(self.grid.query_point(1200, 200), ['a'])
+        self.assertEqual(self.grid.query_point(200, 200), [])
+        with self.assertRaises(KeyError):
+            self.grid.update_many([('a', (0, 0, 1, 1)), ('missing', (0, 0, 1, 1))])
+        self.assertEqual(self.grid.bbox('a'), (1200, 200, 1201, 201))
+
+    def test_oversized_items(self):
+        """Test items spanning many cells are still found."""
+        grid = SpatialGrid(cell_size=1, max_cells_per_item=4)
+        grid.insert('big', (0, 0, 1000, 1000))
+        self.assertEqual(grid.query_point(500, 500), ['big'])
+        grid.remove('big')
+        self.assertEqual(grid.query_point(500, 500), [])
+
+    def test_unbounded_items(self):
+        """Test items with an infinite box are oversized and match every query."""
+        inf = float('inf')
+        grid = SpatialGrid()
+        grid.insert_many([('a', (0, 0, 1, 1)), ('all', (-inf, -inf, inf, inf))])
+        grid.insert('b', (2, 2, 3, 3))
+        self.assertEqual(grid.cell_size, 1)
+        self.assertEqual(grid.query_point(2.5, 2.5), ['all', 'b'])
+        self.assertEqual(grid.query_bbox((5, 5, 6, 6)), ['all'])
+        self.assertEqual(grid.query_bbox((-inf, 0, inf, 0.5)), ['a', 'all'])
+        self.assertEqual(grid.nearest((10, 10, 10, 10), lambda key: 0.0 if key == 'all' else 1.0, k=2),
+                         [('all', 0.0), ('b', 1.0)])
+        self.assertEqual(len(grid.nearest((-inf, -inf, inf, inf), lambda key: 1.0, k=3)), 3)
+        if np is not None:
+            _, items = grid.packed().candidate_pairs(np.array([0.5]), np.array([0.5]))
+            self.assertEqual([grid.packed().keys[item] for item in items], ['a', 'all'])
+        grid.update('all', (4, 4, 5, 5))
+        self.assertEqual(grid.query_point(0.5, 0.5), ['a'])
+        grid.remove('all')
+        self.assertEqual(len(grid), 2)
+
+    def test_auto_tuning_matches_brute_force(self):
+        """Test an auto-tuned grid agrees with a linear scan."""
+        rng = random.Random(7)
+        grid = SpatialGrid()
+        boxes = {}
+        for key in range(500):
+            x, y = rng.uniform(-100, 100), rng.uniform(-100, 100)
+            w, h = rng.uniform(0, 10), rng.uniform(0, 10)
+            boxes[key] = (x, y, x + w, y + h)
+            grid.insert(key, boxes[key])
+        for key in range(0, 500, 3):
+            grid.remove(key)
+            del boxes[key]
+
+        for _ in range(200):
+            px, py = rng.uniform(-110, 110), rng.uniform(-110, 110)
+            expected = [key for key, (x0, y0, x1, y1) in boxes.items()
+                        if x0 <= px <= x1 and y0 <= py <= y1]
+            self.assertEqual(grid.query_point(px, py), expected)
+
+    def test_items(self):
+        """Test items are iterated in insertion order."""
+        self.assertEqual([key for key, _ in self.grid.items()], ['a', 'b', 'c'])
+
+    def test_nearest(self):
+        """Test nearest-neighbour queries with box distances."""
+        distance = lambda key: _box_distance((50, 4, 50, 4), self.grid.bbox(key))
+        result = self.grid.nearest((50, 4, 50, 4), distance, k=2)
+        self.assertEqual([key for key, _ in result], ['b', 'a'])
+        self.assertAlmostEqual(result[0][1], 25)
+        self.assertEqual(self.grid.nearest((50, 4, 50, 4), distance, k=5, max_distance=30), [('b', 25)])
+        self.assertEqual(self.grid.nearest((50, 4, 50, 4), distance, exclude='b'), [('a', 45)])
+
+    def test_nearest_skips_infinite_distances(self):
+        """Test items with an unknown distance are not returned."""
+        distance = lambda key: float('inf') if key == 'a' else 1.0
+        self.assertEqual([key for key, _ in self.grid.nearest((0, 0, 0, 0), distance, k=3)], ['b', 'c'])
+
+    def test_nearest_matches_brute_force(self):
+        """Test k-nearest queries agree with sorting every item."""
+        rng = random.Random(11)
+        grid = SpatialGrid()
+        boxes = {}
+        for key in range(400):
+            x, y = rng.uniform(0, 1000), rng.uniform(0, 1000)
+            boxes[key] = (x, y, x + rng.uniform(0, 5), y + rng.uniform(0, 5))
+            grid.insert(key, boxes[key])
+
+        for _ in range(50):
+            qx, qy = rng.uniform(-200, 1200), rng.uniform(-200, 1200)
+            query = (qx, qy, qx, qy)
+            distance = lambda key: _box_distance(query, boxes[key])
+            expected = sorted(distance(key) for key in boxes)[:5]
+            result = grid.nearest(query, distance, k=5)
+            self.assertEqual([d for _, d in result], expected)
+
+    def test_group_points(self):
+        """Test points are grouped by cell with shared candidates."""
+        groups = self.grid.group_points([(1, 1), (2, 2), (15, 15), (500, 500)])
+        self.assertEqual(groups, [([0, 1], ['a', 'b']), ([2], ['b'])])
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_packed_candidate_pairs(self):
+        """Test packed batch lookups agree with point queries."""
+        rng = random.Random(9)
+        grid = SpatialGrid(max_cells_per_item=16)
+        for key in range(300):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            grid.insert(key, (x, y, x + rng.uniform(0, 30), y + rng.uniform(0, 5)))
+        points = [(rng.uniform(-10, 140), rng.uniform(-10, 110)) for _ in range(200)]
+
+        packed = grid.packed()
+        self.assertIs(grid.packed(), packed)
+        xs = np.array([p[0] for p in points])
+        ys = np.array([p[1] for p in points])
+        pair_points, pair_items = packed.candidate_pairs(xs, ys)
+        for i, (x, y) in enumerate(points):
+            found = [packed.keys[item] for item in pair_items[pair_points == i]]
+            self.assertEqual(found, grid.query_point(x, y))
+
+        grid.remove(0)
+        self.assertIsNot(grid.packed(), packed)
+
+
+class TestSweepAndPrune(unittest.TestCase):
+    """Test cases for the sweep_and_prune broad phase."""
+
+    def test_touching_boxes(self):
+        """Test touching boxes are reported as a pair."""
+        pairs = list(sweep_and_prune([('a', (0, 0, 5, 5)), ('b', (5, 0, 10, 5)), ('c', (20, 20, 21, 21))]))
+        self.assertEqual(pairs, [('a', 'b')])
+
+    def test_matches_brute_force(self):
+        """Test sweep-and-prune reports the same pairs as a double loop."""
+        rng = random.Random(3)
+        entries = []
+        for key in range(300):
+            x, y = rng.uniform(0, 100), rng.uniform(0, 100)
+            entries.append((key, (x, y, x + rng.uniform(0, 8), y + rng.uniform(0, 8))))
+
+        expected = set()
+        for i, (key1, b1) in enumerate(entries):
+            for key2, b2 in entries[i + 1:]:
+                if b1[0] <= b2[2] and b2[0] <= b1[2] and b1[1] <= b2[3] and b2[1] <= b1[3]:
+                    expected.add((key1, key2))
+
+        pairs = list(sweep_and_prune(entries))
+        self.assertEqual(len(pairs), len(expected))
+        self.assertEqual(set(pairs), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
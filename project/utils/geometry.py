@@ -1,12 +1,26 @@
 from typing import List, Tuple, Optional, Union
 from shapes.primitives import Circle, Rectangle, Triangle
-import math  
+from shapes.base import Shape
+import itertools
+import logging
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional
+    np = None
 
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Bounding box of shapes whose extent is unknown
+UNBOUNDED = (-math.inf, -math.inf, math.inf, math.inf)
+
+# Debug tracing of the polygon tests is opt-in: enable DEBUG on this logger
+logger = logging.getLogger(__name__)
+
 class ShapeUtils:
     """Utility class for shape operations."""
     
@@ -19,18 +33,32 @@ class ShapeUtils:
             shape: A geometric shape (Rectangle or Triangle)
             
         Returns:
-            List of (x, y) vertex coordinates or None if shape is not supported
-        """
-        if isinstance(shape, Rectangle):
-            x, y = shape.x, shape.y
-            return [(x, y), (x + shape.a, y), 
-                    (x + shape.a, y + shape.b), 
-                    (x, y + shape.b)]
-        elif isinstance(shape, Triangle):
-            x, y = shape.x, shape.y
-            return [(x, y), (x + shape.a, y), (x + shape.a/2, y + shape.b)]
+            List of (x, y) vertex coordinates or None if shape is not supported.
+            The list is cached on the shape and must not be modified.
+        """
+        if isinstance(shape, (Rectangle, Triangle)):
+            return shape.to_vertices()
         return None
-    
+
+    @staticmethod
+    def bounding_box(shape: Shape) -> Tuple[float, float, float, float]:
+        """
+        Calculates the axis-aligned bounding box of a shape.
+
+        Shapes that do not define bbox() get the unbounded box, so indexes
+        treat them as possibly overlapping everything.
+
+        Args:
+            shape: A geometric shape
+
+        Returns:
+            Tuple of (min_x, min_y, max_x, max_y)
+        """
+        try:
+            return shape.bbox()
+        except (AttributeError, NotImplementedError):
+            return UNBOUNDED
+
     @staticmethod
     def circle_rectangle_intersection(circle: Circle, rect: Rectangle) -> bool:
         """
@@ -75,13 +103,113 @@ class ShapeUtils:
         # Subtract radius (but not less than 0)
         return max(0, distance - circle.radius)
     
+    @staticmethod
+    def point_segment_distance(point: Tuple[float, float], seg_start: Tuple[float, float],
+                               seg_end: Tuple[float, float]) -> float:
+        """
+        Calculates the distance from a point to a line segment.
+
+        Args:
+            point: The (x, y) point
+            seg_start: First endpoint of the segment
+            seg_end: Second endpoint of the segment
+
+        Returns:
+            The distance to the closest point of the segment
+        """
+        return math.sqrt(_point_segment_distance_squared(point, seg_start, seg_end))
+
+    @staticmethod
+    def polygons_distance(poly1: List[Tuple[float, float]], poly2: List[Tuple[float, float]]) -> float:
+        """
+        Calculates the minimum distance between the boundaries of two polygons.
+
+        Two segments that do not cross are closest at an endpoint of one of
+        them, so the distance between boundaries that do not cross is the
+        smallest distance from a vertex of either polygon to an edge of the
+        other. The result is only meaningful for polygons that do not
+        intersect; check that first.
+
+        Args:
+            poly1: List of (x, y) vertex coordinates of the first polygon
+            poly2: List of (x, y) vertex coordinates of the second polygon
+
+        Returns:
+            The minimum distance between the polygon boundaries
+        """
+        best = math.inf
+        for vertices, polygon in ((poly1, poly2), (poly2, poly1)):
+            start = polygon[-1]
+            for end in polygon:
+                for point in vertices:
+                    distance = _point_segment_distance_squared(point, start, end)
+                    if distance < best:
+                        best = distance
+                start = end
+        return math.sqrt(best)
+
+    @staticmethod
+    def is_point_inside_polygon(point: Tuple[float, float], polygon: List[Tuple[float, float]],
+                                strategy: str = 'crossing') -> bool:
+        """
+        Checks if a point lies inside a polygon.
+
+        The 'crossing' (even-odd) and 'winding' (non-zero) strategies only
+        use orientation signs of cross products, with no division or
+        trigonometry, so they are exact for integer coordinates given as
+        Python ints (the vertices of a Polygon shape are floats). Both count
+        points on an edge or vertex as inside and only differ for
+        self-intersecting polygons. The 'angle' strategy is the angle-sum
+        test of is_point_inside_polygon_way1.
+
+        Args:
+            point: The (x, y) point to test
+            polygon: List of (x, y) vertex coordinates
+            strategy: 'crossing', 'winding' or 'angle' (default: 'crossing')
+
+        Returns:
+            True if the point is inside the polygon, False otherwise
+
+        Raises:
+            ValueError: If the strategy is unknown
+        """
+        if strategy == 'angle':
+            return ShapeUtils.is_point_inside_polygon_way1(point, polygon)
+        if strategy not in ('crossing', 'winding'):
+            raise ValueError(f"Unknown point-in-polygon strategy: {strategy}")
+
+        px, py = point
+        n = len(polygon)
+        winding = 0
+        x1, y1 = polygon[n - 1]
+
+        for i in range(n):
+            x2, y2 = polygon[i]
+            # > 0 when the point is left of the edge (x1, y1) -> (x2, y2)
+            orientation = (x2 - x1) * (py - y1) - (px - x1) * (y2 - y1)
+
+            if (orientation == 0 and min(x1, x2) <= px <= max(x1, x2)
+                    and min(y1, y2) <= py <= max(y1, y2)):
+                return True
+            if y1 <= py < y2 and orientation > 0:
+                winding += 1
+            elif y2 <= py < y1 and orientation < 0:
+                winding -= 1
+            x1, y1 = x2, y2
+
+        if strategy == 'winding':
+            return winding != 0
+        return winding % 2 == 1
+
     @staticmethod
     def is_point_inside_polygon_way1(point: Tuple[float, float], polygon: List[Tuple[float, float]]) -> bool:
         total_angle = 0
         n = len(polygon)
         epsilon = 1e-6
-        print(f"Testing point {point} with polygon of {n} vertices")
-        print(f"Polygon vertices: {polygon}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Testing point %s with polygon of %d vertices", point, n)
+            logger.debug("Polygon vertices: %s", polygon)
         
         for i in range(n):  # Change from n-1 to n to process all vertices
             current_vertex = polygon[i]
@@ -94,7 +222,8 @@ class ShapeUtils:
             len2 = math.sqrt(vector2[0]**2 + vector2[1]**2)
             
             if len1 == 0 or len2 == 0:
-                print(f"Point is on vertex {current_vertex or next_vertex}")
+                if debug:
+                    logger.debug("Point is on vertex %s", current_vertex or next_vertex)
                 return True
             
             dot = vector1[0]*vector2[0] + vector1[1]*vector2[1]
@@ -109,10 +238,14 @@ class ShapeUtils:
                 angle = -angle
                 
             total_angle += angle
-            print(f"Edge {i}: {current_vertex}->{next_vertex}, Angle: {angle:.4f}, Total: {total_angle:.4f}")
+            if debug:
+                logger.debug("Edge %d: %s->%s, Angle: %.4f, Total: %.4f",
+                             i, current_vertex, next_vertex, angle, total_angle)
         
         result = abs(abs(total_angle) - 2*math.pi) < epsilon
-        print(f"Final total: {total_angle:.4f}, Diff from 2π: {abs(abs(total_angle) - 2*math.pi):.8f}, Inside: {result}")
+        if debug:
+            logger.debug("Final total: %.4f, Diff from 2π: %.8f, Inside: %s",
+                         total_angle, abs(abs(total_angle) - 2*math.pi), result)
         return result
                        
             
@@ -122,7 +255,7 @@ class ShapeUtils:
         n = len(polygon)
         sign = None
         
-        for  i in range(n-1):
+        for  i in range(n):
             current_vertex = polygon[i]
             next_vertex = polygon[(i+1)%n]
             
@@ -140,6 +273,94 @@ class ShapeUtils:
                     return False    
         return True    
     
+    @staticmethod
+    def points_inside_polygon(xs: 'np.ndarray', ys: 'np.ndarray',
+                              polygon: List[Tuple[float, float]]) -> 'np.ndarray':
+        """
+        Checks which of many points lie inside a polygon (requires numpy).
+
+        Uses the same crossing-number predicates as is_point_inside_polygon,
+        vectorized over the points one edge at a time. Points on an edge or
+        vertex count as inside.
+
+        Args:
+            xs: Array of point x-coordinates
+            ys: Array of point y-coordinates
+            polygon: List of (x, y) vertex coordinates
+
+        Returns:
+            Boolean array, True where the point is inside the polygon
+        """
+        inside = np.zeros(len(xs), dtype=bool)
+        on_edge = np.zeros(len(xs), dtype=bool)
+        n = len(polygon)
+
+        for i in range(n):
+            x1, y1 = polygon[i]
+            x2, y2 = polygon[(i + 1) % n]
+
+            # > 0 where the point is left of the edge (x1, y1) -> (x2, y2)
+            orientation = (x2 - x1) * (ys - y1) - (xs - x1) * (y2 - y1)
+            on_edge |= ((orientation == 0) & (xs >= min(x1, x2)) & (xs <= max(x1, x2))
+                        & (ys >= min(y1, y2)) & (ys <= max(y1, y2)))
+            upward = (y1 <= ys) & (ys < y2) & (orientation > 0)
+            downward = (y2 <= ys) & (ys < y1) & (orientation < 0)
+            inside ^= upward | downward
+
+        return inside | on_edge
+
+    @staticmethod
+    def separating_axis_test(poly1: List[Tuple[float, float]],
+                             poly2: List[Tuple[float, float]]) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """
+        Checks if two convex polygons intersect using the separating axis theorem.
+
+        Two convex polygons are disjoint exactly when their projections on
+        the normal of some edge of either polygon do not overlap. The edge
+        normals of a convex polygon turn monotonically, so the extreme
+        vertices along them are tracked with pointers that each go around
+        a polygon once, which makes the test O(n + m). The projections use
+        unnormalized normals, so the decision is exact for integer
+        coordinates given as Python ints (the vertices of a Polygon shape
+        are floats); touching polygons count as intersecting. Results are
+        undefined for non-convex polygons.
+
+        Args:
+            poly1: List of (x, y) vertex coordinates of a convex polygon
+            poly2: List of (x, y) vertex coordinates of a convex polygon
+
+        Returns:
+            Tuple (intersects, mtv) where mtv is the minimum translation
+            vector that moves poly1 out of contact with poly2, or None if
+            the polygons do not intersect
+        """
+        ccw1 = _counterclockwise(poly1)
+        ccw2 = _counterclockwise(poly2)
+        if ccw1 is None or ccw2 is None or len(poly1) + len(poly2) <= 8:
+            intervals = _brute_force_intervals(poly1, poly2)
+        else:
+            intervals = itertools.chain(_caliper_intervals(ccw1, ccw2, False),
+                                        _caliper_intervals(ccw2, ccw1, True))
+
+        best_depth = math.inf
+        mtv = (0.0, 0.0)
+        for ax, ay, min1, max1, min2, max2 in intervals:
+            if max1 < min2 or max2 < min1:
+                return False, None
+
+            # Push poly1 out along whichever direction is shorter
+            length = math.hypot(ax, ay)
+            backward = (max1 - min2) / length
+            forward = (max2 - min1) / length
+            if backward < best_depth:
+                best_depth = backward
+                mtv = (-ax / length * backward, -ay / length * backward)
+            if forward < best_depth:
+                best_depth = forward
+                mtv = (ax / length * forward, ay / length * forward)
+
+        return True, mtv
+
     @staticmethod
     def line_intersects(line1_p1: Tuple[float, float], line1_p2: Tuple[float, float], 
                        line2_p1: Tuple[float, float], line2_p2: Tuple[float, float]) -> bool:
@@ -155,18 +376,130 @@ class ShapeUtils:
         Returns:
             True if the line segments intersect, False otherwise
         """
-        def cross_product(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-            return a[0] * b[1] - a[1] * b[0]
+        (ax, ay), (bx, by) = line1_p1, line1_p2
+        (cx, cy), (dx, dy) = line2_p1, line2_p2
 
-        def direction(a: Tuple[float, float], b: Tuple[float, float], c: Tuple[float, float]) -> float:
-            return cross_product((c[0] - a[0], c[1] - a[1]), (b[0] - a[0], b[1] - a[1]))
+        # Side of each endpoint relative to the other segment's line
+        d1 = (cx - ax) * (by - ay) - (cy - ay) * (bx - ax)
+        d2 = (dx - ax) * (by - ay) - (dy - ay) * (bx - ax)
+        if d1 * d2 >= 0:
+            return False
+        d3 = (ax - cx) * (dy - cy) - (ay - cy) * (dx - cx)
+        d4 = (bx - cx) * (dy - cy) - (by - cy) * (dx - cx)
 
-        d1 = direction(line1_p1, line1_p2, line2_p1)
-        d2 = direction(line1_p1, line1_p2, line2_p2)
-        d3 = direction(line2_p1, line2_p2, line1_p1)
-        d4 = direction(line2_p1, line2_p2, line1_p2)
+        return d3 * d4 < 0
 
-        return (d1 * d2 < 0 and d3 * d4 < 0)
-    
 
+def _point_segment_distance_squared(point: Tuple[float, float], seg_start: Tuple[float, float],
+                                    seg_end: Tuple[float, float]) -> float:
+    """Squared distance from a point to the closest point of a segment."""
+    px, py = point
+    ax, ay = seg_start
+    dx, dy = seg_end[0] - ax, seg_end[1] - ay
+    length_squared = dx * dx + dy * dy
+    if length_squared:
+        t = ((px - ax) * dx + (py - ay) * dy) / length_squared
+        if t > 1:
+            ax, ay = seg_end
+        elif t > 0:
+            ax, ay = ax + t * dx, ay + t * dy
+    return (px - ax) ** 2 + (py - ay) ** 2
+
+
+def _counterclockwise(polygon: List[Tuple[float, float]]) -> Optional[List[Tuple[float, float]]]:
+    """The polygon in counterclockwise order, or None if it has no area."""
+    twice_area = 0
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        twice_area += x1 * y2 - x2 * y1
+        x1, y1 = x2, y2
+    if twice_area == 0:
+        return None
+    return polygon if twice_area > 0 else polygon[::-1]
+
+
+def _brute_force_intervals(poly1: List[Tuple[float, float]], poly2: List[Tuple[float, float]]):
+    """
+    Projection intervals of two polygons on every edge normal of both,
+    projecting every vertex. Used for small or degenerate polygons.
+
+    Yields (ax, ay, min1, max1, min2, max2) per non-degenerate edge.
+    """
+    for polygon in (poly1, poly2):
+        x1, y1 = polygon[-1]
+        for x2, y2 in polygon:
+            ax, ay = y2 - y1, x1 - x2
+            x1, y1 = x2, y2
+            if ax == 0 and ay == 0:
+                continue
+            projections1 = [ax * x + ay * y for x, y in poly1]
+            projections2 = [ax * x + ay * y for x, y in poly2]
+            yield ax, ay, min(projections1), max(projections1), min(projections2), max(projections2)
+
+
+def _caliper_intervals(axes_polygon: List[Tuple[float, float]], other: List[Tuple[float, float]],
+                       swapped: bool):
+    """
+    Projection intervals of two counterclockwise convex polygons on the
+    outward edge normals of the first one.
+
+    As the normals turn counterclockwise, the vertices of minimum and
+    maximum projection only move forward, so each pointer walks around its
+    polygon about once in total.
+
+    Yields (ax, ay, min1, max1, min2, max2) per non-degenerate edge, where
+    1 refers to the first polygon unless swapped is True.
+    """
+    n = len(axes_polygon)
+    m = len(other)
+    low = high = other_low = -1
+    x1, y1 = axes_polygon[-1]
+
+    for x2, y2 in axes_polygon:
+        ax, ay = y2 - y1, x1 - x2
+        if ax == 0 and ay == 0:
+            continue
+        # The edge itself is the maximum of its own polygon along the normal
+        own_max = ax * x1 + ay * y1
+        x1, y1 = x2, y2
+
+        if low < 0:
+            low = min(range(n), key=lambda i: ax * axes_polygon[i][0] + ay * axes_polygon[i][1])
+            high = max(range(m), key=lambda i: ax * other[i][0] + ay * other[i][1])
+            other_low = min(range(m), key=lambda i: ax * other[i][0] + ay * other[i][1])
+
+        # Advance each pointer while the next vertex is at least as extreme
+        x, y = axes_polygon[low]
+        own_min = ax * x + ay * y
+        for _ in range(n - 1):
+            x, y = axes_polygon[low + 1 - n]
+            value = ax * x + ay * y
+            if value > own_min:
+                break
+            own_min = value
+            low = (low + 1) % n
+
+        x, y = other[other_low]
+        other_min = ax * x + ay * y
+        for _ in range(m - 1):
+            x, y = other[other_low + 1 - m]
+            value = ax * x + ay * y
+            if value > other_min:
+                break
+            other_min = value
+            other_low = (other_low + 1) % m
+
+        x, y = other[high]
+        other_max = ax * x + ay * y
+        for _ in range(m - 1):
+            x, y = other[high + 1 - m]
+            value = ax * x + ay * y
+            if value < other_max:
+                break
+            other_max = value
+            high = (high + 1) % m
 
+        if swapped:
+            yield ax, ay, other_min, other_max, own_min, own_max
+        else:
+            yield ax, ay, own_min, own_max, other_min, other_max